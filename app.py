@@ -5,6 +5,13 @@ from flasgger import Swagger
 from config import config
 from models import db
 from routes import api
+from services.search_index import ensure_search_index
+from services.schema import ensure_columns, ensure_indexes, null_metric_placeholders
+from services.stats import ensure_stats, rebuild_stats
+from services.dimensions import backfill_dimensions
+from services.catalog_version import bump_version, ensure_version, forget_version
+from services.compression import init_compression
+from services.sqlite_profile import init_sqlite_profile
 import os
 from collections import OrderedDict
 
@@ -18,6 +25,9 @@ def create_app(config_name='default'):
     # Enable CORS
     CORS(app)
 
+    # Compress responses per Accept-Encoding (gzip, brotli when installed)
+    init_compression(app)
+
     # Initialize JWT
     JWTManager(app)
 
@@ -90,6 +100,9 @@ def create_app(config_name='default'):
     
     # Initialize database
     db.init_app(app)
+
+    # Apply the SQLite pragma profile (WAL, cache, mmap) to every pooled connection
+    init_sqlite_profile(app)
     
     # Register blueprints
     app.register_blueprint(api)
@@ -97,6 +110,22 @@ def create_app(config_name='default'):
     # Create tables
     with app.app_context():
         db.create_all()
+        ensure_columns(db.engine)
+        ensure_indexes(db.engine)
+        ensure_search_index(db.engine)
+        backfill_dimensions()
+        migrated = null_metric_placeholders(db.engine)
+        if migrated:
+            # The brand averages counted the placeholders as real zeros.
+            rebuild_stats()
+        else:
+            ensure_stats()
+        ensure_version()
+        if migrated:
+            # Responses cached or tagged before the migration still show the placeholders.
+            bump_version()
+            db.session.commit()
+            forget_version()
         # Optionally create an initial admin user from environment variables
         admin_username = os.environ.get('ADMIN_USER')
         admin_password = os.environ.get('ADMIN_PASSWORD')
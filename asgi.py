@@ -0,0 +1,9 @@
+"""ASGI entry point: uvicorn asgi:app
+
+Serves the same app as wsgi.py; attendee reads run on the event loop with
+async SQLAlchemy sessions (services/async_app.py).
+"""
+from services.async_app import AsyncApp
+from wsgi import app as flask_app
+
+app = AsyncApp(flask_app)
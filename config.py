@@ -8,6 +8,65 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///cars.db'
     JSON_SORT_KEYS = False
+    # In-memory NumPy copy of the numeric columns for metric filters and top-N
+    # (services/catalog_snapshot.py); only used when numpy is installed.
+    CATALOG_SNAPSHOT = os.environ.get('CATALOG_SNAPSHOT', '1') != '0'
+    # Seconds before a worker rebuilds its snapshot to pick up other processes' writes.
+    CATALOG_SNAPSHOT_MAX_AGE = int(os.environ.get('CATALOG_SNAPSHOT_MAX_AGE', 60))
+    # Rebuild the snapshot on a background thread instead of the request that noticed it was out of date.
+    CATALOG_SNAPSHOT_BACKGROUND = os.environ.get('CATALOG_SNAPSHOT_BACKGROUND', '1') != '0'
+    # Seconds a worker trusts its cached catalog version (ETags) before re-reading it.
+    CATALOG_VERSION_MAX_AGE = int(os.environ.get('CATALOG_VERSION_MAX_AGE', 5))
+    # SQLite pragmas run on every pooled connection (services/sqlite_profile.py):
+    # WAL so readers never wait for a writer; NORMAL sync, which cannot corrupt a
+    # WAL database but may lose the last commits on power loss; a 64 MiB page
+    # cache (negative = KiB), 256 MiB memory-mapped reads and in-memory temp
+    # tables. Reported by GET /admin/database.
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_SIZE_KB', 65536)),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'temp_store': 'MEMORY',
+    }
+    # Most ids one /cars/batch request may ask for.
+    BATCH_MAX_IDS = int(os.environ.get('BATCH_MAX_IDS', 100))
+    # POST /batch (routes/batch.py): most sub-requests per batch, and threads
+    # for batches sent with "parallel": true (1 runs everything sequentially).
+    BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+    BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 4))
+    # Async serving mode (asgi.py): database URL for the async engine (derived
+    # from SQLALCHEMY_DATABASE_URI for SQLite files, as sqlite+aiosqlite) and
+    # how many connections it pools.
+    ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URL')
+    ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', 10))
+    # Cache-Control sent with attendee GET responses. The default lets clients
+    # and proxies keep responses but revalidate them with If-None-Match.
+    HTTP_CACHE_CONTROL = os.environ.get('HTTP_CACHE_CONTROL', 'public, no-cache')
+    # Server-side cache of encoded attendee responses (services/response_cache.py):
+    # entry bound of the memory / sqlite backends (0 disables the cache) and
+    # seconds an entry lives per endpoint.
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 1024))
+    RESPONSE_CACHE_TTLS = {
+        'default': 60,
+        'stats': 300,
+        'browse': 300,
+        'available': 600,
+    }
+    # Where cached entries live (services/cache_backends.py): 'memory' (per worker),
+    # 'sqlite' (file shared by a host's workers; CACHE_URL is its path) or 'redis'
+    # (CACHE_URL is redis://host:port/db).
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_URL = os.environ.get('CACHE_URL')
+    CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX', 'cars-api:')
+    # Response compression (services/compression.py): brotli when installed and
+    # accepted, else gzip; buffered bodies under COMPRESS_MIN_SIZE bytes are sent as is.
+    COMPRESS = os.environ.get('COMPRESS', '1') != '0'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_LEVEL = int(os.environ.get('COMPRESS_BROTLI_LEVEL', 4))
+    COMPRESS_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html')
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -19,8 +78,18 @@ class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_ECHO = False
 
+class TestingConfig(Config):
+    """Testing configuration (in-memory SQLite)"""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_ECHO = False
+    # The in-memory database is one connection shared by every thread, so
+    # build the catalog snapshot on the calling thread.
+    CATALOG_SNAPSHOT_BACKGROUND = False
+
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
\ No newline at end of file
@@ -9,6 +9,18 @@ export type ListCarsResponse = {
   pages: number
 }
 
+// `count` is the length of this page; `total` counts every hit (capped server-side).
+export type SearchCarsResponse = ListCarsResponse & {
+  count: number
+}
+
+// One entry per requested id, in request order; missing cars carry `error` instead of `spec`.
+export type BatchCarsResponse = {
+  cars: Array<{ id: number; spec?: CarSpec; error?: string }>
+  count: number
+  not_found: number[]
+}
+
 export const attendeeApi = {
   listCars: (params: {
     q?: string
@@ -40,7 +52,10 @@ export const attendeeApi = {
 
   getCar: (id: number) => httpJson<{ car: CarSpec }>(`/cars/${id}`),
 
-  search: (q: string) => httpJson<{ cars: SearchCar[]; count: number }>('/cars/search', { query: { q } }),
+  getCars: (ids: number[]) => httpJson<BatchCarsResponse>('/cars/batch', { method: 'POST', body: { ids } }),
+
+  search: (q: string, params: { page?: number; per_page?: number } = {}) =>
+    httpJson<SearchCarsResponse>('/cars/search', { query: { q, ...params } }),
 
   compare: (carIds: number[]) => httpJson<CompareResponse>('/cars/compare', { method: 'POST', body: { car_ids: carIds } }),
 
@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useState } from 'react'
-import { useQueries } from '@tanstack/react-query'
+import { useQuery } from '@tanstack/react-query'
 import { Link } from 'react-router-dom'
 import { Page } from '../components/layout/Page'
 import { Alert } from '../components/ui/Alert'
@@ -61,17 +61,18 @@ export function FavoritesPage() {
     })
   }
 
-  const queries = useQueries({
-    queries: favoriteIds.map((id) => ({
-      queryKey: ['favorite-car', id],
-      queryFn: () => carService.getCar(id),
-      enabled: auth.isAuthenticated
-    }))
+  // Favorites are hydrated with one /cars/batch request (at most 100 ids per call).
+  const query = useQuery({
+    queryKey: ['favorite-cars', favoriteIds],
+    queryFn: async () => {
+      const chunks: number[][] = []
+      for (let i = 0; i < favoriteIds.length; i += 100) chunks.push(favoriteIds.slice(i, i + 100))
+      const pages = await Promise.all(chunks.map((ids) => carService.getCars(ids)))
+      return new Map(pages.flatMap((p) => p.cars).map((c) => [c.id, c.spec] as const))
+    },
+    enabled: auth.isAuthenticated && favoriteIds.length > 0
   })
 
-  const anyLoading = queries.some((q) => q.isLoading)
-  const anyError = queries.find((q) => q.isError)
-
   if (!auth.isAuthenticated) {
     return (
       <Page title="Favorites" subtitle="Login to see your favorites.">
@@ -84,8 +85,8 @@ export function FavoritesPage() {
 
   return (
     <Page title="Favorites" subtitle={favoriteIds.length ? `${favoriteIds.length} saved cars for ${auth.username ?? 'user'}` : 'No favorites yet'}>
-      {anyLoading ? <Spinner label="Loading favorites…" /> : null}
-      {anyError ? <Alert tone="danger">{(anyError.error as any)?.message ?? 'Failed to load one or more favorites'}</Alert> : null}
+      {query.isLoading ? <Spinner label="Loading favorites…" /> : null}
+      {query.isError ? <Alert tone="danger">{(query.error as any)?.message ?? 'Failed to load one or more favorites'}</Alert> : null}
 
       {!favoriteIds.length ? (
         <Alert tone="info">
@@ -93,11 +94,9 @@ export function FavoritesPage() {
         </Alert>
       ) : (
         <div style={{ display: 'grid', gap: 14 }}>
-          {queries.map((q, idx) => {
-            const id = favoriteIds[idx]
-            if (id === undefined) return null
+          {favoriteIds.map((id) => {
             const isExpanded = expandedIds.has(id)
-            const spec = (q.data as any)?.car as CarSpec | undefined
+            const spec = query.data?.get(id)
             if (!spec) {
               return (
                 <div key={id} style={{ padding: 12, border: '1px solid var(--border)', borderRadius: 14 }}>
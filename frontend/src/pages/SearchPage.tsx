@@ -5,6 +5,7 @@ import { Page } from '../components/layout/Page'
 import { Input } from '../components/ui/Input'
 import { Spinner } from '../components/ui/Spinner'
 import { Alert } from '../components/ui/Alert'
+import { Button } from '../components/ui/Button'
 import { carService } from '../services/carService'
 import { CarCard } from '../components/cars/CarCard'
 import { useCompare } from '../hooks/useCompare'
@@ -14,7 +15,9 @@ import { parseAiSearch } from '../app/ai/aiSearch'
 
 type SearchResult = {
   cars: SearchCar[]
-  count: number
+  total: number
+  page: number
+  pages: number
   mode: 'text' | 'id'
   id?: number
   notFound?: boolean
@@ -27,6 +30,8 @@ type AiSnapshot = {
   savedAt: number
 }
 
+const PER_PAGE = 20
+
 const AI_SNAPSHOT_KEY = 'automobile_specs_ai_search_snapshot'
 
 function loadAiSnapshot(): AiSnapshot | null {
@@ -77,6 +82,7 @@ function parseIdQuery(text: string): number | null {
 export function SearchPage() {
   const [q, setQ] = useState('')
   const [qDebounced, setQDebounced] = useState('')
+  const [page, setPage] = useState(1)
   const { add, carIds } = useCompare()
 
   const initialAiSnapshot = useMemo(() => loadAiSnapshot(), [])
@@ -95,6 +101,7 @@ export function SearchPage() {
   useEffect(() => {
     const handle = window.setTimeout(() => {
       setQDebounced(q)
+      setPage(1)
     }, 350)
     return () => window.clearTimeout(handle)
   }, [q])
@@ -103,24 +110,24 @@ export function SearchPage() {
   const trimmed = qDebounced.trim()
 
   const query = useQuery({
-    queryKey: ['search', trimmed, idQuery],
+    queryKey: ['search', trimmed, idQuery, page],
     queryFn: async (): Promise<SearchResult> => {
-      if (!trimmed) return { cars: [], count: 0, mode: 'text' }
+      if (!trimmed) return { cars: [], total: 0, page: 1, pages: 0, mode: 'text' }
 
       if (idQuery !== null) {
         try {
           const res = await carService.getCar(idQuery)
-          return { cars: [{ id: idQuery, spec: res.car }], count: 1, mode: 'id', id: idQuery }
+          return { cars: [{ id: idQuery, spec: res.car }], total: 1, page: 1, pages: 1, mode: 'id', id: idQuery }
         } catch (e: any) {
           if (e?.status === 404) {
-            return { cars: [], count: 0, mode: 'id', id: idQuery, notFound: true }
+            return { cars: [], total: 0, page: 1, pages: 0, mode: 'id', id: idQuery, notFound: true }
           }
           throw e
         }
       }
 
-      const res = await carService.search(trimmed)
-      return { ...res, mode: 'text' }
+      const res = await carService.search(trimmed, { page, per_page: PER_PAGE })
+      return { cars: res.cars, total: res.total, page: res.page, pages: res.pages, mode: 'text' }
     },
     enabled: activeMode === 'text' && trimmed.length > 0
   })
@@ -168,6 +175,7 @@ export function SearchPage() {
   const clearTextState = () => {
     setQ('')
     setQDebounced('')
+    setPage(1)
   }
 
   return (
@@ -285,6 +293,15 @@ export function SearchPage() {
         {activeMode === 'text' && query.isFetching ? <Spinner label="Searching…" /> : null}
         {activeMode === 'text' && query.isError ? <Alert tone="danger">{(query.error as any)?.message ?? 'Search failed'}</Alert> : null}
         {activeMode === 'text' && showNotFound ? <Alert tone="info">No car found with ID {query.data?.id}.</Alert> : null}
+        {activeMode === 'text' && query.data?.mode === 'text' && trimmed ? (
+          query.data.total === 0 ? (
+            <Alert tone="info">No cars match “{trimmed}”.</Alert>
+          ) : (
+            <div style={{ color: 'var(--muted)', fontSize: 14 }}>
+              {query.data.total} results • page {query.data.page}/{query.data.pages}
+            </div>
+          )
+        ) : null}
 
         <div className="grid" style={{ gap: 12 }}>
           {activeMode === 'ai' && !aiLegacy ? aiCarsForRender.map((r) => (
@@ -309,6 +326,22 @@ export function SearchPage() {
             </div>
           )) : null}
         </div>
+
+        {activeMode === 'text' && query.data && query.data.pages > 1 ? (
+          <div style={{ display: 'flex', gap: 10, justifyContent: 'center', marginTop: 8 }}>
+            <Button type="button" variant="secondary" disabled={page <= 1} onClick={() => setPage(Math.max(1, page - 1))}>
+              Prev
+            </Button>
+            <Button
+              type="button"
+              variant="secondary"
+              disabled={page >= query.data.pages}
+              onClick={() => setPage(Math.min(query.data.pages, page + 1))}
+            >
+              Next
+            </Button>
+          </div>
+        ) : null}
       </div>
     </Page>
   )
@@ -3,6 +3,7 @@ import { attendeeApi } from '../api/attendeeApi'
 export const carService = {
   listCars: attendeeApi.listCars,
   getCar: attendeeApi.getCar,
+  getCars: attendeeApi.getCars,
   search: attendeeApi.search,
   compare: attendeeApi.compare,
   stats: attendeeApi.stats,
@@ -1,9 +1,24 @@
+import hashlib
 import json
+import os
 import re
+import time
+from itertools import islice
+from types import SimpleNamespace
+from sqlalchemy import bindparam, select, text
 from app import create_app
 from models import db, Car
+from services import json_codec
+from services.car_service import build_attendee_spec, clear_metric_placeholders, refresh_attendee_spec
+from services.dimensions import DimensionResolver, assign_dimensions
+from services.catalog_snapshot import invalidate_snapshot
+from services.catalog_version import bump_version, forget_version
+from services.neighbors import build_neighbors, invalidate_neighbors, queue_neighbors
+from services.stats import load_snapshots, rebuild_stats, record_change, snapshot
+from services.schema import ensure_columns, ensure_indexes, drop_indexes
+from services.search_index import drop_search_triggers, ensure_search_index, index_rows_after
 
-app = create_app()
+app = None
 
 def extract_int(val):
     if val is None:
@@ -19,120 +34,351 @@ def extract_float(val):
     m = re.search(r"(\d+\.?\d*)", s)
     return float(m.group(1)) if m else None
 
-def import_data(path='data/processed/processed-dataset.json', limit=None):
-    with app.app_context():
-        # Load dataset
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        # Ensure new columns exist in the existing SQLite table (lightweight migration)
-        conn = db.engine.raw_connection()
-        cur = conn.cursor()
-        cur.execute("PRAGMA table_info('cars')")
-        existing_cols = {row[1] for row in cur.fetchall()}
-
-        # Desired new columns and SQL types (SQLite) — only processed dataset fields
-        new_cols = {
-            'cylinders': 'INTEGER',
-            'acceleration_0_100': 'REAL',
-            'vitesse_max': 'INTEGER',
-            'drive_type': 'TEXT',
-            'city_mpg': 'REAL',
-            'highway_mpg': 'REAL',
-            'combined_mpg': 'REAL',
-            'torque_nm': 'INTEGER',
-            'length': 'TEXT',
-            'width': 'TEXT',
-            'height': 'TEXT',
-            'raw_spec': 'TEXT'
-        }
-        for col, col_type in new_cols.items():
-            if col not in existing_cols:
-                try:
-                    cur.execute(f"ALTER TABLE cars ADD COLUMN {col} {col_type}")
-                    print(f"Added missing column to cars: {col} {col_type}")
-                except Exception as e:
-                    print(f"Failed to add column {col}: {e}")
-        conn.commit()
-
-        added = 0
-        rows = data if limit is None else data[:limit]
-        for rec in rows:
-            # Processed dataset mapping (we no longer support the legacy mock schema)
-            brand = rec.get('Company') or rec.get('brand')
-            model = rec.get('Model') or rec.get('model') or rec.get('Serie')
-
-            # Production Years can be a range or a list; take the latest year if present
-            years = re.findall(r"(\d{4})", rec.get('Production Years') or '')
-            year = int(min(years)) if years else 2024
-
-            price = 0.0
-            engine_type = rec.get('Fuel') or rec.get('Fuel System')
-            horsepower = extract_int(rec.get('Power(HP)'))
-            fuel_type = rec.get('Fuel')
-            transmission = rec.get('Gearbox')
-
-            # Parse cylinders (e.g. 'L4' -> 4)
-            cylinders = extract_int(rec.get('Cylinders'))
-            acceleration_0_100 = extract_float(rec.get('Acceleration 0-62 Mph (0-100kph)'))
-            vitesse_max = extract_int(rec.get('Top Speed'))
-
-            combined = rec.get('Combined mpg') or ''
-
-            # Additional processed dataset fields
-            drive_type = rec.get('Drive Type')
-            city_mpg = extract_float(rec.get('City mpg'))
-            highway_mpg = extract_float(rec.get('Highway mpg'))
+def iter_json_array(path, chunk_size=1 << 20):
+    """Yield the objects of a top-level JSON array one at a time.
+
+    Reads `chunk_size` characters at a time instead of loading the whole file,
+    so memory stays proportional to one record, not to the dataset.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = f.read(chunk_size).lstrip()
+        if not buf.startswith('['):
+            raise ValueError(f'{path}: expected a JSON array')
+        pos = 1
+        while True:
+            # Skip whitespace and separators, reading more input as needed.
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buf):
+                more = f.read(chunk_size)
+                if not more:
+                    raise ValueError(f'{path}: unterminated JSON array')
+                buf, pos = buf[pos:] + more, 0
+                continue
+            if buf[pos] == ']':
+                return
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # The record straddles the end of the buffer.
+                more = f.read(chunk_size)
+                if not more:
+                    raise
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield obj
+            pos = end
+
+def make_source_key(brand, model, year):
+    """Stable identity of a dataset record, stored in `cars.source_key`."""
+    return f'{brand}|{model}|{year}'
+
+def content_hash(rec):
+    """sha256 of the record's canonical JSON; changes only when the record does."""
+    canonical = json.dumps(rec, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def record_identity(rec):
+    """(brand, model, year) of a processed-dataset record."""
+    # Processed dataset mapping (we no longer support the legacy mock schema)
+    brand = rec.get('Company') or rec.get('brand')
+    model = rec.get('Model') or rec.get('model') or rec.get('Serie')
+
+    # Production Years can be a range or a list; take the earliest year if present
+    years = re.findall(r"(\d{4})", rec.get('Production Years') or '')
+    year = int(min(years)) if years else 2024
+    return brand, model, year
+
+def parse_record(rec):
+    """Map one processed-dataset record to `cars` column values."""
+    brand, model, year = record_identity(rec)
+
+    # Try to extract an mpg value (e.g. '30.5 mpg US')
+    combined_mpg = None
+    m2 = re.search(r"([\d\.]+)\s*mpg", rec.get('Combined mpg') or '', re.I)
+    if m2:
+        try:
+            combined_mpg = float(m2.group(1))
+        except ValueError:
             combined_mpg = None
-            # Try to extract an mpg value (e.g. '30.5 mpg US')
-            m2 = re.search(r"([\d\.]+)\s*mpg", combined, re.I)
-            if m2:
-                try:
-                    combined_mpg = float(m2.group(1))
-                except ValueError:
-                    combined_mpg = None
-
-            torque_nm = extract_int(rec.get('Torque(Nm)'))
-            length = rec.get('Length')
-            width = rec.get('Width')
-            height = rec.get('Height')
-            raw_spec = json.dumps(rec, ensure_ascii=False)
-
-            # Skip if a similar car already exists (brand+model+year)
-            exists = Car.query.filter_by(brand=brand, model=model, year=year).first()
-            if exists:
-                print(f"Skipping existing car: {brand} {model} ({year})")
+
+    return clear_metric_placeholders({
+        'brand': brand,
+        'model': model,
+        'year': year,
+        'price': 0.0,
+        'engine_type': rec.get('Fuel') or rec.get('Fuel System'),
+        'horsepower': extract_int(rec.get('Power(HP)')),
+        'fuel_type': rec.get('Fuel'),
+        'transmission': rec.get('Gearbox'),
+        'color': None,
+        'mileage': 0,
+        # Processed dataset fields; cylinders parsed e.g. 'L4' -> 4
+        'cylinders': extract_int(rec.get('Cylinders')),
+        'acceleration_0_100': extract_float(rec.get('Acceleration 0-62 Mph (0-100kph)')),
+        'vitesse_max': extract_int(rec.get('Top Speed')),
+        'drive_type': rec.get('Drive Type'),
+        'city_mpg': extract_float(rec.get('City mpg')),
+        'highway_mpg': extract_float(rec.get('Highway mpg')),
+        'combined_mpg': combined_mpg,
+        'torque_nm': extract_int(rec.get('Torque(Nm)')),
+        'length': rec.get('Length'),
+        'width': rec.get('Width'),
+        'height': rec.get('Height'),
+        'raw_spec': json.dumps(rec, ensure_ascii=False),
+        'source_key': make_source_key(brand, model, year),
+        'content_hash': content_hash(rec),
+    })
+
+def _get_app():
+    global app
+    if app is None:
+        # Like the scripts: the development default would echo every startup migration statement.
+        app = create_app(os.environ.get('FLASK_ENV', 'production'))
+    return app
+
+def import_data(path='data/processed/processed-dataset.json', limit=None, bulk=False, batch_size=5000,
+                upsert=False, prune=False, neighbors=False, workers=1):
+    with _get_app().app_context():
+        # Statement logging (SQLALCHEMY_ECHO with FLASK_ENV=development) dominates import time.
+        db.engine.echo = False
+
+        # Ensure new columns exist in the existing table (lightweight migration)
+        for col in ensure_columns(db.engine):
+            print(f"Added missing column to cars: {col}")
+
+        if prune and limit is not None:
+            raise ValueError('--prune needs the full dataset; it cannot be combined with --limit')
+        records = islice(iter_json_array(path), limit)
+        try:
+            if upsert or prune:
+                return _upsert_import(path, records, batch_size, prune)
+            if bulk:
+                return _bulk_import(path, records, batch_size)
+            return _row_import(path, records)
+        finally:
+            db.session.rollback()
+            invalidate_snapshot()
+            # Stored similar-car lists do not know the imported cars yet; without
+            # --neighbors they keep serving until the offline job runs.
+            if neighbors:
+                started = time.perf_counter()
+                count = build_neighbors(workers)
+                print(f"Computed similar cars for {count} cars in {time.perf_counter() - started:.1f}s")
+            # Bump last, so every response cached during the import is revalidated against its result.
+            bump_version()
+            db.session.commit()
+            forget_version()
+
+def _row_import(path, records):
+    resolver = DimensionResolver()
+    added = 0
+    total = 0
+    for rec in records:
+        total += 1
+        values = parse_record(rec)
+        brand, model, year = values['brand'], values['model'], values['year']
+
+        # Skip if a similar car already exists (brand+model+year)
+        exists = Car.query.filter_by(brand=brand, model=model, year=year).first()
+        if exists:
+            print(f"Skipping existing car: {brand} {model} ({year})")
+            continue
+
+        car = Car(**values)
+        refresh_attendee_spec(car)
+        assign_dimensions(car, resolver)
+        db.session.add(car)
+        record_change(None, snapshot(car))
+        added += 1
+    db.session.commit()
+    print(f"Imported {added} new cars into DB from {path}: {app.config['SQLALCHEMY_DATABASE_URI']} (skipped {total-added} duplicates)")
+    return added
+
+def _bulk_import(path, records, batch_size):
+    """Insert with one executemany per batch and one transaction per batch.
+
+    Duplicates (brand+model+year) are detected against a key set loaded with a
+    single query instead of one SELECT per record. Secondary indexes and the
+    search-index triggers are suspended during the load and rebuilt once at
+    the end, which is where most of the per-row cost went. The stats summary
+    tables are likewise rebuilt once instead of taking a delta per row.
+
+    Meant for offline loads: while it runs, a serving API sorts without the
+    (column, id) indexes and admin edits miss the search index.
+    """
+    started = time.perf_counter()
+    seen = {tuple(row) for row in db.session.query(Car.brand, Car.model, Car.year)}
+    last_id = db.session.query(db.func.max(Car.id)).scalar() or 0
+    resolver = DimensionResolver()
+    db.session.commit()
+    insert = Car.__table__.insert()
+    added = 0
+    total = 0
+    batch = []
+
+    def flush():
+        nonlocal added
+        if batch:
+            db.session.execute(insert, batch)
+            db.session.commit()
+            added += len(batch)
+            batch.clear()
+
+    drop_indexes(db.engine)
+    drop_search_triggers(db.engine)
+    try:
+        for rec in records:
+            total += 1
+            values = parse_record(rec)
+            key = (values['brand'], values['model'], values['year'])
+            if key in seen:
                 continue
+            seen.add(key)
+            # Build from the record dict already in hand rather than re-parsing raw_spec.
+            spec = build_attendee_spec(SimpleNamespace(**{**values, 'raw_spec': rec}))
+            values['attendee_spec'] = json_codec.dumps(spec).decode('utf-8')
+            values['brand_id'], values['serie_id'] = resolver.ids(values['brand'], values['model'])
+            batch.append(values)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        # Rows from batches committed before a failure still get indexed, and
+        # the search triggers come back even if rebuilding an index fails.
+        db.session.rollback()
+        try:
+            ensure_indexes(db.engine)
+        finally:
+            index_rows_after(db.engine, last_id)
+            ensure_search_index(db.engine)
+            rebuild_stats()
+
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed else float('inf')
+    print(f"Bulk-imported {added} new cars into DB from {path}: {app.config['SQLALCHEMY_DATABASE_URI']} "
+          f"(skipped {total-added} duplicates) in {elapsed:.1f}s, {rate:,.0f} rows/sec")
+    return added
+
+
+def _upsert_import(path, records, batch_size, prune):
+    """Apply only the delta between the dataset and the imported rows.
+
+    Rows are matched on `source_key`. New keys are inserted, rows whose
+    `content_hash` differs are rewritten from the record, and unchanged rows
+    are not touched. With `prune`, imported rows whose key is no longer in the
+    dataset are deleted; cars created through the admin API (no source_key)
+    are never pruned. Each batch applies its stats deltas in its own
+    transaction, so the cost follows the size of the delta, not the catalog.
+    Likewise, the similar-car lists of changed and deleted rows are dropped
+    and the rows queued for `scripts/build_neighbors.py --queued`.
 
-            car = Car(
-                brand=brand,
-                model=model,
-                year=year,
-                price=price,
-                engine_type=engine_type,
-                horsepower=horsepower,
-                fuel_type=fuel_type,
-                transmission=transmission,
-                color=None,
-                mileage=0,
-                # Processed dataset fields
-                cylinders=cylinders,
-                acceleration_0_100=acceleration_0_100,
-                vitesse_max=vitesse_max,
-                drive_type=locals().get('drive_type'),
-                city_mpg=locals().get('city_mpg'),
-                highway_mpg=locals().get('highway_mpg'),
-                combined_mpg=locals().get('combined_mpg'),
-                torque_nm=locals().get('torque_nm'),
-                length=locals().get('length'),
-                width=locals().get('width'),
-                height=locals().get('height'),
-                raw_spec=locals().get('raw_spec')
+    Rows imported before `source_key` existed are adopted the first time
+    their brand+model+year shows up, hashing their stored raw_spec so an
+    unchanged record is not rewritten.
+    """
+    started = time.perf_counter()
+    imported = {key: (car_id, digest) for car_id, key, digest in
+                db.session.query(Car.id, Car.source_key, Car.content_hash).filter(Car.source_key.isnot(None))}
+    legacy = {make_source_key(*row[1:]): row[0] for row in
+              db.session.query(Car.id, Car.brand, Car.model, Car.year).filter(Car.source_key.is_(None))}
+    resolver = DimensionResolver()
+    table = Car.__table__
+    insert = table.insert()
+    update = table.update().where(table.c.id == bindparam('_id'))
+    counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    total = 0
+    seen = set()
+    inserts, updates, adoptions = [], [], []
+
+    def flush(force=False):
+        if not force and len(inserts) + len(updates) + len(adoptions) < batch_size:
+            return
+        before = load_snapshots([values['_id'] for values in updates])
+        if inserts:
+            db.session.execute(insert, inserts)
+            queue_neighbors(db.session.scalars(select(Car.id).where(
+                Car.source_key.in_([values['source_key'] for values in inserts]))), changed=True)
+        if updates:
+            db.session.execute(update, updates)
+        for values in updates:
+            invalidate_neighbors(values['_id'])
+        for values in inserts:
+            record_change(None, snapshot(SimpleNamespace(**values)))
+        for values in updates:
+            record_change(before[values['_id']], snapshot(SimpleNamespace(**values)))
+        if adoptions:
+            # Only the provenance columns; leaves updated_at and the search index alone.
+            db.session.execute(
+                text('UPDATE cars SET source_key = :source_key, content_hash = :content_hash WHERE id = :_id'),
+                adoptions,
             )
-            db.session.add(car)
-            added += 1
         db.session.commit()
-        print(f"Imported {added} new cars into DB from {path}: {app.config['SQLALCHEMY_DATABASE_URI']} (skipped {len(data)-added} duplicates)")
+        counts['added'] += len(inserts)
+        counts['updated'] += len(updates)
+        counts['unchanged'] += len(adoptions)
+        inserts.clear()
+        updates.clear()
+        adoptions.clear()
+
+    for rec in records:
+        total += 1
+        key = make_source_key(*record_identity(rec))
+        if key in seen:
+            continue
+        seen.add(key)
+        digest = content_hash(rec)
+
+        if key in imported:
+            car_id, stored = imported[key]
+            if stored == digest:
+                counts['unchanged'] += 1
+                continue
+        elif key in legacy:
+            car_id = legacy[key]
+            stored_spec = db.session.query(Car.raw_spec).filter(Car.id == car_id).scalar()
+            try:
+                stored = content_hash(json.loads(stored_spec)) if stored_spec else None
+            except ValueError:
+                stored = None
+            if stored == digest:
+                adoptions.append({'_id': car_id, 'source_key': key, 'content_hash': digest})
+                flush()
+                continue
+        else:
+            car_id = None
+
+        values = parse_record(rec)
+        spec = build_attendee_spec(SimpleNamespace(**{**values, 'raw_spec': rec}))
+        values['attendee_spec'] = json_codec.dumps(spec).decode('utf-8')
+        values['brand_id'], values['serie_id'] = resolver.ids(values['brand'], values['model'])
+        if car_id is None:
+            inserts.append(values)
+        else:
+            values['_id'] = car_id
+            updates.append(values)
+        flush()
+    flush(force=True)
+
+    if prune:
+        gone = [car_id for key, (car_id, _digest) in imported.items() if key not in seen]
+        for i in range(0, len(gone), batch_size):
+            chunk = gone[i:i + batch_size]
+            for before in load_snapshots(chunk).values():
+                record_change(before, None)
+            for car_id in chunk:
+                invalidate_neighbors(car_id)
+            db.session.execute(table.delete().where(table.c.id.in_(chunk)))
+            db.session.commit()
+            counts['deleted'] += len(chunk)
+
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed else float('inf')
+    print(f"Upserted {path} into DB: {app.config['SQLALCHEMY_DATABASE_URI']}: "
+          f"{counts['added']} added, {counts['updated']} updated, {counts['unchanged']} unchanged, "
+          f"{counts['deleted']} deleted in {elapsed:.1f}s, {rate:,.0f} rows/sec")
+    return counts
 
 
 if __name__ == '__main__':
@@ -140,5 +386,13 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Import cars dataset into DB')
     parser.add_argument('--path', help='Path to JSON dataset', default='data/processed/processed-dataset.json')
     parser.add_argument('--limit', help='Limit number of rows to import (for testing)', type=int)
+    parser.add_argument('--bulk', help='Batched executemany inserts with in-memory de-duplication (fast path for large datasets; '
+                        'offline only: indexes and search triggers are suspended during the load)', action='store_true')
+    parser.add_argument('--batch-size', help='Rows per insert batch / transaction in --bulk and --upsert mode', type=int, default=5000)
+    parser.add_argument('--upsert', help='Insert new records and rewrite only records whose content hash changed', action='store_true')
+    parser.add_argument('--prune', help='With --upsert: also delete imported cars no longer in the dataset', action='store_true')
+    parser.add_argument('--neighbors', help='Recompute the precomputed similar-cars table after the import', action='store_true')
+    parser.add_argument('--workers', help='Processes used by --neighbors', type=int, default=1)
     args = parser.parse_args()
-    import_data(path=args.path, limit=args.limit)
\ No newline at end of file
+    import_data(path=args.path, limit=args.limit, bulk=args.bulk, batch_size=args.batch_size,
+                upsert=args.upsert, prune=args.prune, neighbors=args.neighbors, workers=args.workers)
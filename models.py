@@ -5,9 +5,33 @@ from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
+# Columns `/cars` can be sorted by. Each one gets a (column, id) index so both
+# ORDER BY column, id and keyset "seek past (value, id)" queries are index scans.
+SORTABLE_COLUMNS = (
+    'id', 'brand', 'model', 'year', 'price', 'cylinders', 'horsepower',
+    'fuel_type', 'transmission', 'drive_type', 'acceleration_0_100', 'vitesse_max',
+    'city_mpg', 'highway_mpg', 'combined_mpg', 'torque_nm', 'created_at', 'updated_at',
+)
+
+# Ranking metrics the dataset fills with 0 when unknown. They are stored as
+# NULL instead (importer, admin writes, startup migration): NULLs sort first in
+# the (column, id) sort indexes, so "known values only" is the range seek
+# `column > NULL` rather than a filter over placeholder rows.
+RANKING_METRICS = ('horsepower', 'combined_mpg', 'acceleration_0_100', 'vitesse_max', 'torque_nm')
+
 class Car(db.Model):
     """Car model for storing car specifications"""
     __tablename__ = 'cars'
+    __table_args__ = tuple(
+        db.Index(f'ix_cars_{name}_id', name, 'id') for name in SORTABLE_COLUMNS if name != 'id'
+    ) + (
+        # A unique index rather than a UNIQUE column so `ensure_indexes` can add
+        # it to existing tables (SQLite cannot ALTER in a constraint).
+        db.Index('ux_cars_source_key', 'source_key', unique=True),
+        # (key, id) like the sort indexes: brand / serie pages are id-ordered.
+        db.Index('ix_cars_brand_id_id', 'brand_id', 'id'),
+        db.Index('ix_cars_serie_id_id', 'serie_id', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     brand = db.Column(db.String(100), nullable=False, index=True)
@@ -41,6 +65,21 @@ class Car(db.Model):
     height = db.Column(db.String(100))
     drive_type = db.Column(db.String(50))
     raw_spec = db.Column(db.Text)
+    # raw_spec merged with the canonical columns, as served to attendees (JSON).
+    # Computed on every write so read endpoints don't rebuild it per request.
+    attendee_spec = db.Column(db.Text)
+
+    # Import provenance: `source_key` identifies the dataset record (brand|model|year)
+    # and `content_hash` is the sha256 of that record as last imported. Both stay
+    # NULL for cars created through the admin API.
+    source_key = db.Column(db.String(255))
+    content_hash = db.Column(db.String(64))
+
+    # Normalized brand / serie (see services/dimensions.py). Plain integer
+    # columns rather than FOREIGN KEYs so `ensure_columns` can add them to an
+    # existing SQLite table; NULL only for a blank brand or model.
+    brand_id = db.Column(db.Integer)
+    serie_id = db.Column(db.Integer)
 
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -89,6 +128,113 @@ class Car(db.Model):
         return f'<Car {self.brand} {self.model} ({self.year})>'
 
 
+class Brand(db.Model):
+    """One row per brand; `name_key` is the case-folded name, so case variants share a row"""
+    __tablename__ = 'brands'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name_key = db.Column(db.String(100), nullable=False, unique=True)
+    # Spelling of the first car seen with this brand.
+    name = db.Column(db.String(100), nullable=False)
+
+
+class Serie(db.Model):
+    """One row per model series of a brand, keyed like `Brand`"""
+    __tablename__ = 'series'
+    __table_args__ = (db.UniqueConstraint('brand_id', 'name_key'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    brand_id = db.Column(db.Integer, db.ForeignKey('brands.id'), nullable=False)
+    name_key = db.Column(db.String(100), nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=False)
+
+
+class CarNeighbor(db.Model):
+    """Precomputed /cars/<id>/similar result: `car_id`'s `rank`-th most similar car (see services/neighbors.py)"""
+    __tablename__ = 'car_neighbors'
+    __table_args__ = (
+        db.Index('ix_car_neighbors_neighbor_id', 'neighbor_id'),
+        # Finds the lists whose last entry a new car may beat.
+        db.Index('ix_car_neighbors_rank_score', 'rank', 'score'),
+    )
+
+    car_id = db.Column(db.Integer, primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)
+    neighbor_id = db.Column(db.Integer, nullable=False)
+    # Unrounded similarity score; NULL when the two cars share no feature.
+    score = db.Column(db.Float)
+
+
+class CarNeighborQueue(db.Model):
+    """Car whose stored similar-car list the offline job must recompute (see services/neighbors.py)"""
+    __tablename__ = 'car_neighbor_queue'
+
+    # Queuing order: a build covers the entries queued before it started.
+    id = db.Column(db.Integer, primary_key=True)
+    car_id = db.Column(db.Integer, nullable=False)
+    # The car itself was created, updated or deleted, not just its list dropped.
+    changed = db.Column(db.Boolean, nullable=False, default=False)
+
+
+class CatalogVersion(db.Model):
+    """Single-row counter bumped by every catalog write (see services/catalog_version.py)"""
+    __tablename__ = 'catalog_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+
+# Summary tables behind /cars/stats, kept current by services/stats.py on every
+# write. `brand_key` is the stripped, upper-cased brand ('UNKNOWN' when blank),
+# so case variants of one brand share a row.
+
+class BrandStat(db.Model):
+    """Running count and per-metric sums / non-null counts for one brand"""
+    __tablename__ = 'brand_stats'
+
+    brand_key = db.Column(db.String(100), primary_key=True)
+    car_count = db.Column(db.Integer, nullable=False, default=0)
+    # Derived from brand_model_stats / brand_year_stats whenever they change.
+    model_count = db.Column(db.Integer, nullable=False, default=0)
+    year_min = db.Column(db.Integer)
+    year_max = db.Column(db.Integer)
+
+    sum_combined_mpg = db.Column(db.Float, nullable=False, default=0.0)
+    n_combined_mpg = db.Column(db.Integer, nullable=False, default=0)
+    sum_horsepower = db.Column(db.Float, nullable=False, default=0.0)
+    n_horsepower = db.Column(db.Integer, nullable=False, default=0)
+    sum_acceleration_0_100 = db.Column(db.Float, nullable=False, default=0.0)
+    n_acceleration_0_100 = db.Column(db.Integer, nullable=False, default=0)
+    sum_vitesse_max = db.Column(db.Float, nullable=False, default=0.0)
+    n_vitesse_max = db.Column(db.Integer, nullable=False, default=0)
+
+
+class BrandYearStat(db.Model):
+    """Number of cars per brand and year (gives the brand's year range)"""
+    __tablename__ = 'brand_year_stats'
+
+    brand_key = db.Column(db.String(100), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    car_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class BrandModelStat(db.Model):
+    """Number of cars per brand and model (gives the brand's distinct model count)"""
+    __tablename__ = 'brand_model_stats'
+
+    brand_key = db.Column(db.String(100), primary_key=True)
+    model = db.Column(db.String(100), primary_key=True)
+    car_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DriveTypeStat(db.Model):
+    """Number of cars per drive type ('Unknown' when missing)"""
+    __tablename__ = 'drive_type_stats'
+
+    drive_type = db.Column(db.String(50), primary_key=True)
+    car_count = db.Column(db.Integer, nullable=False, default=0)
+
+
 class User(db.Model):
     """User model for authentication"""
     __tablename__ = 'users'
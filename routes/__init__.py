@@ -6,7 +6,9 @@ api = Blueprint('api', __name__, url_prefix='/api/v1')
 from .auth import auth_bp
 from .admin import admin_bp
 from .attendee import attendee_bp
+from .batch import batch_bp
 
 api.register_blueprint(auth_bp)
 api.register_blueprint(admin_bp)
-api.register_blueprint(attendee_bp)
\ No newline at end of file
+api.register_blueprint(attendee_bp)
+api.register_blueprint(batch_bp)
\ No newline at end of file
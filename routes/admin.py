@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 from services.car_service import create_car, update_car, delete_car, get_car
+from services.response_cache import response_cache_stats
+from services.sqlite_profile import database_diagnostics
 from models import db
 from functools import wraps
 
@@ -169,4 +171,42 @@ def delete_car_route(car_id):
         return jsonify({'message':'Car deleted'}), 200
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error':str(e)}), 500
\ No newline at end of file
+        return jsonify({'error':str(e)}), 500
+
+
+@admin_bp.route('/cache', methods=['GET'])
+@admin_required
+def cache_stats_route():
+    """
+    Response cache counters (admin)
+    ---
+    tags:
+      - Admin
+    security:
+      - bearerAuth: []
+    responses:
+      200:
+        description: Entries, hits, misses and evictions of this worker's response cache, with per-endpoint hits and misses
+      403:
+        description: Admin privileges required
+    """
+    return jsonify(response_cache_stats()), 200
+
+
+@admin_bp.route('/database', methods=['GET'])
+@admin_required
+def database_diagnostics_route():
+    """
+    Database settings in effect (admin)
+    ---
+    tags:
+      - Admin
+    security:
+      - bearerAuth: []
+    responses:
+      200:
+        description: Dialect and driver; for SQLite also the version, database and WAL file sizes, the configured pragma profile (SQLITE_PRAGMAS) and the values a pooled connection reports
+      403:
+        description: Admin privileges required
+    """
+    return jsonify(database_diagnostics()), 200
@@ -1,127 +1,131 @@
-from flask import Blueprint, request, jsonify, Response
-from collections import OrderedDict
+from flask import Blueprint, current_app, g, request, Response, stream_with_context
 from services.car_service import (
-    get_cars, get_car, search_cars, get_stats,
+    get_cars, get_car, iter_cars, search_cars, get_stats,
     get_cars_by_brand, get_cars_by_serie, get_cars_by_year,
     get_brands, get_models_by_brand, get_years,
-    reorder_car_spec, compare_cars, compare_by_serie, compare_by_brand, 
+    get_attendee_spec, get_cars_by_ids, car_entry, parse_fields, compare_cars, compare_by_serie, compare_by_brand, 
     compare_by_year, get_top_cars, get_similar_cars,
     get_available_metrics, get_available_series, get_available_brands, get_available_years
 )
-import json
+from services.catalog_version import current_version
+from services.compression import negotiate_encoding
+from services.json_codec import dumps
+from services.response_cache import cached_response
+import csv
+import hashlib
+import io
 
 attendee_bp = Blueprint('attendee', __name__, url_prefix='')
 
 
-def _safe_raw_spec(raw_spec: str | None):
-  if not raw_spec:
-    return {}
-  try:
-    return json.loads(raw_spec)
-  except Exception:
-    # Some legacy rows may contain non-JSON strings in raw_spec.
-    return {}
-
-
-def _strip_keys(spec: dict, keys: list[str]) -> dict:
-  for k in keys:
-    spec.pop(k, None)
-  return spec
-
-
-def _merge_spec_with_canonical(car) -> dict:
-  base = _safe_raw_spec(getattr(car, 'raw_spec', None))
-  if not isinstance(base, dict):
-    base = {}
-
-  merged: dict = dict(base)
-
-  # Never expose these legacy/mock fields in attendee outputs.
-  _strip_keys(
-    merged,
-    [
-      'price', 'Price',
-      'color', 'Color',
-      'created_at', 'createdAt', 'Created At', 'Created',
-      'updated_at', 'updatedAt', 'Updated At', 'Updated',
-    ],
-  )
-
-  def set_field(key: str, value, aliases: list[str]):
-    if value is None:
-      return
-    if isinstance(value, str) and not value.strip():
-      return
-    # Many dataset rows use 0 as a placeholder for "unknown" numeric values.
-    # Do not surface those in attendee-visible specs.
-    if isinstance(value, (int, float)) and value <= 0:
-      return
-    # Remove potential duplicates from raw spec before setting canonical field.
-    _strip_keys(merged, aliases)
-    merged[key] = value
-
-  # Put canonical fields first (frontend renders in insertion order).
-  ordered = OrderedDict()
-
-  # Identity-like fields (use the dataset/raw_spec naming)
-  brand = getattr(car, 'brand', None)
-  model = getattr(car, 'model', None)
-  year = getattr(car, 'year', None)
-  set_field('Company', brand, ['brand', 'Brand', 'Company'])
-  set_field('Model', model, ['model', 'Model'])
-  set_field('Production Years', str(year) if year is not None else None, ['year', 'Year', 'Production Years'])
-
-  # Canonical processed fields mapped to raw_spec-style labels
-  set_field('Cylinders', getattr(car, 'cylinders', None), ['cylinders', 'Cylinders'])
-  set_field('Fuel', getattr(car, 'fuel_type', None), ['fuel_type', 'Fuel Type', 'Fuel'])
-  set_field('Gearbox', getattr(car, 'transmission', None), ['transmission', 'Transmission', 'Gearbox'])
-  set_field('Drive Type', getattr(car, 'drive_type', None), ['drive_type', 'Drive type', 'Drive Type', 'Drive'])
-  set_field('Top Speed', getattr(car, 'vitesse_max', None), ['vitesse_max', 'Top Speed', 'Vitesse Max', 'Vitesse max'])
-
-  # The dataset uses a slightly odd key (sometimes with a trailing newline).
-  set_field('Power(HP)', getattr(car, 'horsepower', None), ['horsepower', 'Horsepower', 'Power(HP)', 'Power(HP)\n', 'Power(HP)\r\n'])
-  set_field('Torque(Nm)', getattr(car, 'torque_nm', None), ['torque_nm', 'Torque', 'Torque (Nm)', 'Torque Nm', 'Torque(Nm)'])
-  set_field(
-    'Acceleration 0-62 Mph (0-100kph)',
-    getattr(car, 'acceleration_0_100', None),
-    [
-      'acceleration_0_100',
-      'Acceleration 0-100',
-      'Acceleration 0-62 Mph (0-100kph)',
-      '0-100',
-      '0-100 km/h',
-      '0-100km/h',
-    ],
-  )
-
-  set_field('Length', getattr(car, 'length', None), ['length', 'Length'])
-  set_field('Width', getattr(car, 'width', None), ['width', 'Width'])
-  set_field('Height', getattr(car, 'height', None), ['height', 'Height'])
-  set_field('City mpg', getattr(car, 'city_mpg', None), ['city_mpg', 'City MPG', 'City mpg'])
-  set_field('Highway mpg', getattr(car, 'highway_mpg', None), ['highway_mpg', 'Highway MPG', 'Highway mpg'])
-  set_field('Combined mpg', getattr(car, 'combined_mpg', None), ['combined_mpg', 'Combined MPG', 'Combined mpg'])
-
-  # Materialize the ordered-first fields.
-  for k in list(merged.keys()):
-    # preserve any base keys that were not overwritten
-    pass
-  # Insert canonical keys first in stable order.
-  for key in [
-    'Company','Model','Production Years',
-    'Cylinders','Fuel','Gearbox','Drive Type',
-    'Power(HP)','Torque(Nm)','Acceleration 0-62 Mph (0-100kph)','Top Speed',
-    'Length','Width','Height',
-    'City mpg','Highway mpg','Combined mpg',
-  ]:
-    if key in merged:
-      ordered[key] = merged[key]
-
-  # Append the remaining raw-spec fields (already de-duped).
-  for k, v in merged.items():
-    if k not in ordered:
-      ordered[k] = v
-
-  return dict(ordered)
+def _request_etag() -> str:
+  """ETag of a GET: the catalog version plus a digest of path, query and negotiated encoding."""
+  key = repr((request.path, sorted(request.args.items(multi=True)), negotiate_encoding()))
+  return f'{current_version()}-{hashlib.sha1(key.encode()).hexdigest()[:16]}'
+
+
+@attendee_bp.before_request
+def _not_modified():
+  """Answer a GET whose If-None-Match still matches with 304, before any query or encoding."""
+  if request.method not in ('GET', 'HEAD'):
+    return None
+  g.etag = _request_etag()
+  if g.etag in request.if_none_match:
+    return Response(status=304)
+  return None
+
+
+@attendee_bp.after_request
+def _cache_headers(response):
+  etag = g.get('etag')
+  if etag and response.status_code in (200, 304):
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = current_app.config['HTTP_CACHE_CONTROL']
+  return response
+
+
+def _json_response(body, status=200):
+  """Compact JSON response (key order preserved); indented with ?pretty=1."""
+  pretty = request.args.get('pretty', '').lower() in ('1', 'true')
+  return Response(dumps(body, pretty=pretty), status=status, mimetype='application/json')
+
+
+def _cached_json_response(endpoint, params, build):
+  """Like _json_response(*build()), served from the response cache when possible.
+
+  `params` are the normalized arguments `build` depends on; hits skip both
+  the queries and the encoding.
+  """
+  pretty = request.args.get('pretty', '').lower() in ('1', 'true')
+
+  def compute():
+    body, status = build()
+    return dumps(body, pretty=pretty), status
+
+  data, status, hit = cached_response(endpoint, {**params, 'pretty': pretty}, compute)
+  response = Response(data, status=status, mimetype='application/json')
+  response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+  return response
+
+
+# Query parameters accepted as filters by /cars and /cars/export.
+_CAR_FILTER_PARAMS = (
+  'q', 'brand', 'model', 'min_year', 'max_year', 'min_price', 'max_price',
+  'fuel_type', 'transmission', 'drive_type', 'cylinders',
+  'min_horsepower', 'max_horsepower', 'min_combined_mpg', 'max_combined_mpg',
+  'max_acceleration_0_100', 'min_vitesse_max', 'max_vitesse_max', 'min_torque_nm', 'max_torque_nm',
+)
+
+# Canonical columns written by the CSV export, in column order.
+_EXPORT_CSV_COLUMNS = (
+  'id', 'brand', 'model', 'year', 'cylinders', 'engine_type', 'horsepower', 'fuel_type',
+  'transmission', 'acceleration_0_100', 'vitesse_max', 'drive_type', 'city_mpg',
+  'highway_mpg', 'combined_mpg', 'torque_nm', 'length', 'width', 'height',
+)
+
+
+def _car_filters_from_request() -> dict:
+  return {name: request.args.get(name) for name in _CAR_FILTER_PARAMS}
+
+
+def _fields_from_request():
+  """Parsed `fields=` parameter (None when absent); raises ValueError on unknown names."""
+  return parse_fields(request.args.get('fields'))
+
+
+def _page_fields(result, page, per_page) -> dict:
+  """Pagination keys for a list body: totals for page mode, next_cursor for cursor mode."""
+  if hasattr(result, 'next_cursor'):
+    return {'per_page': result.per_page, 'next_cursor': result.next_cursor}
+  return {'total': result.total, 'page': page, 'per_page': per_page, 'pages': result.pages}
+
+
+def _buffered(lines, size=64 * 1024):
+  """Group small byte strings into ~`size` chunks so each write is worth a syscall."""
+  buf = []
+  buffered = 0
+  for line in lines:
+    buf.append(line)
+    buffered += len(line)
+    if buffered >= size:
+      yield b''.join(buf)
+      buf, buffered = [], 0
+  if buf:
+    yield b''.join(buf)
+
+
+def _csv_lines(cars):
+  out = io.StringIO()
+  writer = csv.writer(out)
+  writer.writerow(_EXPORT_CSV_COLUMNS)
+  for car in cars:
+    writer.writerow([getattr(car, name) for name in _EXPORT_CSV_COLUMNS])
+    yield out.getvalue().encode('utf-8')
+    out.seek(0)
+    out.truncate()
+  if out.tell():
+    yield out.getvalue().encode('utf-8')
 
 
 @attendee_bp.route('/cars', methods=['GET'])
@@ -152,6 +156,25 @@ def get_cars_route():
         name: page
         schema:
           type: integer
+      - in: query
+        name: sort_by
+        schema:
+          type: string
+      - in: query
+        name: order
+        schema:
+          type: string
+          enum: [asc, desc]
+      - in: query
+        name: cursor
+        schema:
+          type: string
+        description: Keyset pagination. Pass an empty value for the first page, then the returned `next_cursor`. Replaces page/total/pages with next_cursor.
+      - in: query
+        name: fields
+        schema:
+          type: string
+        description: Comma-separated columns to return per car instead of `spec` (e.g. brand,model,year,horsepower). Add `spec` to include the full spec too.
     responses:
       200:
         description: A list of cars. Returns the original source dataset objects (raw dataset JSON) by default.
@@ -168,44 +191,85 @@ def get_cars_route():
                 page: {type: integer}
                 per_page: {type: integer}
                 pages: {type: integer}
+                next_cursor: {type: string}
     """
-    filters = {
-      'q': request.args.get('q'),
-      'brand': request.args.get('brand'),
-      'model': request.args.get('model'),
-      'min_year': request.args.get('min_year'),
-      'max_year': request.args.get('max_year'),
-      'min_price': request.args.get('min_price'),
-      'max_price': request.args.get('max_price'),
-      'fuel_type': request.args.get('fuel_type'),
-      'transmission': request.args.get('transmission'),
-      'drive_type': request.args.get('drive_type'),
-      'cylinders': request.args.get('cylinders'),
-      'min_horsepower': request.args.get('min_horsepower'),
-      'max_horsepower': request.args.get('max_horsepower'),
-      'min_combined_mpg': request.args.get('min_combined_mpg'),
-      'max_combined_mpg': request.args.get('max_combined_mpg'),
-      'max_acceleration_0_100': request.args.get('max_acceleration_0_100'),
-      'min_vitesse_max': request.args.get('min_vitesse_max'),
-      'max_vitesse_max': request.args.get('max_vitesse_max'),
-      'min_torque_nm': request.args.get('min_torque_nm'),
-      'max_torque_nm': request.args.get('max_torque_nm'),
-    }
+    filters = _car_filters_from_request()
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     sort_by = request.args.get('sort_by', 'id')
     order = request.args.get('order', 'asc')
-    paginated = get_cars(filters, sort_by, order, page, per_page)
-    cars_list = [{'id': car.id, 'spec': _merge_spec_with_canonical(car)} for car in paginated.items]
-    body = {
-        'cars': cars_list,
-        'total': paginated.total,
-        'page': page,
-        'per_page': per_page,
-        'pages': paginated.pages
-    }
-    # Use explicit JSON serialization with sort_keys=False to preserve field order
-    return Response(json.dumps(body, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), 200
+    cursor = request.args.get('cursor')
+    try:
+        fields = _fields_from_request()
+    except ValueError as e:
+        return _json_response({'error': str(e)}, 400)
+
+    def build():
+        try:
+            paginated = get_cars(filters, sort_by, order, page, per_page, cursor, fields)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        cars_list = [car_entry(car, fields) for car in paginated.items]
+        return {'cars': cars_list, **_page_fields(paginated, page, per_page)}, 200
+
+    # `cursor=` (empty) starts keyset mode, so the key records the mode: the cache drops empty parameters.
+    params = {**filters, 'page': page, 'per_page': per_page, 'sort_by': sort_by, 'order': order, 'cursor': cursor,
+              'mode': 'page' if cursor is None else 'cursor', 'fields': fields}
+    return _cached_json_response('cars', params, build)
+
+
+@attendee_bp.route('/cars/export', methods=['GET'])
+def export_cars_route():
+    """
+    Stream the whole (filtered) catalog as NDJSON or CSV
+    ---
+    tags:
+      - Cars
+    parameters:
+      - in: query
+        name: format
+        schema:
+          type: string
+          enum: [ndjson, csv]
+        description: ndjson (default) writes one {"id", "spec"} object per line; csv writes the canonical columns
+      - in: query
+        name: brand
+        schema:
+          type: string
+        description: Accepts the same filters as GET /cars (q, brand, model, min_year, ...)
+      - in: query
+        name: sort_by
+        schema:
+          type: string
+      - in: query
+        name: order
+        schema:
+          type: string
+          enum: [asc, desc]
+    responses:
+      200:
+        description: Streamed rows. Sent gzip- or brotli-encoded when the client accepts it.
+      400:
+        description: Unsupported format or invalid filter value
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return _json_response({'error': 'format must be ndjson or csv'}, 400)
+    try:
+        cars = iter_cars(_car_filters_from_request(), request.args.get('sort_by', 'id'), request.args.get('order', 'asc'))
+    except ValueError as e:
+        return _json_response({'error': str(e)}, 400)
+
+    if fmt == 'ndjson':
+        chunks = _buffered(dumps({'id': car.id, 'spec': get_attendee_spec(car)}) + b'\n' for car in cars)
+        mimetype = 'application/x-ndjson'
+    else:
+        chunks = _buffered(_csv_lines(cars))
+        mimetype = 'text/csv'
+
+    # Compressed on the fly by services/compression.py when the client accepts it.
+    headers = {'Content-Disposition': f'attachment; filename=cars.{fmt}'}
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
 
 
 @attendee_bp.route('/cars/<int:car_id>', methods=['GET'])
@@ -237,11 +301,108 @@ def get_car_route(car_id):
     """
     car = get_car(car_id)
     if not car:
-        return jsonify({'error': 'Car not found'}), 404
+        return _json_response({'error': 'Car not found'}, 404)
     # For details, return a merged spec so admin-updated canonical fields are visible
     # even when the source dataset lives in raw_spec.
-    body = {'car': _merge_spec_with_canonical(car)}
-    return Response(json.dumps(body, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), 200
+    body = {'car': get_attendee_spec(car)}
+    return _json_response(body)
+
+
+def _batch_ids_from_request():
+  """Car ids of a /cars/batch request: `?ids=1,2,3` or a JSON body {"ids": [...]}.
+
+  Raises ValueError when they are missing, not integers or more than BATCH_MAX_IDS.
+  """
+  body = request.get_json(silent=True) if request.method == 'POST' else None
+  if isinstance(body, dict) and body.get('ids') is not None:
+    ids = body['ids']
+    if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+      raise ValueError('ids must be an array of integers')
+  else:
+    try:
+      ids = [int(i) for i in request.args.get('ids', '').split(',') if i.strip()]
+    except ValueError:
+      raise ValueError('Invalid car IDs format. Use comma-separated integers.')
+  if not ids:
+    raise ValueError('ids required. Provide as ?ids=1,2,3 or in POST body with {"ids": [1,2,3]}')
+  limit = current_app.config['BATCH_MAX_IDS']
+  if len(ids) > limit:
+    raise ValueError(f'At most {limit} ids per request (got {len(ids)})')
+  return ids
+
+
+@attendee_bp.route('/cars/batch', methods=['GET', 'POST'])
+def cars_batch_route():
+    """
+    Get many cars by id in one request
+    ---
+    tags:
+      - Cars
+    parameters:
+      - in: query
+        name: ids
+        schema:
+          type: string
+        description: Comma-separated car IDs (e.g., "1,2,3"); at most BATCH_MAX_IDS (default 100)
+      - in: query
+        name: fields
+        schema:
+          type: string
+        description: Comma-separated columns to return per car instead of `spec` (e.g. brand,model,year,horsepower). Add `spec` to include the full spec too.
+    requestBody:
+      description: POST form for long id lists
+      required: false
+      content:
+        application/json:
+          schema:
+            type: object
+            properties:
+              ids:
+                type: array
+                items:
+                  type: integer
+              fields:
+                type: array
+                items:
+                  type: string
+    responses:
+      200:
+        description: One entry per requested id, in request order. Ids with no car get `{"id", "error": "Car not found"}` and are listed in `not_found`.
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                cars:
+                  type: array
+                  items:
+                    type: object
+                count:
+                  type: integer
+                  description: Number of cars found
+                not_found:
+                  type: array
+                  items:
+                    type: integer
+      400:
+        description: Missing or malformed ids, too many ids or unknown fields
+    """
+    try:
+        ids = _batch_ids_from_request()
+        body = request.get_json(silent=True) if request.method == 'POST' else None
+        if isinstance(body, dict) and isinstance(body.get('fields'), list):
+            fields = parse_fields(','.join(str(name) for name in body['fields']))
+        else:
+            fields = _fields_from_request()
+    except ValueError as e:
+        return _json_response({'error': str(e)}, 400)
+
+    def build():
+        cars = get_cars_by_ids(ids, fields)
+        not_found = [entry['id'] for entry in cars if 'error' in entry]
+        return {'cars': cars, 'count': len(cars) - len(not_found), 'not_found': not_found}, 200
+
+    return _cached_json_response('cars.batch', {'ids': ids, 'fields': fields}, build)
 
 
 @attendee_bp.route('/cars/search', methods=['GET'])
@@ -257,10 +418,24 @@ def search_route():
         schema:
           type: string
         required: true
-        description: Search query string
+        description: Search query string (every word is matched as a prefix)
+      - in: query
+        name: page
+        schema:
+          type: integer
+      - in: query
+        name: per_page
+        schema:
+          type: integer
+        description: Results per page (default 20, max 100)
+      - in: query
+        name: fields
+        schema:
+          type: string
+        description: Comma-separated columns to return per car instead of `spec` (e.g. brand,model,year,horsepower). Add `spec` to include the full spec too.
     responses:
       200:
-        description: Search results. Returns canonical car objects in `cars`.
+        description: Search results ranked by relevance. Returns canonical car objects in `cars`.
         content:
           application/json:
             schema:
@@ -272,15 +447,33 @@ def search_route():
                     type: object
                 count:
                   type: integer
+                total: {type: integer}
+                page: {type: integer}
+                per_page: {type: integer}
+                pages: {type: integer}
       400:
         description: Search query required
     """
     q = request.args.get('q', '')
     if not q:
-        return jsonify({'error': 'Search query required'}), 400
-    cars = search_cars(q)
-    cars_list = [{'id': c.id, 'spec': reorder_car_spec(_safe_raw_spec(c.raw_spec))} for c in cars]
-    return Response(json.dumps({'cars': cars_list, 'count': len(cars)}, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), 200
+        return _json_response({'error': 'Search query required'}, 400)
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    try:
+        fields = _fields_from_request()
+    except ValueError as e:
+        return _json_response({'error': str(e)}, 400)
+    results = search_cars(q, page, per_page, fields)
+    cars_list = [car_entry(c, fields) for c in results.items]
+    body = {
+        'cars': cars_list,
+        'count': len(cars_list),
+        'total': results.total,
+        'page': results.page,
+        'per_page': results.per_page,
+        'pages': results.pages
+    }
+    return _json_response(body)
 
 
 @attendee_bp.route('/cars/compare', methods=['POST'])
@@ -341,17 +534,17 @@ def compare_route():
             try:
                 car_ids = [int(id.strip()) for id in ids_param.split(',')]
             except ValueError:
-                return jsonify({'error': 'Invalid car IDs format. Use comma-separated integers.'}), 400
+                return _json_response({'error': 'Invalid car IDs format. Use comma-separated integers.'}, 400)
     
     if not car_ids:
-        return jsonify({'error': 'car_ids required. Provide as ?ids=1,2,3 or in POST body with {"car_ids": [1,2,3]}'}), 400
+        return _json_response({'error': 'car_ids required. Provide as ?ids=1,2,3 or in POST body with {"car_ids": [1,2,3]}'}, 400)
     
     result = compare_cars(car_ids)
     
     if 'error' in result:
-        return jsonify(result), 400
+        return _json_response(result, 400)
     
-    return Response(json.dumps(result, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), 200
+    return _json_response(result)
 
 
 @attendee_bp.route('/cars/stats', methods=['GET'])
@@ -369,7 +562,7 @@ def stats_route():
             schema:
               type: object
     """
-    return jsonify(get_stats()), 200
+    return _cached_json_response('stats', {}, lambda: (get_stats(), 200))
 
 
 @attendee_bp.route('/browse/brands', methods=['GET'])
@@ -396,8 +589,11 @@ def brands_list_route():
                       count: {type: integer}
                 total: {type: integer}
     """
-    brands = get_brands()
-    return jsonify({'brands': brands, 'total': len(brands)}), 200
+    def build():
+        brands = get_brands()
+        return {'brands': brands, 'total': len(brands)}, 200
+
+    return _cached_json_response('browse.brands', {}, build)
 
 
 @attendee_bp.route('/browse/brands/<brand>/series', methods=['GET'])
@@ -432,8 +628,11 @@ def series_by_brand_route(brand):
                       count: {type: integer}
                 total: {type: integer}
     """
-    series = get_models_by_brand(brand)
-    return jsonify({'brand': brand, 'series': series, 'total': len(series)}), 200
+    def build():
+        series = get_models_by_brand(brand)
+        return {'brand': brand, 'series': series, 'total': len(series)}, 200
+
+    return _cached_json_response('browse.series', {'brand': brand}, build)
 
 
 @attendee_bp.route('/browse/years', methods=['GET'])
@@ -460,8 +659,11 @@ def years_list_route():
                       count: {type: integer}
                 total: {type: integer}
     """
-    years = get_years()
-    return jsonify({'years': years, 'total': len(years)}), 200
+    def build():
+        years = get_years()
+        return {'years': years, 'total': len(years)}, 200
+
+    return _cached_json_response('browse.years', {}, build)
 
 
 @attendee_bp.route('/filter/by-brand/<brand>', methods=['GET'])
@@ -486,6 +688,16 @@ def filter_by_brand_route(brand):
         name: per_page
         schema:
           type: integer
+      - in: query
+        name: cursor
+        schema:
+          type: string
+        description: Keyset pagination. Pass an empty value for the first page, then the returned `next_cursor`. Replaces page/total/pages with next_cursor.
+      - in: query
+        name: fields
+        schema:
+          type: string
+        description: Comma-separated columns to return per car instead of `spec` (e.g. brand,model,year,horsepower). Add `spec` to include the full spec too.
     responses:
       200:
         description: Cars for the brand. Returns original source dataset objects.
@@ -503,20 +715,19 @@ def filter_by_brand_route(brand):
                 page: {type: integer}
                 per_page: {type: integer}
                 pages: {type: integer}
+                next_cursor: {type: string}
     """
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
-    paginated = get_cars_by_brand(brand, page, per_page)
-    cars_list = [{'id': car.id, 'spec': reorder_car_spec(_safe_raw_spec(car.raw_spec))} for car in paginated.items]
-    body = {
-      'brand': brand,
-      'cars': cars_list,
-      'total': paginated.total,
-      'page': page,
-      'per_page': per_page,
-      'pages': paginated.pages
-    }
-    return Response(json.dumps(body, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), 200
+    cursor = request.args.get('cursor')
+    try:
+        fields = _fields_from_request()
+        paginated = get_cars_by_brand(brand, page, per_page, cursor, fields)
+    except ValueError as e:
+        return _json_response({'error': str(e)}, 400)
+    cars_list = [car_entry(car, fields) for car in paginated.items]
+    body = {'brand': brand, 'cars': cars_list, **_page_fields(paginated, page, per_page)}
+    return _json_response(body)
 
 
 @attendee_bp.route('/filter/by-serie/<serie>', methods=['GET'])
@@ -541,6 +752,16 @@ def filter_by_serie_route(serie):
         name: per_page
         schema:
           type: integer
+      - in: query
+        name: cursor
+        schema:
+          type: string
+        description: Keyset pagination. Pass an empty value for the first page, then the returned `next_cursor`. Replaces page/total/pages with next_cursor.
+      - in: query
+        name: fields
+        schema:
+          type: string
+        description: Comma-separated columns to return per car instead of `spec` (e.g. brand,model,year,horsepower). Add `spec` to include the full spec too.
     responses:
       200:
         description: Cars for the serie. Returns original source dataset objects.
@@ -558,20 +779,19 @@ def filter_by_serie_route(serie):
                 page: {type: integer}
                 per_page: {type: integer}
                 pages: {type: integer}
+                next_cursor: {type: string}
     """
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
-    paginated = get_cars_by_serie(serie, page, per_page)
-    cars_list = [{'id': car.id, 'spec': reorder_car_spec(_safe_raw_spec(car.raw_spec))} for car in paginated.items]
-    body = {
-      'serie': serie,
-      'cars': cars_list,
-      'total': paginated.total,
-      'page': page,
-      'per_page': per_page,
-      'pages': paginated.pages
-    }
-    return Response(json.dumps(body, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), 200
+    cursor = request.args.get('cursor')
+    try:
+        fields = _fields_from_request()
+        paginated = get_cars_by_serie(serie, page, per_page, cursor, fields)
+    except ValueError as e:
+        return _json_response({'error': str(e)}, 400)
+    cars_list = [car_entry(car, fields) for car in paginated.items]
+    body = {'serie': serie, 'cars': cars_list, **_page_fields(paginated, page, per_page)}
+    return _json_response(body)
 
 
 @attendee_bp.route('/filter/by-year/<int:year>', methods=['GET'])
@@ -596,6 +816,16 @@ def filter_by_year_route(year):
         name: per_page
         schema:
           type: integer
+      - in: query
+        name: cursor
+        schema:
+          type: string
+        description: Keyset pagination. Pass an empty value for the first page, then the returned `next_cursor`. Replaces page/total/pages with next_cursor.
+      - in: query
+        name: fields
+        schema:
+          type: string
+        description: Comma-separated columns to return per car instead of `spec` (e.g. brand,model,year,horsepower). Add `spec` to include the full spec too.
     responses:
       200:
         description: Cars for the year. Returns original source dataset objects.
@@ -613,20 +843,33 @@ def filter_by_year_route(year):
                 page: {type: integer}
                 per_page: {type: integer}
                 pages: {type: integer}
+                next_cursor: {type: string}
     """
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
-    paginated = get_cars_by_year(year, page, per_page)
-    cars_list = [{'id': car.id, 'spec': reorder_car_spec(_safe_raw_spec(car.raw_spec))} for car in paginated.items]
-    body = {
-      'year': year,
-      'cars': cars_list,
-      'total': paginated.total,
-      'page': page,
-      'per_page': per_page,
-      'pages': paginated.pages
-    }
-    return Response(json.dumps(body, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), 200
+    cursor = request.args.get('cursor')
+    try:
+        fields = _fields_from_request()
+        paginated = get_cars_by_year(year, page, per_page, cursor, fields)
+    except ValueError as e:
+        return _json_response({'error': str(e)}, 400)
+    cars_list = [car_entry(car, fields) for car in paginated.items]
+    body = {'year': year, 'cars': cars_list, **_page_fields(paginated, page, per_page)}
+    return _json_response(body)
+
+
+def _with_status(result):
+  """(result, 400 if it reports an error else 200), for service results carrying an 'error' key."""
+  return result, 400 if 'error' in result else 200
+
+
+def _compare_group_args() -> dict:
+  """page / per_page / summary_only query parameters of the group comparison routes."""
+  return {
+    'page': request.args.get('page', 1, type=int),
+    'per_page': request.args.get('per_page', 20, type=int),
+    'summary_only': request.args.get('summary_only', '').lower() in ('1', 'true'),
+  }
 
 
 @attendee_bp.route('/cars/compare/by-serie/<serie>', methods=['GET'])
@@ -643,15 +886,30 @@ def compare_by_serie_route(serie):
           type: string
         required: true
         description: Model series (e.g., Golf, A4, 3 Series)
+      - in: query
+        name: page
+        schema:
+          type: integer
+        description: Page of the car list (default 1)
+      - in: query
+        name: per_page
+        schema:
+          type: integer
+        description: Cars per page (default 20, max 100)
+      - in: query
+        name: summary_only
+        schema:
+          type: boolean
+        description: Return only comparison_winners and total_cars, without the car list
     responses:
       200:
-        description: Side-by-side comparison of all cars in the serie
+        description: Winners over all cars in the serie, with one page of cars
       400:
         description: Insufficient cars found for comparison
     """
-    result = compare_by_serie(serie)
-    status = 400 if 'error' in result else 200
-    return Response(json.dumps(result, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), status
+    args = _compare_group_args()
+    return _cached_json_response('compare.by_serie', {'serie': serie, **args},
+                                 lambda: _with_status(compare_by_serie(serie, **args)))
 
 
 @attendee_bp.route('/cars/compare/by-brand/<brand>', methods=['GET'])
@@ -668,15 +926,30 @@ def compare_by_brand_route(brand):
           type: string
         required: true
         description: Brand name (e.g., Audi, BMW, Ferrari)
+      - in: query
+        name: page
+        schema:
+          type: integer
+        description: Page of the car list (default 1)
+      - in: query
+        name: per_page
+        schema:
+          type: integer
+        description: Cars per page (default 20, max 100)
+      - in: query
+        name: summary_only
+        schema:
+          type: boolean
+        description: Return only comparison_winners and total_cars, without the car list
     responses:
       200:
-        description: Side-by-side comparison of all cars from the brand
+        description: Winners over all cars from the brand, with one page of cars
       400:
         description: Insufficient cars found for comparison
     """
-    result = compare_by_brand(brand)
-    status = 400 if 'error' in result else 200
-    return Response(json.dumps(result, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), status
+    args = _compare_group_args()
+    return _cached_json_response('compare.by_brand', {'brand': brand, **args},
+                                 lambda: _with_status(compare_by_brand(brand, **args)))
 
 
 @attendee_bp.route('/cars/compare/by-year/<int:year>', methods=['GET'])
@@ -693,15 +966,30 @@ def compare_by_year_route(year):
           type: integer
         required: true
         description: Production year (e.g., 2023)
+      - in: query
+        name: page
+        schema:
+          type: integer
+        description: Page of the car list (default 1)
+      - in: query
+        name: per_page
+        schema:
+          type: integer
+        description: Cars per page (default 20, max 100)
+      - in: query
+        name: summary_only
+        schema:
+          type: boolean
+        description: Return only comparison_winners and total_cars, without the car list
     responses:
       200:
-        description: Side-by-side comparison of all cars from that year
+        description: Winners over all cars from that year, with one page of cars
       400:
         description: Insufficient cars found for comparison
     """
-    result = compare_by_year(year)
-    status = 400 if 'error' in result else 200
-    return Response(json.dumps(result, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), status
+    args = _compare_group_args()
+    return _cached_json_response('compare.by_year', {'year': year, **args},
+                                 lambda: _with_status(compare_by_year(year, **args)))
 
 
 @attendee_bp.route('/cars/top/<metric>', methods=['GET'])
@@ -724,6 +1012,11 @@ def top_cars_route(metric):
         schema:
           type: integer
         description: Number of top cars to return (default 10, max 100)
+      - in: query
+        name: fields
+        schema:
+          type: string
+        description: Comma-separated columns to return per car instead of `spec` (e.g. brand,model,year,horsepower). Add `spec` to include the full spec too.
     responses:
       200:
         description: Top N cars ranked by the specified metric
@@ -731,9 +1024,12 @@ def top_cars_route(metric):
         description: Invalid metric
     """
     limit = request.args.get('limit', 10, type=int)
-    result = get_top_cars(metric, limit)
-    status = 400 if 'error' in result else 200
-    return Response(json.dumps(result, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), status
+    try:
+        fields = _fields_from_request()
+    except ValueError as e:
+        return _json_response({'error': str(e)}, 400)
+    return _cached_json_response('top', {'metric': metric, 'limit': limit, 'fields': fields},
+                                 lambda: _with_status(get_top_cars(metric, limit, fields)))
 
 
 @attendee_bp.route('/cars/<int:car_id>/similar', methods=['GET'])
@@ -755,6 +1051,11 @@ def similar_cars_route(car_id):
         schema:
           type: integer
         description: Number of similar cars to return (default 10, max 100)
+      - in: query
+        name: fields
+        schema:
+          type: string
+        description: Comma-separated columns to return per car instead of `spec` (e.g. brand,model,year,horsepower). Add `spec` to include the full spec too.
     responses:
       200:
         description: List of similar cars ranked by similarity score
@@ -762,9 +1063,13 @@ def similar_cars_route(car_id):
         description: Car not found
     """
     limit = request.args.get('limit', 10, type=int)
-    result = get_similar_cars(car_id, limit)
+    try:
+        fields = _fields_from_request()
+    except ValueError as e:
+        return _json_response({'error': str(e)}, 400)
+    result = get_similar_cars(car_id, limit, fields)
     status = 404 if 'error' in result else 200
-    return Response(json.dumps(result, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), status
+    return _json_response(result, status)
 
 
 @attendee_bp.route('/available/metrics', methods=['GET'])
@@ -794,7 +1099,7 @@ def available_metrics_route():
                       usage: {type: string}
     """
     result = get_available_metrics()
-    return Response(json.dumps(result, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), 200
+    return _json_response(result)
 
 
 @attendee_bp.route('/available/series', methods=['GET'])
@@ -828,8 +1133,7 @@ def available_series_route():
                 total_unique_series: {type: integer}
     """
     limit = request.args.get('limit', 50, type=int)
-    result = get_available_series(limit)
-    return Response(json.dumps(result, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), 200
+    return _cached_json_response('available.series', {'limit': limit}, lambda: (get_available_series(limit), 200))
 
 
 @attendee_bp.route('/available/brands', methods=['GET'])
@@ -863,8 +1167,7 @@ def available_brands_route():
                 total_brands: {type: integer}
     """
     limit = request.args.get('limit', 50, type=int)
-    result = get_available_brands(limit)
-    return Response(json.dumps(result, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), 200
+    return _cached_json_response('available.brands', {'limit': limit}, lambda: (get_available_brands(limit), 200))
 
 
 @attendee_bp.route('/available/years', methods=['GET'])
@@ -890,5 +1193,4 @@ def available_years_route():
                       year: {type: integer}
                       count: {type: integer}
     """
-    result = get_available_years()
-    return Response(json.dumps(result, ensure_ascii=False, indent=2, sort_keys=False), mimetype='application/json'), 200
\ No newline at end of file
+    return _cached_json_response('available.years', {}, lambda: (get_available_years(), 200))
@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, current_app, g, request, Response
+from werkzeug.test import EnvironBuilder
+
+from models import db
+from services.json_codec import dumps
+
+batch_bp = Blueprint('batch', __name__, url_prefix='')
+
+
+def _executor():
+    """Per-app thread pool for `parallel` batches (BATCH_WORKERS threads)."""
+    extensions = current_app.extensions
+    if 'batch_executor' not in extensions:
+        extensions['batch_executor'] = ThreadPoolExecutor(
+            max_workers=current_app.config['BATCH_WORKERS'], thread_name_prefix='batch')
+    return extensions['batch_executor']
+
+
+def _sub_requests(payload):
+    """(WSGI environs, parallel) of a /batch body; raises ValueError when it is malformed.
+
+    The body is a list of {"method", "path", "query"} objects, or
+    {"requests": [...], "parallel": true}. Paths are relative to the API
+    prefix (/cars/1) or include it (/api/v1/cars/1).
+    """
+    parallel = False
+    if isinstance(payload, dict):
+        parallel = bool(payload.get('parallel'))
+        payload = payload.get('requests')
+    if not isinstance(payload, list) or not payload:
+        raise ValueError('Provide a non-empty array of {"method", "path", "query"} sub-requests')
+    limit = current_app.config['BATCH_MAX_REQUESTS']
+    if len(payload) > limit:
+        raise ValueError(f'At most {limit} sub-requests per batch (got {len(payload)})')
+
+    prefix = current_app.blueprints['api'].url_prefix
+    # Sub-requests carry the caller's credentials but no Accept-Encoding:
+    # their bodies are spliced into this response uncompressed.
+    headers = {'Authorization': request.headers['Authorization']} if 'Authorization' in request.headers else {}
+    environs = []
+    for index, sub in enumerate(payload):
+        if not isinstance(sub, dict) or not isinstance(sub.get('path'), str):
+            raise ValueError(f'Sub-request {index}: "path" is required')
+        if str(sub.get('method', 'GET')).upper() != 'GET':
+            raise ValueError(f'Sub-request {index}: only GET is supported')
+        query = sub.get('query')
+        if query is not None and not isinstance(query, (dict, str)):
+            raise ValueError(f'Sub-request {index}: "query" must be an object or a string')
+        path = sub['path'] if sub['path'].startswith(prefix + '/') else prefix + '/' + sub['path'].lstrip('/')
+        builder = EnvironBuilder(path=path, method='GET', query_string=query, headers=headers,
+                                 base_url=request.host_url, environ_base={'REMOTE_ADDR': request.remote_addr})
+        environs.append(builder.get_environ())
+    return environs, parallel
+
+
+def _dispatch(app, environ):
+    """(status, JSON body bytes) of one sub-request, run through the app's full dispatch."""
+    saved = dict(vars(g))
+    try:
+        with app.request_context(environ):
+            response = app.full_dispatch_request()
+            data = response.get_data()
+    except Exception:
+        app.logger.exception('batch sub-request %s failed', environ['PATH_INFO'])
+        db.session.rollback()
+        return 500, dumps({'error': 'Internal server error'})
+    finally:
+        # Requests share the app context, and with it `g` (ETag, JWT state).
+        vars(g).clear()
+        vars(g).update(saved)
+    if response.mimetype == 'application/json':
+        return response.status_code, data
+    if response.status_code >= 400:
+        return response.status_code, dumps({'error': response.status})
+    return response.status_code, dumps(data.decode(response.mimetype_params.get('charset', 'utf-8'), 'replace'))
+
+
+def _dispatch_in_own_context(app, environ):
+    with app.app_context():
+        return _dispatch(app, environ)
+
+
+@batch_bp.route('/batch', methods=['POST'])
+def batch_route():
+    """
+    Run several GET requests of this API in one round trip
+    ---
+    tags:
+      - Batch
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            properties:
+              requests:
+                type: array
+                description: At most BATCH_MAX_REQUESTS (default 20) sub-requests. A bare array is accepted too.
+                items:
+                  type: object
+                  properties:
+                    method: {type: string, description: "GET (the default; nothing else is supported)"}
+                    path: {type: string, description: "Route under /api/v1, e.g. /cars/1 or /cars/1/similar"}
+                    query: {type: object, description: "Query parameters, e.g. {\"limit\": 8}"}
+              parallel:
+                type: boolean
+                description: Run the sub-requests on a thread pool (BATCH_WORKERS threads, each with its own DB session) instead of one after another in this request's session
+          example:
+            requests:
+              - {path: /cars/1}
+              - {path: /cars/1/similar, query: {limit: 8}}
+              - {path: /cars/stats}
+    responses:
+      200:
+        description: One `{status, body}` per sub-request, in request order
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                responses:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      status: {type: integer}
+                      body: {type: object}
+      400:
+        description: Malformed batch, too many sub-requests or a non-GET sub-request
+    """
+    try:
+        environs, parallel = _sub_requests(request.get_json(silent=True))
+    except ValueError as e:
+        return Response(dumps({'error': str(e)}), status=400, mimetype='application/json')
+
+    app = current_app._get_current_object()
+    if parallel and current_app.config['BATCH_WORKERS'] > 1 and len(environs) > 1:
+        results = list(_executor().map(lambda environ: _dispatch_in_own_context(app, environ), environs))
+    else:
+        # One after another inside this request's app context, so they share its DB session.
+        results = [_dispatch(app, environ) for environ in environs]
+
+    # Sub-response bodies are already encoded JSON: splice them in rather than decode and re-encode.
+    entries = b','.join(b'{"status":%d,"body":%s}' % (status, data) for status, data in results)
+    return Response(b'{"responses":[' + entries + b']}', mimetype='application/json')
@@ -0,0 +1,51 @@
+"""Compute the stored attendee spec (`cars.attendee_spec`) for existing rows.
+
+Rows written before the column existed have it NULL; read endpoints then
+build the spec live on every request until this backfill has run.
+
+Usage: python scripts/backfill_attendee_specs.py [--all] [--batch-size 1000]
+"""
+import argparse
+import os
+import sys
+
+# ensure project root is importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app import create_app
+from models import db, Car
+from services.car_service import refresh_attendee_spec
+
+
+def backfill(all_rows=False, batch_size=1000):
+    """Fill attendee_spec in id-ordered batches, one transaction per batch."""
+    updated = 0
+    last_id = 0
+    while True:
+        query = Car.query.filter(Car.id > last_id)
+        if not all_rows:
+            query = query.filter(Car.attendee_spec.is_(None))
+        cars = query.order_by(Car.id).limit(batch_size).all()
+        if not cars:
+            break
+        for car in cars:
+            refresh_attendee_spec(car)
+        db.session.commit()
+        updated += len(cars)
+        last_id = cars[-1].id
+        db.session.expunge_all()
+    return updated
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill the materialized attendee spec column')
+    parser.add_argument('--all', action='store_true', help='Recompute every row, not only rows missing a spec')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per transaction')
+    args = parser.parse_args()
+
+    app = create_app(os.environ.get('FLASK_ENV', 'production'))
+    with app.app_context():
+        count = backfill(all_rows=args.all, batch_size=args.batch_size)
+    print(f'Backfilled attendee_spec for {count} cars')
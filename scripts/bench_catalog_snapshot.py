@@ -0,0 +1,95 @@
+"""Benchmark metric-filtered /cars pages, /cars/top/<metric> and /cars/<id>/similar with and without the catalog snapshot.
+
+Seeds an in-memory database with synthetic cars, then times `get_cars`,
+`get_top_cars` and `get_similar_cars` on the SQL path (CATALOG_SNAPSHOT off)
+and on the NumPy snapshot, checking both return the same cars.
+
+Usage: python scripts/bench_catalog_snapshot.py [--cars 1000000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# ensure project root is importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app import create_app
+from models import db, Car
+from services.car_service import get_cars, get_similar_cars, get_top_cars
+from services.catalog_snapshot import refresh_snapshot
+
+QUERIES = [
+    ('hp 300-500, torque >= 400, sort hp desc',
+     {'min_horsepower': '300', 'max_horsepower': '500', 'min_torque_nm': '400'}, 'horsepower', 'desc'),
+    ('0-100 <= 6, mpg >= 30, year >= 2015',
+     {'max_acceleration_0_100': '6', 'min_combined_mpg': '30', 'min_year': '2015'}, 'id', 'asc'),
+    ('cylinders = 8, sort top speed', {'cylinders': '8'}, 'vitesse_max', 'desc'),
+]
+
+
+def seed(count, rng):
+    def maybe(value):
+        return None if rng.random() < 0.2 else value
+
+    insert = Car.__table__.insert()
+    batch = []
+    for i in range(count):
+        batch.append({
+            'brand': f'Brand {i % 40}', 'model': f'Model {i}', 'year': rng.randint(1990, 2024), 'price': 0.0,
+            'horsepower': maybe(rng.randint(60, 800)), 'torque_nm': maybe(rng.randint(100, 1000)),
+            'vitesse_max': maybe(rng.randint(140, 350)), 'acceleration_0_100': maybe(round(rng.uniform(2.5, 15), 1)),
+            'combined_mpg': maybe(round(rng.uniform(10, 60), 1)), 'cylinders': maybe(rng.choice([3, 4, 6, 8, 12])),
+            'drive_type': maybe(rng.choice(['Front Wheel Drive', 'Rear Wheel Drive', 'All Wheel Drive'])),
+            'fuel_type': maybe(rng.choice(['Gasoline', 'Diesel', 'Electric', 'Hybrid'])),
+        })
+        if len(batch) == 20000:
+            db.session.execute(insert, batch)
+            batch.clear()
+    if batch:
+        db.session.execute(insert, batch)
+    db.session.commit()
+
+
+def ms(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+
+def main(cars, repeat):
+    app = create_app('testing')
+    with app.app_context():
+        seed(cars, random.Random(0))
+        started = time.perf_counter()
+        refresh_snapshot()
+        print(f'{cars} cars; snapshot built in {time.perf_counter() - started:.2f}s')
+        print(f'{"query":<44}{"sql ms":>10}{"snapshot ms":>13}')
+
+        cases = [(name, lambda f=filters, s=sort_by, o=order: get_cars(f, s, o))
+                 for name, filters, sort_by, order in QUERIES]
+        cases.append(('top 10 acceleration_0_100', lambda: get_top_cars('acceleration_0_100')))
+        cases.append(('10 most similar to car 1', lambda: get_similar_cars(1, 10)))
+        for name, fn in cases:
+            app.config['CATALOG_SNAPSHOT'] = False
+            sql_ms, expected = ms(fn, repeat)
+            app.config['CATALOG_SNAPSHOT'] = True
+            snap_ms, got = ms(fn, repeat)
+            if isinstance(expected, dict):
+                key = 'similar_cars' if 'similar_cars' in expected else 'cars'
+                same = [c['id'] for c in expected[key]] == [c['id'] for c in got[key]]
+            else:
+                same = expected.total == got.total and [c.id for c in expected.items] == [c.id for c in got.items]
+            print(f'{name:<44}{sql_ms:>10.2f}{snap_ms:>13.2f}   {"same" if same else "DIFFERENT"} results')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cars', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    main(args.cars, args.repeat)
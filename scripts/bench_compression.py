@@ -0,0 +1,63 @@
+"""Benchmark response bytes and latency per Accept-Encoding on the largest attendee endpoints.
+
+Seeds an in-memory database with one brand of cars carrying dataset-shaped
+raw specs (as scripts/bench_json_encoding.py does), then requests each
+endpoint through the test client as identity, gzip and (when the `brotli`
+package is installed) br. The response cache is off unless --cache is
+given, so every request pays for the queries and the encoding too.
+
+Usage: python scripts/bench_compression.py [--cars 2000] [--repeat 20] [--cache]
+"""
+import argparse
+import os
+import sys
+import time
+
+# ensure project root is importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app import create_app
+from bench_json_encoding import seed
+from services import compression
+from services.stats import rebuild_stats
+
+URLS = [
+    '/api/v1/cars/compare/by-brand/Audi?per_page=100',
+    '/api/v1/cars?per_page=100',
+    '/api/v1/cars/stats',
+    '/api/v1/cars/export',
+]
+
+
+def main(cars, repeat, cache):
+    app = create_app('testing')
+    if not cache:
+        app.config['RESPONSE_CACHE_SIZE'] = 0
+    client = app.test_client()
+    with app.app_context():
+        seed(cars)
+        rebuild_stats()  # seed() adds rows directly, bypassing the summary tables
+
+    encodings = ['identity', 'gzip'] + (['br'] if compression.brotli is not None else [])
+    print(f'{cars} cars, response cache {"on" if cache else "off"}; brotli {"installed" if "br" in encodings else "not installed"}')
+    print(f'{"endpoint":<50}{"encoding":<10}{"bytes":>10}{"ms":>9}')
+    for url in URLS:
+        for encoding in encodings:
+            headers = {'Accept-Encoding': encoding}
+            size = len(client.get(url, headers=headers).data)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                client.get(url, headers=headers).data
+            ms = (time.perf_counter() - start) * 1000 / repeat
+            print(f'{url[7:]:<50}{encoding:<10}{size:>10}{ms:>9.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cars', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--cache', action='store_true', help='keep the server-side response cache on')
+    args = parser.parse_args()
+    main(args.cars, args.repeat, args.cache)
@@ -0,0 +1,115 @@
+"""Benchmark response encoding on /cars/compare/by-brand/<brand>.
+
+Seeds an in-memory database with one brand of synthetic cars, then compares
+payload size and CPU time of a 100-car comparison page under the old
+pretty-printed stdlib encoding and the compact encoders used by the
+attendee routes.
+
+Usage: python scripts/bench_json_encoding.py [--cars 2000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# ensure project root is importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app import create_app
+from models import db, Car
+from services import json_codec
+from services.car_service import compare_by_brand, refresh_attendee_spec
+from services.dimensions import DimensionResolver, assign_dimensions
+
+
+def seed(count, brand='Audi'):
+    """Insert `count` cars of one brand with dataset-shaped raw specs."""
+    resolver = DimensionResolver()
+    for i in range(count):
+        spec = {
+            'Model': f'{brand} A{i % 8} {1.4 + (i % 5) * 0.2:.1f} TFSI',
+            'Serie': f'A{i % 8}',
+            'Company': brand,
+            'Body style': ['Sedan', 'Avant', 'Coupe', 'Cabriolet'][i % 4],
+            'Production Years': f'{2000 + i % 24}, {2001 + i % 24}',
+            'Cylinders': 'L4',
+            'Fuel': 'Gasoline',
+            'Fuel System': 'Direct Injection',
+            'Fuel Capacity': '54 L (14.3 gallons)',
+            'Top Speed': f'{200 + i % 60} km/h (124 mph)',
+            'Acceleration 0-62 Mph (0-100kph)': f'{5 + (i % 40) / 10:.1f} s',
+            'Gearbox': '7-speed automatic',
+            'Drive Type': 'Front Wheel Drive',
+            'Power(HP)': f'{150 + i % 200} HP @ 5000 rpm',
+            'Torque(lb-ft)': f'{200 + i % 150} lb-ft',
+            'Torque(Nm)': f'{270 + i % 200} Nm',
+            'Length': '4762 mm (187.5 in)',
+            'Width': '1842 mm (72.5 in)',
+            'Height': '1428 mm (56.2 in)',
+            'City mpg': '28.7 mpg US',
+            'Highway mpg': '44.4 mpg US',
+            'Combined mpg': f'{30 + i % 15}.2 mpg US',
+            'Specification summary': f'{brand} A{i % 8} Sportback Ëdition with quattro® options',
+        }
+        car = Car(
+            brand=brand, model=spec['Model'], year=2000 + i % 24, price=0.0,
+            horsepower=150 + i % 200, torque_nm=270 + i % 200, vitesse_max=200 + i % 60,
+            acceleration_0_100=5 + (i % 40) / 10, combined_mpg=30 + i % 15,
+            fuel_type='Gasoline', drive_type='Front Wheel Drive', transmission='7-speed automatic',
+            raw_spec=json.dumps(spec, ensure_ascii=False),
+        )
+        refresh_attendee_spec(car)
+        assign_dimensions(car, resolver)
+        db.session.add(car)
+    db.session.commit()
+
+
+def cpu_ms(fn, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) * 1000 / repeat
+
+
+def main(cars, repeat):
+    app = create_app('testing')
+    # Time the encoding on every request, not response cache hits.
+    app.config['RESPONSE_CACHE_SIZE'] = 0
+    client = app.test_client()
+    with app.app_context():
+        seed(cars)
+        body = compare_by_brand('Audi', per_page=100)
+
+    encoders = [
+        ('stdlib, indent=2 (previous)', lambda: json.dumps(body, ensure_ascii=False, indent=2, sort_keys=False).encode('utf-8')),
+        ('stdlib, compact', lambda: json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode('utf-8')),
+    ]
+    if json_codec.orjson is not None:
+        encoders.append(('orjson, compact', lambda: json_codec.orjson.dumps(body, option=json_codec.orjson.OPT_NON_STR_KEYS)))
+
+    print(f'/cars/compare/by-brand/Audi with {cars} cars')
+    print(f'{"encoder":<30}{"bytes":>12}{"cpu ms":>10}')
+    baseline = None
+    for name, fn in encoders:
+        size = len(fn())
+        ms = cpu_ms(fn, repeat)
+        baseline = baseline or (size, ms)
+        print(f'{name:<30}{size:>12}{ms:>10.2f}   ({size / baseline[0]:.0%} bytes, {ms / baseline[1]:.0%} cpu)')
+
+    print('\nFull request through the test client:')
+    for label, url in (('?pretty=1', '/api/v1/cars/compare/by-brand/Audi?per_page=100&pretty=1'),
+                       ('default (compact)', '/api/v1/cars/compare/by-brand/Audi?per_page=100')):
+        size = len(client.get(url).data)
+        ms = cpu_ms(lambda: client.get(url), max(repeat // 4, 1))
+        print(f'{label:<30}{size:>12}{ms:>10.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cars', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    main(args.cars, args.repeat)
@@ -0,0 +1,131 @@
+"""Benchmark /cars/top/<metric> and the /cars metric range filters.
+
+Seeds an in-memory database where a share of every ranking metric is the
+dataset's 0 "unknown" placeholder and times the previous queries (IS NOT NULL
+AND > 0 predicates), then migrates the placeholders to NULL and times the
+current ones. Prints query plans and how many placeholder rows the previous
+top-N results contained.
+
+Usage: python scripts/bench_metric_queries.py [--cars 200000] [--unknown 0.3] [--repeat 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# ensure project root is importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import text
+
+from app import create_app
+from models import db, Car
+from services.car_service import _filtered_cars_query
+from services.schema import null_metric_placeholders
+
+FILTERS = {'min_horsepower': 600, 'max_acceleration_0_100': 3.5, 'min_torque_nm': 900}
+
+
+def seed(count, unknown, rng):
+    """Insert `count` cars; each metric is 0 with probability `unknown`."""
+    def metric(lo, hi, digits=None):
+        if rng.random() < unknown:
+            return 0
+        return round(rng.uniform(lo, hi), digits) if digits else rng.randint(lo, hi)
+
+    insert = Car.__table__.insert()
+    batch = []
+    for i in range(count):
+        batch.append({
+            'brand': f'Brand {i % 40}', 'model': f'Model {i}', 'year': 1990 + i % 35, 'price': 0.0,
+            'horsepower': metric(60, 800), 'combined_mpg': metric(10, 60, 1),
+            'acceleration_0_100': metric(2.5, 15, 1), 'vitesse_max': metric(140, 350),
+            'torque_nm': metric(100, 1000),
+        })
+        if len(batch) == 10000:
+            db.session.execute(insert, batch)
+            batch.clear()
+    if batch:
+        db.session.execute(insert, batch)
+    db.session.commit()
+
+
+def previous_top(metric, ascending, limit=10):
+    column = getattr(Car, metric)
+    query = Car.query.filter(column.isnot(None))
+    return query.order_by(column.asc() if ascending else column.desc()).limit(limit)
+
+
+def current_top(metric, ascending, limit=10):
+    column = getattr(Car, metric)
+    query = Car.query.filter(column.isnot(None))
+    ordering = (column.asc(), Car.id.asc()) if ascending else (column.desc(), Car.id.desc())
+    return query.order_by(*ordering).limit(limit)
+
+
+def previous_filtered():
+    query = Car.query
+    query = query.filter(Car.horsepower.isnot(None), Car.horsepower > 0, Car.horsepower >= FILTERS['min_horsepower'])
+    query = query.filter(Car.acceleration_0_100.isnot(None), Car.acceleration_0_100 > 0,
+                         Car.acceleration_0_100 <= FILTERS['max_acceleration_0_100'])
+    return query.filter(Car.torque_nm.isnot(None), Car.torque_nm > 0, Car.torque_nm >= FILTERS['min_torque_nm'])
+
+
+def ms(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def plan(query):
+    sql = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).all()
+    return '; '.join(row[-1] for row in rows)
+
+
+def run(label, queries, repeat):
+    print(f'\n{label}')
+    timings = {}
+    for name, query in queries:
+        timings[name] = ms(lambda: query.all(), repeat)
+        print(f'  {name:<32}{timings[name]:>9.3f} ms   {plan(query)}')
+    return timings
+
+
+def main(cars, unknown, repeat):
+    app = create_app('testing')
+    with app.app_context():
+        seed(cars, unknown, random.Random(0))
+        print(f'{cars} cars, {unknown:.0%} of each metric unknown')
+
+        tops = [('horsepower', False), ('acceleration_0_100', True), ('torque_nm', False)]
+        leaked = {m: sum(getattr(car, m) == 0 for car in previous_top(m, asc)) for m, asc in tops}
+        before = run('previous: 0 placeholders', [
+            *[(f'top {m}', previous_top(m, asc)) for m, asc in tops],
+            ('range filters', previous_filtered()),
+        ], repeat)
+
+        null_metric_placeholders(db.engine)
+        after = run('current: NULL unknowns', [
+            *[(f'top {m}', current_top(m, asc)) for m, asc in tops],
+            ('range filters', _filtered_cars_query(FILTERS)),
+        ], repeat)
+
+        print('\nspeedup, and placeholder rows in the previous top 10:')
+        for name in before:
+            metric = name.removeprefix('top ')
+            note = f'   {leaked[metric]} placeholders' if metric in leaked else ''
+            print(f'  {name:<32}{before[name] / after[name]:>8.1f}x{note}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cars', type=int, default=200000)
+    parser.add_argument('--unknown', type=float, default=0.3)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    main(args.cars, args.unknown, args.repeat)
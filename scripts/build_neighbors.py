@@ -0,0 +1,40 @@
+"""Recompute the `car_neighbors` table behind /cars/<id>/similar.
+
+Scores every car against the whole catalog in `--workers` processes and
+stores each car's most similar cars. Run it after imports (or use
+`import_dataset.py --neighbors`). In between, admin writes keep it current
+and queue the lists they drop; `--queued` recomputes only those, e.g. from
+cron.
+
+Usage: python scripts/build_neighbors.py [--workers N] [--queued]
+"""
+import argparse
+import os
+import sys
+import time
+
+# ensure project root is importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app import create_app
+from models import db
+from services.catalog_version import bump_version, forget_version
+from services.neighbors import build_neighbors
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Scoring processes (default: one per CPU)')
+    parser.add_argument('--queued', action='store_true', help='Only the lists queued by writes since the last run')
+    args = parser.parse_args()
+    app = create_app(os.environ.get('FLASK_ENV', 'production'))
+    with app.app_context():
+        started = time.perf_counter()
+        count = build_neighbors(args.workers, queued=args.queued)
+        # /cars/<id>/similar changed: revalidating clients and cached responses must not keep the old lists.
+        bump_version()
+        db.session.commit()
+        forget_version()
+    print(f'Computed similar cars for {count} cars in {time.perf_counter() - started:.1f}s with {args.workers} worker(s)')
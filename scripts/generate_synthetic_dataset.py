@@ -0,0 +1,76 @@
+"""Write a synthetic processed dataset (same JSON shape as processed-dataset.json).
+
+Useful to load-test the importer and the API at catalog sizes the real
+dataset does not reach.
+
+Usage: python scripts/generate_synthetic_dataset.py --rows 1000000 --out data/synthetic/cars-1m.json
+"""
+import argparse
+import json
+import os
+import random
+
+COMPANIES = [
+    'Alfa romeo', 'Aston martin', 'Audi', 'BMW', 'Chevrolet', 'Citroen', 'Cupra', 'Dacia',
+    'Dodge', 'Ford', 'Geely', 'GMC', 'Honda', 'Hyundai', 'Isuzu', 'KIA', 'Land rover',
+    'Mahindra', 'Mercedez BENZ', 'Mercedes-AMG', 'Nissan', 'Opel', 'Peugeot', 'Renault',
+    'SEAT', 'Skoda', 'Suzuki', 'Toyota', 'Volkswagen', 'Volvo'
+]
+BODY_STYLES = ['Sedan', 'Hatchback', 'SUV', 'Coupe', 'Cabriolet', 'Wagon', 'Pickup']
+FUELS = ['Gasoline', 'Diesel', 'Electric', 'Hybrid']
+DRIVES = ['Front Wheel Drive', 'Rear Wheel Drive', 'All Wheel Drive']
+GEARBOXES = ['6-speed manual', '7-speed automatic', '8-speed automatic', 'CVT']
+
+
+def record(i, rng):
+    company = COMPANIES[i % len(COMPANIES)]
+    serie = f'S{(i // len(COMPANIES)) % 400}'
+    start = rng.randint(1990, 2024)
+    hp = rng.choice([0, rng.randint(60, 800)])  # 0 is the dataset's "unknown"
+    return {
+        'Model': f'{company.upper()} {serie} {i}',
+        'Serie': serie,
+        'Company': company,
+        'Body style': rng.choice(BODY_STYLES),
+        'Production Years': f'{start}, {start + 1}',
+        'Cylinders': rng.choice(['L3', 'L4', 'V6', 'V8', '']),
+        'Fuel': rng.choice(FUELS),
+        'Fuel System': 'Direct Injection',
+        'Fuel Capacity': f'{rng.randint(35, 90)} L',
+        'Top Speed': f'{rng.randint(140, 330)} km/h',
+        'Acceleration 0-62 Mph (0-100kph)': f'{rng.uniform(2.5, 15):.1f} s',
+        'Gearbox': rng.choice(GEARBOXES),
+        'Drive Type': rng.choice(DRIVES),
+        'Power(HP)': f'{hp} HP',
+        'Torque(lb-ft)': f'{rng.randint(80, 700)} lb-ft',
+        'Torque(Nm)': f'{rng.randint(100, 950)} Nm',
+        'Length': f'{rng.randint(3500, 5300)} mm',
+        'Width': f'{rng.randint(1600, 2100)} mm',
+        'Height': f'{rng.randint(1200, 2000)} mm',
+        'City mpg': f'{rng.uniform(10, 60):.1f} mpg US',
+        'Highway mpg': f'{rng.uniform(15, 70):.1f} mpg US',
+        'Combined mpg': f'{rng.uniform(12, 65):.1f} mpg US',
+        'Specification summary': f'{company} {serie} {rng.choice(BODY_STYLES).lower()} {i}',
+    }
+
+
+def main(rows, out, seed):
+    rng = random.Random(seed)
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        f.write('[\n')
+        for i in range(rows):
+            if i:
+                f.write(',\n')
+            f.write(json.dumps(record(i, rng), ensure_ascii=False))
+        f.write('\n]\n')
+    print(f'Wrote {rows} synthetic records to {out}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic processed dataset')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--out', default='data/synthetic/cars.json')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    main(args.rows, args.out, args.seed)
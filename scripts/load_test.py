@@ -0,0 +1,203 @@
+"""Load test: attendee read throughput at many concurrent connections, async (asgi.py) vs sync (wsgi.py).
+
+Seeds a temporary SQLite file with dataset-shaped cars (as
+scripts/bench_json_encoding.py does), then for each server mode starts
+one server process pinned to CPU 0 and opens --connections keep-alive
+connections that send GETs round-robin from a mix of list, detail,
+search, similar and LIKE-scan (`model=`) requests for --duration seconds:
+
+- asgi: uvicorn asgi:app, one process (attendee reads on aiosqlite sessions)
+- wsgi: gunicorn -w 1 wsgi:app, one sync worker (the Dockerfile runs two)
+
+The response cache is off unless --cache is given, so every request hits
+the database. Reports requests/s, latency percentiles and failures.
+Use --url to load an already running server instead.
+
+Usage: python scripts/load_test.py [--cars 20000] [--connections 500] [--duration 20] [--modes asgi,wsgi]
+"""
+import argparse
+import asyncio
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+# ensure project root is importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app import create_app
+from bench_json_encoding import seed
+from config import ProductionConfig, config
+from services.stats import rebuild_stats
+
+PORT = 5077
+
+
+def request_mix(cars):
+    """Attendee GET paths the connections cycle through."""
+    paths = []
+    for i in range(50):
+        car_id = 1 + (i * 7919) % cars
+        paths += [
+            f'/api/v1/cars?page={1 + i % 40}&per_page=20',
+            f'/api/v1/cars/{car_id}',
+            f'/api/v1/cars/batch?ids={car_id},{1 + (car_id * 31) % cars},{1 + (car_id * 17) % cars}',
+            f'/api/v1/cars/search?q=A{i % 8}%20TFSI&page={1 + i % 5}',
+            f'/api/v1/cars/{car_id}/similar?limit=8',
+            f'/api/v1/cars?model=A{i % 8}%201.{4 + i % 5}&per_page=20&page={1 + i % 10}',
+        ]
+    return paths
+
+
+def seed_database(path, cars):
+    config['load-test'] = type('LoadTestConfig', (ProductionConfig,), {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    app = create_app('load-test')
+    with app.app_context():
+        seed(cars)
+        rebuild_stats()  # seed() adds rows directly, bypassing the summary tables
+
+
+def start_server(mode, path, cache):
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{path}', FLASK_ENV='production', CACHE_BACKEND='memory')
+    if not cache:
+        env['RESPONSE_CACHE_SIZE'] = '0'
+    if mode == 'asgi':
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(PORT), '--log-level', 'warning',
+                   '--no-access-log', '--backlog', '4096', '--timeout-keep-alive', '60']
+    else:
+        command = [sys.executable, '-m', 'gunicorn', '-w', '1', '-b', f'127.0.0.1:{PORT}', '--backlog', '4096',
+                   '--log-level', 'warning', 'wsgi:app']
+    pin = (lambda: os.sched_setaffinity(0, {0})) if hasattr(os, 'sched_setaffinity') else None
+    server = subprocess.Popen(command, cwd=ROOT, env=env, preexec_fn=pin)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            asyncio.run(_fetch_once(f'http://127.0.0.1:{PORT}/api/v1/cars/1'))
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+async def _fetch_once(url):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    try:
+        writer.write(f'GET {parts.path}?{parts.query} HTTP/1.1\r\nHost: {parts.netloc}\r\n\r\n'.encode())
+        return await _read_response(reader)
+    finally:
+        writer.close()
+
+
+async def _read_response(reader):
+    """(status, keep_alive) of one response, its body read and discarded."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:] if ': ' in line)
+    headers = {name.lower(): value for name, value in headers.items()}
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return int(lines[0].split()[1]), headers.get('connection', '').lower() != 'close'
+
+
+def _route(path):
+    """Path without its query and with ids replaced, e.g. /api/v1/cars/<id>/similar."""
+    return re.sub(r'/\d+', '/<id>', path.split('?')[0])
+
+
+async def _connection(base, paths, offset, stop_at, results):
+    """One client connection: send requests back to back until stop_at, reconnecting when closed."""
+    parts = urlsplit(base)
+    reader = writer = None
+    i = offset
+    while time.monotonic() < stop_at:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.monotonic()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n\r\n'.encode())
+            status, keep_alive = await asyncio.wait_for(_read_response(reader), timeout=60)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+            results['errors'][type(e).__name__] = results['errors'].get(type(e).__name__, 0) + 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+            continue
+        if time.monotonic() <= stop_at:
+            results['latencies'].append((_route(path), time.monotonic() - start))
+            results['statuses'][status] = results['statuses'].get(status, 0) + 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def load(base, paths, connections, duration):
+    results = {'latencies': [], 'statuses': {}, 'errors': {}}
+    stop_at = time.monotonic() + duration
+    await asyncio.gather(*[_connection(base, paths, n * 7, stop_at, results) for n in range(connections)])
+    # Only responses completed within `duration` count; the rest drain unrecorded.
+    results['elapsed'] = duration
+    return results
+
+
+def _percentile(latencies, p):
+    return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000 if latencies else float('nan')
+
+
+def report(label, results):
+    latencies = sorted(latency for _, latency in results['latencies'])
+    count = len(latencies)
+    failed = sum(n for status, n in results['statuses'].items() if status >= 400) + sum(results['errors'].values())
+    print(f'{label:<8}{count:>9}{count / results["elapsed"]:>10.1f}{_percentile(latencies, 0.5):>9.1f}'
+          f'{_percentile(latencies, 0.95):>9.1f}{_percentile(latencies, 0.99):>9.1f}{failed:>8}  {results["errors"] or ""}')
+    for route in sorted({route for route, _ in results['latencies']}):
+        by_route = sorted(latency for name, latency in results['latencies'] if name == route)
+        print(f'        {route:<30}{len(by_route):>7} requests, p50 {_percentile(by_route, 0.5):.1f} ms, '
+              f'p95 {_percentile(by_route, 0.95):.1f} ms')
+
+
+def main(cars, connections, duration, modes, cache, url):
+    paths = request_mix(cars)
+    print(f'{connections} connections, {duration}s per mode, response cache {"on" if cache else "off"}')
+    print(f'{"mode":<8}{"requests":>9}{"req/s":>10}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"failed":>8}')
+    if url:
+        report('url', asyncio.run(load(url, paths, connections, duration)))
+        return
+    path = os.path.join(tempfile.mkdtemp(), 'load.db')
+    seed_database(path, cars)
+    for mode in modes:
+        server = start_server(mode, path, cache)
+        try:
+            report(mode, asyncio.run(load(f'http://127.0.0.1:{PORT}', paths, connections, duration)))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cars', type=int, default=20000)
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--modes', default='asgi,wsgi', help='comma-separated server modes to run: asgi, wsgi')
+    parser.add_argument('--cache', action='store_true', help='keep the server-side response cache on')
+    parser.add_argument('--url', help='load this running server (e.g. http://127.0.0.1:5000) instead of starting one')
+    args = parser.parse_args()
+    main(args.cars, args.connections, args.duration, args.modes.split(','), args.cache, args.url)
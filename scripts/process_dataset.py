@@ -1,19 +1,26 @@
 """Process cars-dataset.csv: keep selected columns and companies, write CSV and JSON outputs.
 
-Usage: python scripts/process_dataset.py
+Usage: python scripts/process_dataset.py [--workers N | --stream] [--input PATH] [--out-dir DIR]
+
+With --workers N the input is split into byte ranges that each start on a CSV
+record boundary and are filtered in a process pool. With --stream the input is
+read once and kept rows are written to both outputs as they are found, so
+memory stays flat whatever the input size. All modes write identical files.
 """
+import argparse
 import csv
+import io
 import json
 import os
 import re
 import difflib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
 from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 INPUT_CSV = ROOT / 'cars-dataset.csv'
 OUT_DIR = ROOT / 'data' / 'processed'
-OUT_CSV = OUT_DIR / 'processed-dataset.csv'
-OUT_JSON = OUT_DIR / 'processed-dataset.json'
 
 # Columns the user wants to keep (in this order)
 DESIRED_COLUMNS = [
@@ -38,22 +45,30 @@ def norm(s: str) -> str:
 
 ALLOWED_NORM = [norm(c) for c in ALLOWED_COMPANIES]
 
-# Debug: path info
-print(f'ROOT = {ROOT}')
-print(f'INPUT_CSV (initial) = {INPUT_CSV} (exists={INPUT_CSV.exists()})')
-print(f'CWD = {Path.cwd()}')
-# fallback location
-if not INPUT_CSV.exists():
-    alt = ROOT / 'data' / 'raw' / 'cars-dataset.csv'
-    print(f'Trying fallback: {alt} (exists={alt.exists()})')
-    if alt.exists():
-        INPUT_CSV = alt
-
-# Read input
-with open(INPUT_CSV, newline='', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    fieldnames = reader.fieldnames or []
 
+def resolve_input(path=None):
+    """The input CSV: `path` if given, else cars-dataset.csv at the root or in data/raw."""
+    if path:
+        return Path(path)
+    # Debug: path info
+    print(f'ROOT = {ROOT}')
+    print(f'INPUT_CSV (initial) = {INPUT_CSV} (exists={INPUT_CSV.exists()})')
+    print(f'CWD = {Path.cwd()}')
+    # fallback location
+    if not INPUT_CSV.exists():
+        alt = ROOT / 'data' / 'raw' / 'cars-dataset.csv'
+        print(f'Trying fallback: {alt} (exists={alt.exists()})')
+        if alt.exists():
+            return alt
+    return INPUT_CSV
+
+
+def choose_headers(fieldnames):
+    """Match DESIRED_COLUMNS to actual CSV headers.
+
+    Returns (chosen_headers, missing); a desired column that is not found is
+    kept under its own name and comes out empty.
+    """
     # Build mapping from normalized header -> actual header
     header_norm = {norm(h): h for h in fieldnames}
 
@@ -73,70 +88,214 @@ with open(INPUT_CSV, newline='', encoding='utf-8') as f:
                 # Not found: will still create an empty column named as desired
                 chosen_headers.append(dc)
                 missing.append(dc)
+    return chosen_headers, missing
 
-    # Process rows
-    kept = []
-    total = 0
-    kept_companies = set()
 
-with open(INPUT_CSV, newline='', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
+@lru_cache(maxsize=None)
+def company_allowed(comp_n: str) -> bool:
+    """Whether a normalized company name matches one of ALLOWED_COMPANIES.
+
+    Memoized: raw dumps repeat a few thousand distinct company strings, and the
+    difflib fallback is the most expensive step per row.
+    """
+    if not comp_n:
+        return False
+    for an in ALLOWED_NORM:
+        # direct exact match
+        if comp_n == an:
+            return True
+        # allow substring matching only for strings >= 3 chars to avoid accidental matches like 'ac' -> 'dacia'
+        if len(comp_n) >= 3 and (an in comp_n or comp_n in an):
+            return True
+    # fuzzy match (fallback)
+    return bool(difflib.get_close_matches(comp_n, ALLOWED_NORM, n=1, cutoff=0.85))
+
+
+def iter_kept(reader, chosen_headers, stats):
+    """Yield the DictReader rows whose company is allowed, as dicts keyed by DESIRED_COLUMNS.
+
+    `stats` accumulates 'total' (rows read) and 'companies' (raw company names kept).
+    """
+    stats.setdefault('total', 0)
+    stats.setdefault('companies', set())
     for row in reader:
-        total += 1
+        stats['total'] += 1
         comp_raw = (row.get('Company') or '').strip()
-        comp_n = norm(comp_raw)
-        keep = False
-        if comp_n:
-            # direct exact match
-            for an in ALLOWED_NORM:
-                if comp_n == an:
-                    keep = True
-                    break
-                # allow substring matching only for strings >= 3 chars to avoid accidental matches like 'ac' -> 'dacia'
-                if len(comp_n) >= 3 and (an in comp_n or comp_n in an):
-                    keep = True
+        if company_allowed(norm(comp_raw)):
+            stats['companies'].add(comp_raw)
+            # If a chosen header was one of the DESIRED_COLUMNS that wasn't found (we added the desired name), the value is ''
+            yield {desired: row.get(chosen, '') for desired, chosen in zip(DESIRED_COLUMNS, chosen_headers)}
+
+
+def filter_rows(reader, chosen_headers):
+    """Filter DictReader rows by company.
+
+    Returns (kept, total, kept_companies); kept rows are dicts keyed by
+    DESIRED_COLUMNS.
+    """
+    stats = {}
+    kept = list(iter_kept(reader, chosen_headers, stats))
+    return kept, stats['total'], stats['companies']
+
+
+def split_records(path, data_start, parts, block_size=1 << 24):
+    """Split the bytes from `data_start` to EOF into up to `parts` (start, end) ranges.
+
+    Each range ends on a newline outside any quoted field, so it holds whole
+    CSV records even when fields contain embedded newlines. Quote parity is
+    tracked from `data_start`; an escaped quote ("") counts twice and keeps it.
+    This relies on RFC 4180 quoting (any field containing a quote is quoted),
+    which is what csv writers produce.
+    """
+    size = os.path.getsize(path)
+    step = max((size - data_start) // max(parts, 1), 1)
+    bounds = [data_start]
+    target = data_start + step
+    with open(path, 'rb') as f:
+        f.seek(data_start)
+        offset = data_start  # file offset of block[0]
+        in_quotes = False    # parity of the quotes in block[:pos]
+        while target < size:
+            block = f.read(block_size)
+            if not block:
+                break
+            pos = 0
+            while target < size:
+                nl = block.find(b'\n', max(target - offset, pos))
+                if nl < 0:
                     break
-            # fuzzy match (fallback)
-            if not keep:
-                close = difflib.get_close_matches(comp_n, ALLOWED_NORM, n=1, cutoff=0.85)
-                if close:
-                    keep = True
-        if keep:
-            kept_companies.add(comp_raw)
-            # build output row: use chosen_headers list; if header not in original row, get ''
-            out_row = {col: row.get(col, '') for col in chosen_headers}
-            # If chosen header was one of the DESIRED_COLUMNS that wasn't found (we added the desired name), out_row will be '' and ok
-            kept.append(out_row)
-
-# Ensure output directory exists
-os.makedirs(OUT_DIR, exist_ok=True)
-
-# Write CSV
-with open(OUT_CSV, 'w', newline='', encoding='utf-8') as f:
-    # Use DESIRED_COLUMNS as output headers (user-facing)
-    writer = csv.DictWriter(f, fieldnames=DESIRED_COLUMNS, extrasaction='ignore')
-    writer.writeheader()
-    for r in kept:
-        # Map r keys (which are actual CSV headers) to desired header names where possible
-        out = {}
-        for desired, chosen in zip(DESIRED_COLUMNS, chosen_headers):
-            out[desired] = r.get(chosen, '')
-        writer.writerow(out)
-
-# Write JSON
-with open(OUT_JSON, 'w', encoding='utf-8') as f:
-    # Create JSON objects using DESIRED_COLUMNS
-    json_rows = []
-    for r in kept:
-        obj = {desired: r.get(chosen, '') for desired, chosen in zip(DESIRED_COLUMNS, chosen_headers)}
-        json_rows.append(obj)
-    json.dump(json_rows, f, indent=2, ensure_ascii=False)
-
-# Print summary
-print(f'Total rows read: {total}')
-print(f'Rows kept: {len(kept)}')
-print(f'Unique companies kept (sample): {sorted(list(kept_companies))[:20]}')
-if missing:
-    print('Warning: the following desired columns were not found in the CSV and will be empty:', missing)
-
-print(f'Wrote {OUT_CSV} and {OUT_JSON}')
+                in_quotes ^= block.count(b'"', pos, nl) % 2 == 1
+                pos = nl + 1
+                if in_quotes:
+                    # Newline inside a quoted field: try the next one.
+                    target = offset + pos
+                else:
+                    bounds.append(offset + pos)
+                    target = offset + pos + step
+            in_quotes ^= block.count(b'"', pos) % 2 == 1
+            offset += len(block)
+    if bounds[-1] < size:
+        bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _filter_range(args):
+    # Worker: filter the CSV records in one byte range.
+    path, start, end, fieldnames, chosen_headers = args
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    reader = csv.DictReader(io.StringIO(text, newline=''), fieldnames=fieldnames)
+    return filter_rows(reader, chosen_headers)
+
+
+def _header_end(path):
+    # Byte offset of the first data record (just past the header record).
+    offset = 0
+    in_quotes = False
+    with open(path, 'rb') as f:
+        for line in f:
+            offset += len(line)
+            in_quotes ^= line.count(b'"') % 2 == 1
+            if not in_quotes:
+                break
+    return offset
+
+
+def process_parallel(path, workers, fieldnames, chosen_headers):
+    """Same result as `filter_rows` over the whole file, using `workers` processes."""
+    ranges = split_records(path, _header_end(path), workers * 4)
+    kept = []
+    total = 0
+    kept_companies = set()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [(str(path), start, end, fieldnames, chosen_headers) for start, end in ranges]
+        # map() yields in submission order, so rows keep their input order.
+        for part_kept, part_total, part_companies in pool.map(_filter_range, jobs):
+            kept.extend(part_kept)
+            total += part_total
+            kept_companies |= part_companies
+    return kept, total, kept_companies
+
+
+def write_json_array(f, rows):
+    """Write `rows` as a JSON array, one row at a time.
+
+    The bytes are the same as json.dump(list(rows), f, indent=2, ensure_ascii=False).
+    """
+    first = True
+    for row in rows:
+        f.write('[\n  ' if first else ',\n  ')
+        f.write(json.dumps(row, indent=2, ensure_ascii=False).replace('\n', '\n  '))
+        first = False
+    f.write('[]' if first else '\n]')
+
+
+def write_outputs(rows, out_dir):
+    """Write processed-dataset.csv and processed-dataset.json to `out_dir`.
+
+    Both files are written in a single pass over `rows`, so a generator is
+    consumed once and never held in memory. Returns (out_csv, out_json, count).
+    """
+    out_csv = Path(out_dir) / 'processed-dataset.csv'
+    out_json = Path(out_dir) / 'processed-dataset.json'
+    count = 0
+
+    def counted():
+        nonlocal count
+        for row in rows:
+            count += 1
+            # CSV uses DESIRED_COLUMNS as output headers (user-facing)
+            writer.writerow(row)
+            yield row
+
+    # Ensure output directory exists
+    os.makedirs(out_dir, exist_ok=True)
+
+    with open(out_csv, 'w', newline='', encoding='utf-8') as f_csv, \
+            open(out_json, 'w', encoding='utf-8') as f_json:
+        writer = csv.DictWriter(f_csv, fieldnames=DESIRED_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        write_json_array(f_json, counted())
+    return out_csv, out_json, count
+
+
+def main(input_path=None, out_dir=OUT_DIR, workers=1, stream=False):
+    input_csv = resolve_input(input_path)
+
+    with open(input_csv, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        chosen_headers, missing = choose_headers(fieldnames)
+        if stream:
+            # Single pass: rows go from the reader straight to both outputs.
+            stats = {}
+            out_csv, out_json, kept_count = write_outputs(iter_kept(reader, chosen_headers, stats), out_dir)
+            total, kept_companies = stats['total'], stats['companies']
+        elif workers <= 1:
+            kept, total, kept_companies = filter_rows(reader, chosen_headers)
+
+    if not stream:
+        if workers > 1:
+            kept, total, kept_companies = process_parallel(input_csv, workers, fieldnames, chosen_headers)
+        out_csv, out_json, kept_count = write_outputs(kept, out_dir)
+
+    # Print summary
+    print(f'Total rows read: {total}')
+    print(f'Rows kept: {kept_count}')
+    print(f'Unique companies kept (sample): {sorted(list(kept_companies))[:20]}')
+    if missing:
+        print('Warning: the following desired columns were not found in the CSV and will be empty:', missing)
+
+    print(f'Wrote {out_csv} and {out_json}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Filter the raw cars dataset into data/processed')
+    parser.add_argument('--input', help='Raw CSV (default: cars-dataset.csv, or data/raw/cars-dataset.csv)')
+    parser.add_argument('--out-dir', default=str(OUT_DIR))
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--workers', type=int, default=1, help='Filter byte-range chunks in N processes')
+    mode.add_argument('--stream', action='store_true', help='Single pass in constant memory (serial)')
+    args = parser.parse_args()
+    main(args.input, args.out_dir, args.workers, args.stream)
@@ -0,0 +1,30 @@
+"""Recompute the `/cars/stats` summary tables from the `cars` table.
+
+Admin writes and the importer keep the tables current; run this after editing
+`cars` with raw SQL or to repair drift.
+
+Usage: python scripts/rebuild_stats.py
+"""
+import os
+import sys
+
+# ensure project root is importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app import create_app
+from models import db
+from services.catalog_version import bump_version, forget_version
+from services.stats import rebuild_stats
+
+
+if __name__ == '__main__':
+    app = create_app(os.environ.get('FLASK_ENV', 'production'))
+    with app.app_context():
+        brands = rebuild_stats()
+        # /cars/stats changed: revalidating clients and cached responses must not keep the old figures.
+        bump_version()
+        db.session.commit()
+        forget_version()
+    print(f'Rebuilt stats for {brands} brands')
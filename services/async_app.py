@@ -0,0 +1,174 @@
+"""ASGI adapter serving attendee reads through an async database layer.
+
+`AsyncApp(app)` wraps the Flask app for an ASGI server (see asgi.py).
+GET/HEAD requests for attendee endpoints run on the event loop: the Flask
+view, and with it services/car_service.py, runs unchanged inside
+`AsyncSession.run_sync`, with `db.session` pointing at that session. Its
+queries go through aiosqlite, so while one request waits on SQLite the
+loop serves the others. Other blocking work those views reach (a shared
+response cache backend, a synchronous catalog snapshot build) goes through
+`services.locks.run_blocking`, which hands it to a thread the same way.
+Everything else (auth, admin writes, /batch and the streamed export) is
+handed to a thread as a plain WSGI call on the usual synchronous engine.
+"""
+import asyncio
+import io
+import sys
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from werkzeug.exceptions import HTTPException
+
+from models import db
+from services.sqlite_profile import install_pragmas
+
+# Attendee endpoints that stream their body and so stay on the thread path.
+STREAMED_ENDPOINTS = frozenset({'api.attendee.export_cars_route'})
+
+
+def async_database_url(app):
+    """URL of the async engine: ASYNC_DATABASE_URI, else the app's SQLite file via aiosqlite."""
+    if app.config.get('ASYNC_DATABASE_URI'):
+        return app.config['ASYNC_DATABASE_URI']
+    with app.app_context():
+        url = db.engine.url
+    if url.get_backend_name() != 'sqlite':
+        raise RuntimeError('Set ASYNC_DATABASE_URL (e.g. postgresql+asyncpg://...) to serve this database asynchronously')
+    if url.database in (None, '', ':memory:'):
+        raise RuntimeError('The async mode needs a SQLite file, not an in-memory database')
+    return url.set(drivername='sqlite+aiosqlite')
+
+
+def _environ(scope, body):
+    """WSGI environ of an ASGI http scope."""
+    script_name = scope.get('root_path', '')
+    path = scope['path']
+    if script_name and path.startswith(script_name):
+        path = path[len(script_name):]
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+    for name, value in scope['headers']:
+        name, value = name.decode('latin-1').upper().replace('-', '_'), value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    if body:
+        # The body is read in full, so a chunked upload gets a length too.
+        environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+def _start_response(started):
+    """WSGI start_response that stores [status code, ASGI headers] in the list `started`."""
+    def start_response(status, headers, exc_info=None):
+        started[:] = [int(status.split(' ', 1)[0]),
+                      [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]]
+    return start_response
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+class AsyncApp:
+    def __init__(self, app):
+        self.app = app
+        self.engine = create_async_engine(async_database_url(app), poolclass=AsyncAdaptedQueuePool,
+                                          pool_size=app.config['ASYNC_DB_POOL_SIZE'], max_overflow=0)
+        install_pragmas(self.engine.sync_engine, app.config.get('SQLITE_PRAGMAS') or {})
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            return None
+        environ = _environ(scope, await _read_body(receive))
+        if self.served_async(environ):
+            async with AsyncSession(self.engine) as session:
+                status, headers, body = await session.run_sync(self._dispatch, environ)
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': body})
+        else:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._run_wsgi, environ, send, loop)
+        return None
+
+    def served_async(self, environ):
+        """True for GET/HEAD requests routed to an attendee endpoint with a buffered body."""
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            return False
+        try:
+            endpoint, _ = self.app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            return False
+        return endpoint.startswith('api.attendee.') and endpoint not in STREAMED_ENDPOINTS
+
+    def _dispatch(self, session, environ):
+        """Flask's request handling, on the greenlet run_sync provides, with db.session = `session`."""
+        app = self.app
+        with app.request_context(environ):
+            # Scoped to this request's app context; removed again by its teardown.
+            db.session.registry.set(session)
+            try:
+                response = app.full_dispatch_request()
+            except Exception as e:
+                response = app.handle_exception(e)
+            started = []
+            app_iter = response(environ, _start_response(started))
+            try:
+                return started[0], started[1], b''.join(app_iter)
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+
+    def _run_wsgi(self, environ, send, loop):
+        """Serve `environ` as a WSGI call on this thread, streaming chunks to `send` as they come."""
+        def emit(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        started = []
+        app_iter = self.app(environ, _start_response(started))
+        try:
+            emit({'type': 'http.response.start', 'status': started[0], 'headers': started[1]})
+            for chunk in app_iter:
+                if chunk:
+                    emit({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            emit({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
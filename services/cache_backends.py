@@ -0,0 +1,284 @@
+"""Key/value stores behind the response cache (services/response_cache.py).
+
+All backends store bytes under string keys with a TTL in seconds and share
+one interface (`get`, `set`, `clear`, `stats`); `CACHE_BACKEND` picks one:
+
+- 'memory': an LRU dict in each worker process, bounded by
+  `RESPONSE_CACHE_SIZE` entries. Fastest, but every gunicorn worker fills
+  and holds its own copy.
+- 'sqlite': one SQLite file (`CACHE_URL`, a path; by default in the app's
+  instance folder) shared by every worker on the host, so an entry
+  computed by one worker is a hit for the others.
+  Bounded by `RESPONSE_CACHE_SIZE` entries, oldest written first out.
+- 'redis': any server speaking the Redis protocol at `CACHE_URL`
+  (redis://host:port/db), shared across hosts; the server's own
+  `maxmemory` policy bounds it. Talks RESP directly, so it needs no client
+  library.
+
+Shared backends degrade to misses when the store is unreachable: a cache
+outage costs speed, not availability. Keys are prefixed with
+`CACHE_KEY_PREFIX` so several deployments can share one store.
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+
+class CacheBackend:
+    """Interface: bytes values under string keys, each with a TTL in seconds."""
+
+    name = 'base'
+
+    def get(self, key):
+        """The value, or None if missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def clear(self):
+        """Drop every entry under this backend's prefix."""
+        raise NotImplementedError
+
+    def stats(self):
+        """Backend-specific counters, e.g. entries held."""
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU with per-entry expiry."""
+
+    name = 'memory'
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'max_entries': self.max_entries, 'evictions': self.evictions}
+
+
+class SQLiteBackend(CacheBackend):
+    """A SQLite file shared by the worker processes of one host.
+
+    Each thread opens its own connection (WAL mode, so readers do not block
+    the writer). Expired rows and rows over `max_entries` are pruned every
+    `prune_every` writes rather than on each one.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path, max_entries, prefix='', prune_every=100):
+        self.path = path
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self.prune_every = prune_every
+        self.local = threading.local()
+        self.writes = 0
+
+    def _connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS response_cache ('
+                         'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, stored_at REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_response_cache_stored_at ON response_cache (stored_at)')
+            self.local.conn = conn
+        return conn
+
+    def get(self, key):
+        try:
+            row = self._connection().execute(
+                'SELECT value FROM response_cache WHERE key = ? AND expires_at > ?', (self.prefix + key, time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return bytes(row[0]) if row else None
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute('INSERT OR REPLACE INTO response_cache (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)',
+                         (self.prefix + key, value, now + ttl, now))
+            self.writes += 1
+            if self.writes % self.prune_every == 0:
+                self._prune(conn, now)
+        except sqlite3.Error:
+            pass
+
+    def _prune(self, conn, now):
+        conn.execute('DELETE FROM response_cache WHERE expires_at <= ?', (now,))
+        conn.execute('DELETE FROM response_cache WHERE key IN ('
+                     'SELECT key FROM response_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def clear(self):
+        try:
+            self._connection().execute(
+                "DELETE FROM response_cache WHERE substr(key, 1, ?) = ?", (len(self.prefix), self.prefix))
+        except sqlite3.Error:
+            pass
+
+    def stats(self):
+        try:
+            entries = self._connection().execute(
+                'SELECT COUNT(*) FROM response_cache WHERE expires_at > ?', (time.time(),)).fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        return {'entries': entries, 'max_entries': self.max_entries, 'path': self.path}
+
+
+class RespError(Exception):
+    """An error reply from a Redis-protocol server."""
+
+
+class RedisBackend(CacheBackend):
+    """Minimal Redis-protocol (RESP2) client: GET, SET ... PX, SCAN and DEL.
+
+    One connection per thread, opened on first use and dropped on any
+    socket error so the next call reconnects.
+    """
+
+    name = 'redis'
+
+    def __init__(self, url, prefix='', timeout=0.5):
+        parsed = urlparse(url or 'redis://localhost:6379/0')
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.db = int((parsed.path or '/0').lstrip('/') or 0)
+        self.password = parsed.password
+        self.prefix = prefix
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.local.sock, self.local.file = sock, sock.makefile('rb')
+        if self.password:
+            self._call('AUTH', self.password)
+        if self.db:
+            self._call('SELECT', self.db)
+
+    def _close(self):
+        sock = getattr(self.local, 'sock', None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self.local.sock = self.local.file = None
+
+    def _call(self, *args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        self.local.sock.sendall(b''.join(parts))
+        return self._reply()
+
+    def _reply(self):
+        line = self.local.file.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('connection closed')
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest
+        if kind == b'-':
+            raise RespError(rest.decode('utf-8', 'replace'))
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            size = int(rest)
+            if size < 0:
+                return None
+            data = self.local.file.read(size + 2)
+            return data[:-2]
+        if kind == b'*':
+            size = int(rest)
+            return None if size < 0 else [self._reply() for _ in range(size)]
+        raise ConnectionError(f'unexpected reply {line!r}')
+
+    def _command(self, *args):
+        """Run one command; None (and a fresh connection next time) on network errors."""
+        try:
+            if getattr(self.local, 'sock', None) is None:
+                self._connect()
+            return self._call(*args)
+        except (OSError, ConnectionError, RespError, ValueError):
+            self._close()
+            return None
+
+    def get(self, key):
+        return self._command('GET', self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self._command('SET', self.prefix + key, value, 'PX', max(int(ttl * 1000), 1))
+
+    def clear(self):
+        cursor = b'0'
+        while True:
+            reply = self._command('SCAN', cursor, 'MATCH', self.prefix + '*', 'COUNT', 500)
+            if not reply:
+                return
+            cursor, keys = reply
+            if keys:
+                self._command('DEL', *keys)
+            if cursor == b'0':
+                return
+
+
+def create_backend(config, instance_path):
+    """The backend named by `config['CACHE_BACKEND']`, or None when caching is off.
+
+    The sqlite file defaults to the app's instance folder, next to the
+    database, rather than a fixed name in the world-writable temp dir.
+    """
+    size = config.get('RESPONSE_CACHE_SIZE', 1024)
+    kind = config.get('CACHE_BACKEND', 'memory')
+    if size <= 0 or kind == 'none':
+        return None
+    prefix = config.get('CACHE_KEY_PREFIX', '')
+    if kind == 'memory':
+        return MemoryBackend(size)
+    if kind == 'sqlite':
+        path = config.get('CACHE_URL')
+        if not path:
+            os.makedirs(instance_path, exist_ok=True)
+            path = os.path.join(instance_path, 'response-cache.sqlite')
+        return SQLiteBackend(path, size, prefix)
+    if kind == 'redis':
+        return RedisBackend(config.get('CACHE_URL'), prefix)
+    raise ValueError(f'Unknown CACHE_BACKEND {kind!r} (expected memory, sqlite, redis or none)')
@@ -1,12 +1,36 @@
-from models import db, Car
-from sqlalchemy import or_
-from collections import OrderedDict
+from models import db, Car, Brand, Serie, SORTABLE_COLUMNS, RANKING_METRICS
+from sqlalchemy import or_, and_, tuple_
+from sqlalchemy.orm import load_only
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+from services.search_index import (
+    search_index_enabled, build_match_query, match_ids_select, ranked_match_ids, count_matches
+)
+from services import stats
+from services.catalog_snapshot import fetch_cars, get_snapshot, invalidate_snapshot
+from services.similarity import SIMILARITY_FEATURES, rank_with_snapshot, rank_with_sql
+from services.neighbors import add_to_neighbors, invalidate_neighbors, queue_neighbors, stored_neighbors
+from services.dimensions import assign_dimensions, brand_id_of, serie_ids_matching
+from services.catalog_version import bump_version, forget_version
+from services.response_cache import clear_response_cache
+import base64
 import json
+import math
 
+# Upper bound on how many ranked hits a search can page through.
+SEARCH_RESULT_CAP = 1000
 
-def safe_load_raw_spec(raw_spec: str | None) -> dict:
+SearchResults = namedtuple('SearchResults', 'items total page per_page pages')
+
+# One page of keyset (cursor) pagination. `next_cursor` is None on the last page.
+KeysetPage = namedtuple('KeysetPage', 'items next_cursor per_page')
+
+
+def safe_load_raw_spec(raw_spec: str | dict | None) -> dict:
     if not raw_spec:
         return {}
+    if isinstance(raw_spec, dict):
+        return raw_spec
     try:
         return json.loads(raw_spec)
     except Exception:
@@ -40,6 +64,135 @@ def reorder_car_spec(spec_dict):
     return dict(ordered)
 
 
+# Legacy/mock fields never exposed in attendee outputs.
+_HIDDEN_SPEC_KEYS = (
+    'price', 'Price',
+    'color', 'Color',
+    'created_at', 'createdAt', 'Created At', 'Created',
+    'updated_at', 'updatedAt', 'Updated At', 'Updated',
+)
+
+# (attendee label, Car attribute, raw_spec aliases replaced by the label), in
+# the order the labels are put first in the attendee spec.
+_CANONICAL_SPEC_FIELDS = (
+    ('Company', 'brand', ('brand', 'Brand', 'Company')),
+    ('Model', 'model', ('model', 'Model')),
+    ('Production Years', 'year', ('year', 'Year', 'Production Years')),
+    ('Cylinders', 'cylinders', ('cylinders', 'Cylinders')),
+    ('Fuel', 'fuel_type', ('fuel_type', 'Fuel Type', 'Fuel')),
+    ('Gearbox', 'transmission', ('transmission', 'Transmission', 'Gearbox')),
+    ('Drive Type', 'drive_type', ('drive_type', 'Drive type', 'Drive Type', 'Drive')),
+    # The dataset uses a slightly odd key (sometimes with a trailing newline).
+    ('Power(HP)', 'horsepower', ('horsepower', 'Horsepower', 'Power(HP)', 'Power(HP)\n', 'Power(HP)\r\n')),
+    ('Torque(Nm)', 'torque_nm', ('torque_nm', 'Torque', 'Torque (Nm)', 'Torque Nm', 'Torque(Nm)')),
+    ('Acceleration 0-62 Mph (0-100kph)', 'acceleration_0_100', (
+        'acceleration_0_100', 'Acceleration 0-100', 'Acceleration 0-62 Mph (0-100kph)',
+        '0-100', '0-100 km/h', '0-100km/h',
+    )),
+    ('Top Speed', 'vitesse_max', ('vitesse_max', 'Top Speed', 'Vitesse Max', 'Vitesse max')),
+    ('Length', 'length', ('length', 'Length')),
+    ('Width', 'width', ('width', 'Width')),
+    ('Height', 'height', ('height', 'Height')),
+    ('City mpg', 'city_mpg', ('city_mpg', 'City MPG', 'City mpg')),
+    ('Highway mpg', 'highway_mpg', ('highway_mpg', 'Highway MPG', 'Highway mpg')),
+    ('Combined mpg', 'combined_mpg', ('combined_mpg', 'Combined MPG', 'Combined mpg')),
+)
+
+
+def build_attendee_spec(car) -> dict:
+    """Merge the canonical DB columns over the car's raw_spec.
+
+    Canonical values replace their raw_spec aliases and come first (the
+    frontend renders in insertion order); remaining raw_spec keys follow.
+    Blank values and the dataset's 0 "unknown" placeholders are not surfaced.
+    """
+    base = safe_load_raw_spec(getattr(car, 'raw_spec', None))
+    merged = dict(base) if isinstance(base, dict) else {}
+    for key in _HIDDEN_SPEC_KEYS:
+        merged.pop(key, None)
+
+    canonical = {}
+    for label, attr, aliases in _CANONICAL_SPEC_FIELDS:
+        value = getattr(car, attr, None)
+        if attr == 'year' and value is not None:
+            value = str(value)
+        if value is None:
+            continue
+        if isinstance(value, str) and not value.strip():
+            continue
+        if isinstance(value, (int, float)) and value <= 0:
+            continue
+        for alias in aliases:
+            merged.pop(alias, None)
+        canonical[label] = value
+
+    # Labels without a canonical value keep their raw_spec value, still up front.
+    ordered = {}
+    for label, _attr, _aliases in _CANONICAL_SPEC_FIELDS:
+        if label in canonical:
+            ordered[label] = canonical[label]
+        elif label in merged:
+            ordered[label] = merged[label]
+    for key, value in merged.items():
+        if key not in ordered:
+            ordered[key] = value
+    return ordered
+
+
+def refresh_attendee_spec(car):
+    """Recompute and store the materialized attendee spec of `car`."""
+    car.attendee_spec = json.dumps(build_attendee_spec(car), ensure_ascii=False)
+
+
+def get_attendee_spec(car) -> dict:
+    """The attendee spec stored at write time, built live for rows not yet backfilled."""
+    if car.attendee_spec:
+        return json.loads(car.attendee_spec)
+    return build_attendee_spec(car)
+
+
+# Canonical columns a sparse fieldset (`fields=`) may name; 'spec' names the
+# full merged spec, the only field that needs raw_spec / attendee_spec.
+FIELDSET_COLUMNS = (
+    'brand', 'model', 'year', 'cylinders', 'engine_type', 'horsepower', 'fuel_type', 'transmission',
+    'acceleration_0_100', 'vitesse_max', 'drive_type', 'city_mpg', 'highway_mpg', 'combined_mpg',
+    'torque_nm', 'length', 'width', 'height',
+)
+
+
+def parse_fields(value):
+    """Field names of a comma-separated `fields=` value, or None when absent or blank.
+
+    Raises ValueError on names that are neither FIELDSET_COLUMNS nor 'spec'.
+    """
+    fields = list(dict.fromkeys(name.strip() for name in (value or '').split(',') if name.strip()))
+    if not fields:
+        return None
+    unknown = [name for name in fields if name != 'spec' and name not in FIELDSET_COLUMNS]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}. '
+                         f'Choose from spec, {", ".join(FIELDSET_COLUMNS)}')
+    return fields
+
+
+def _fields_options(fields, *extra):
+    """Loader options selecting only id, `fields` and `extra` columns; none without fields or with 'spec'."""
+    if not fields or 'spec' in fields:
+        return []
+    names = dict.fromkeys(('id', *fields, *extra))
+    return [load_only(*[getattr(Car, name) for name in names])]
+
+
+def car_entry(car, fields=None):
+    """List entry of `car`: {'id', 'spec'}, or id plus the requested `fields` (column values)."""
+    if not fields:
+        return {'id': car.id, 'spec': get_attendee_spec(car)}
+    entry = {'id': car.id}
+    for name in fields:
+        entry[name] = get_attendee_spec(car) if name == 'spec' else getattr(car, name)
+    return entry
+
+
 def _normalize_metric_value(value):
     """Normalize numeric metric values.
 
@@ -53,6 +206,58 @@ def _normalize_metric_value(value):
     return value
 
 
+def clear_metric_placeholders(values):
+    """Copy of a car field dict with 0 "unknown" ranking metrics set to None."""
+    values = dict(values)
+    for field in RANKING_METRICS:
+        if field in values:
+            values[field] = _normalize_metric_value(values[field])
+    return values
+
+
+# Metrics compared side by side, and whether a higher value wins.
+# Higher MPG = more efficient = better; lower 0-100 time = faster = better.
+COMPARISON_METRICS = OrderedDict((
+    ('horsepower', True),
+    ('combined_mpg', True),
+    ('acceleration_0_100', False),
+    ('vitesse_max', True),
+    ('torque_nm', True),
+    ('year', True),
+))
+
+
+def _metric_display(metric):
+    return metric.replace('_', ' ').title()
+
+
+def _comparison_metrics(car):
+    return {
+        'horsepower': _normalize_metric_value(car.horsepower),
+        'combined_mpg': _normalize_metric_value(car.combined_mpg),
+        'acceleration_0_100': _normalize_metric_value(car.acceleration_0_100),
+        'vitesse_max': _normalize_metric_value(car.vitesse_max),
+        'cylinders': car.cylinders,
+        'torque_nm': _normalize_metric_value(car.torque_nm),
+        'year': car.year
+    }
+
+
+def _comparison_entries(cars, winners):
+    """Response entries for `cars`, each with the metrics it won (if any)."""
+    entries = []
+    for car in cars:
+        entry = {'id': car.id, 'spec': get_attendee_spec(car), 'metrics': _comparison_metrics(car)}
+        winning_metrics = [
+            {'metric': metric, 'metric_display': info['metric_display'], 'value': info['value']}
+            for metric, info in winners.items() if info['car_id'] == car.id
+        ]
+        if winning_metrics:
+            entry['winning_metrics'] = winning_metrics
+        entries.append(entry)
+    return entries
+
+
 def compare_cars(car_ids):
     """
     Compare multiple cars side-by-side.
@@ -67,128 +272,105 @@ def compare_cars(car_ids):
     if not car_ids or len(car_ids) < 2:
         return {'error': 'At least 2 car IDs required for comparison', 'cars': [], 'comparison_winners': {}}
     
-    cars = Car.query.filter(Car.id.in_(car_ids)).all()
+    cars = Car.query.filter(Car.id.in_(car_ids)).order_by(Car.id).all()
     
     if len(cars) < 2:
         return {'error': f'Only found {len(cars)} cars, need at least 2', 'cars': [], 'comparison_winners': {}}
     
-    # Build comparison data
-    comparison_data = []
-    for car in cars:
-        spec = safe_load_raw_spec(car.raw_spec)
-        reordered = reorder_car_spec(spec)
-        comparison_data.append({
-            'id': car.id,
-            'spec': reordered,
-            'metrics': {
-                'horsepower': _normalize_metric_value(car.horsepower),
-                'combined_mpg': _normalize_metric_value(car.combined_mpg),
-                'acceleration_0_100': _normalize_metric_value(car.acceleration_0_100),
-                'vitesse_max': _normalize_metric_value(car.vitesse_max),
-                'cylinders': car.cylinders,
-                'torque_nm': _normalize_metric_value(car.torque_nm),
-                'year': car.year
-            }
-        })
-    
-    # Determine winners for each metric (higher is better for most, lower is better for acceleration & mpg)
+    # Best value per metric; ties go to the lowest id, as in the group comparisons.
     winners = {}
-    metrics_config = {
-        'horsepower': {'higher_better': True},
-        'combined_mpg': {'higher_better': True},  # Higher MPG = more efficient = better
-        'acceleration_0_100': {'higher_better': False},  # Lower time = faster = better
-        'vitesse_max': {'higher_better': True},
-        'torque_nm': {'higher_better': True},
-        'year': {'higher_better': True}
-    }
-    
-    for metric, config in metrics_config.items():
-        valid_cars = [c for c in comparison_data if c['metrics'][metric] is not None]
-        if valid_cars:
-            if config['higher_better']:
-                winner = max(valid_cars, key=lambda x: x['metrics'][metric])
-            else:
-                winner = min(valid_cars, key=lambda x: x['metrics'][metric])
-            
-            winners[metric] = {
-                'car_id': winner['id'],
-                'value': winner['metrics'][metric],
-                'metric_display': metric.replace('_', ' ').title()
-            }
-    
-    # Build response with winning_metrics for each car
-    cars_response = []
-    for c in comparison_data:
-        car_response = {'id': c['id'], 'spec': c['spec'], 'metrics': c['metrics']}
-        # Find which metrics this car won
-        winning_metrics = []
-        for metric, winner_info in winners.items():
-            if winner_info['car_id'] == c['id']:
-                winning_metrics.append({
-                    'metric': metric,
-                    'metric_display': winner_info['metric_display'],
-                    'value': winner_info['value']
-                })
-        if winning_metrics:
-            car_response['winning_metrics'] = winning_metrics
-        cars_response.append(car_response)
+    metrics = {car.id: _comparison_metrics(car) for car in cars}
+    for metric, higher_better in COMPARISON_METRICS.items():
+        valid = [(values[metric], car_id) for car_id, values in metrics.items() if values[metric] is not None]
+        if valid:
+            value, car_id = min(valid, key=lambda item: (-item[0] if higher_better else item[0], item[1]))
+            winners[metric] = {'car_id': car_id, 'value': value, 'metric_display': _metric_display(metric)}
     
     return {
-        'cars': cars_response,
+        'cars': _comparison_entries(cars, winners),
         'comparison_winners': winners,
         'total_cars': len(cars)
     }
 
 
-def compare_by_serie(serie):
+def _group_winners(criterion):
+    """(car count, comparison_winners) of the cars matching `criterion`, in one statement.
+
+    Counts and best values are plain aggregates; each winner's id is an
+    uncorrelated `ORDER BY metric, id LIMIT 1` subquery, so ties go to the
+    lowest id and no car row leaves the database.
+    """
+    columns = [db.func.count(Car.id)]
+    for metric, higher_better in COMPARISON_METRICS.items():
+        column = getattr(Car, metric)
+        best = db.func.max(column) if higher_better else db.func.min(column)
+        winner = (db.select(Car.id).where(criterion, column.isnot(None))
+                  .order_by(column.desc() if higher_better else column.asc(), Car.id)
+                  .limit(1).correlate(None).scalar_subquery())
+        columns += [best, winner]
+    count, *bests = db.session.execute(db.select(*columns).where(criterion)).one()
+
+    winners = {}
+    for i, metric in enumerate(COMPARISON_METRICS):
+        value, car_id = bests[2 * i], bests[2 * i + 1]
+        if car_id is not None:
+            winners[metric] = {'car_id': car_id, 'value': value, 'metric_display': _metric_display(metric)}
+    return count, winners
+
+
+def _compare_group(criterion, label, page=1, per_page=20, summary_only=False):
+    """Comparison of every car matching `criterion`: winners over the whole group, cars one page at a time."""
+    total, winners = _group_winners(criterion)
+    if total < 2:
+        return {'error': f'Found {total} cars for {label}, need at least 2', 'cars': [], 'comparison_winners': {}}
+
+    result = {'comparison_winners': winners, 'total_cars': total}
+    if summary_only:
+        return result
+    page = max(int(page), 1)
+    per_page = min(max(int(per_page), 1), 100)
+    cars = Car.query.filter(criterion).order_by(Car.id).offset((page - 1) * per_page).limit(per_page).all()
+    result['cars'] = _comparison_entries(cars, winners)
+    result.update(page=page, per_page=per_page, pages=math.ceil(total / per_page))
+    return result
+
+
+def compare_by_serie(serie, page=1, per_page=20, summary_only=False):
     """
     Compare all cars with a specific serie/model series.
-    Returns all variants grouped with comparison winners.
+    Winners are computed over every variant; cars are returned one page at a time
+    (none with `summary_only`).
     """
-    cars = Car.query.filter(Car.model.ilike(f"%{serie}%")).all()
-    
-    if not cars or len(cars) < 2:
-        return {'error': f'Found {len(cars)} cars for serie "{serie}", need at least 2', 'cars': [], 'comparison_winners': {}}
-    
-    car_ids = [car.id for car in cars]
-    result = compare_cars(car_ids)
+    result = _compare_group(Car.serie_id.in_(serie_ids_matching(serie)), f'serie "{serie}"',
+                            page, per_page, summary_only)
     result['serie'] = serie
     return result
 
 
-def compare_by_brand(brand):
+def compare_by_brand(brand, page=1, per_page=20, summary_only=False):
     """
     Compare all cars from a specific brand.
-    Returns all brand cars with comparison winners.
+    Winners are computed over the whole brand; cars are returned one page at a time
+    (none with `summary_only`).
     """
-    cars = Car.query.filter(Car.brand.ilike(brand)).all()
-    
-    if not cars or len(cars) < 2:
-        return {'error': f'Found {len(cars)} cars for brand "{brand}", need at least 2', 'cars': [], 'comparison_winners': {}}
-    
-    car_ids = [car.id for car in cars]
-    result = compare_cars(car_ids)
+    result = _compare_group(Car.brand_id == brand_id_of(brand), f'brand "{brand}"',
+                            page, per_page, summary_only)
     result['brand'] = brand
     return result
 
 
-def compare_by_year(year):
+def compare_by_year(year, page=1, per_page=20, summary_only=False):
     """
     Compare all cars from a specific production year.
-    Returns all cars from that year with comparison winners.
+    Winners are computed over the whole year; cars are returned one page at a time
+    (none with `summary_only`).
     """
-    cars = Car.query.filter(Car.year == int(year)).all()
-    
-    if not cars or len(cars) < 2:
-        return {'error': f'Found {len(cars)} cars for year {year}, need at least 2', 'cars': [], 'comparison_winners': {}}
-    
-    car_ids = [car.id for car in cars]
-    result = compare_cars(car_ids)
+    result = _compare_group(Car.year == int(year), f'year {year}', page, per_page, summary_only)
     result['year'] = year
     return result
 
 
-def get_top_cars(metric='horsepower', limit=10):
+def get_top_cars(metric='horsepower', limit=10, fields=None):
     """
     Get top N cars ranked by a specific metric.
     
@@ -200,7 +382,8 @@ def get_top_cars(metric='horsepower', limit=10):
     - torque_nm: Highest torque
     - year: Newest cars
     
-    Returns ranked list with positions.
+    Returns ranked list with positions; with `fields`, entries carry those
+    columns instead of the full spec.
     """
     limit = min(int(limit), 100)  # Cap at 100
     
@@ -222,15 +405,19 @@ def get_top_cars(metric='horsepower', limit=10):
         }
     
     column, ascending = metric_columns[metric]
+    options = _fields_options(fields, metric)
     
-    query = Car.query.filter(column.isnot(None))
-    
-    if ascending:
-        query = query.order_by(column.asc())
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        cars = fetch_cars(snapshot.top(metric, limit, ascending), options)
     else:
-        query = query.order_by(column.desc())
-    
-    cars = query.limit(limit).all()
+        # Read straight off the (metric, id) index; unknown values are NULL, not 0.
+        query = Car.query.options(*options).filter(column.isnot(None))
+        if ascending:
+            query = query.order_by(column.asc(), Car.id.asc())
+        else:
+            query = query.order_by(column.desc(), Car.id.desc())
+        cars = query.limit(limit).all()
     
     if not cars:
         return {'error': f'No cars found with metric {metric}', 'cars': [], 'metric': metric}
@@ -238,12 +425,9 @@ def get_top_cars(metric='horsepower', limit=10):
     # Build ranked list
     cars_list = []
     for position, car in enumerate(cars, 1):
-        spec = safe_load_raw_spec(car.raw_spec)
-        reordered = reorder_car_spec(spec)
         cars_list.append({
             'rank': position,
-            'id': car.id,
-            'spec': reordered,
+            **car_entry(car, fields),
             'metric_value': getattr(car, metric)
         })
     
@@ -256,100 +440,46 @@ def get_top_cars(metric='horsepower', limit=10):
     }
 
 
-def get_similar_cars(car_id, limit=10):
+def get_similar_cars(car_id, limit=10, fields=None):
     """
-    Find cars similar to the given car_id based on:
-    - Body type (drive_type)
-    - Horsepower range (±20%)
-    - Price range (if available)
-    
-    Returns similar cars ranked by similarity score.
+    Find the cars most similar to car_id across the whole catalog.
+
+    Scores combine horsepower, year, torque, top speed, drive type and fuel
+    type (see services/similarity.py), using only the features both cars
+    have. Returns the top `limit` ranked by similarity score, served from
+    the precomputed car_neighbors table when it has this car's list. With
+    `fields`, the reference and similar cars carry those columns instead of
+    the full spec (`reference_car` replaces `reference_car_spec`).
     """
-    target_car = Car.query.get(car_id)
+    features = [name for name, _kind, _weight in SIMILARITY_FEATURES]
+    target_car = db.session.get(Car, car_id, options=_fields_options(fields, *features))
     if not target_car:
         return {'error': f'Car with ID {car_id} not found', 'cars': []}
+
+    limit = int(limit)
+    ranked = stored_neighbors(car_id, limit)
+    if ranked is None:
+        # Live computation; reads never write, the offline job stores the list (services/neighbors.py).
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            ranked = rank_with_snapshot(snapshot, car_id, limit)
+        if ranked is None:
+            ranked = rank_with_sql(target_car, limit)
+
+    scores = dict(ranked)
+    similar_list = [
+        {
+            **car_entry(car, fields),
+            'similarity_score': round(scores[car.id], 1) if scores[car.id] is not None else None
+        }
+        for car in fetch_cars([car_id for car_id, _score in ranked], _fields_options(fields))
+    ]
     
-    target_hp = _normalize_metric_value(target_car.horsepower)
-    target_year = target_car.year if (isinstance(target_car.year, int) and target_car.year > 0) else None
-
-    # Find similar cars (only use constraints that the reference car actually has)
-    filters = [Car.id != car_id]
-    if target_car.drive_type:
-        filters.append(Car.drive_type == target_car.drive_type)
-    if target_hp is not None:
-        hp_range = max(20, float(target_hp) * 0.2)  # ±20% or minimum ±20
-        filters.append(Car.horsepower.isnot(None))
-        filters.append(Car.horsepower > 0)
-        filters.append(Car.horsepower.between(float(target_hp) - hp_range, float(target_hp) + hp_range))
-    if target_year is not None:
-        filters.append(Car.year.isnot(None))
-        filters.append(Car.year.between(target_year - 10, target_year + 10))
-
-    similar = Car.query.filter(*filters).limit(int(limit)).all()
-    
-    if not similar:
-        # Fallback: get cars with same drive type
-        fallback_filters = [Car.id != car_id]
-        if target_car.drive_type:
-            fallback_filters.append(Car.drive_type == target_car.drive_type)
-        similar = Car.query.filter(*fallback_filters).limit(int(limit)).all()
-    
-    # Build target spec
-    target_spec = safe_load_raw_spec(target_car.raw_spec)
-    target_spec = reorder_car_spec(target_spec)
-    
-    # Build similar cars list
-    similar_list = []
-    for car in similar:
-        spec = safe_load_raw_spec(car.raw_spec)
-        reordered = reorder_car_spec(spec)
-        
-        # Calculate similarity score based only on fields present on BOTH cars.
-        score_sum = 0.0
-        weight_sum = 0.0
-
-        car_hp = _normalize_metric_value(car.horsepower)
-        if car_hp is not None and target_hp is not None:
-            hp_diff = abs(float(car_hp) - float(target_hp))
-            hp_sim = 1.0 - (hp_diff / max(float(car_hp), float(target_hp)))
-            hp_sim = max(0.0, min(1.0, hp_sim))
-            score_sum += hp_sim * 50.0
-            weight_sum += 50.0
-
-        car_year = car.year if (isinstance(car.year, int) and car.year > 0) else None
-        if car_year is not None and target_year is not None:
-            year_diff = abs(int(car_year) - int(target_year))
-            year_sim = 1.0 - (year_diff / 15.0)
-            year_sim = max(0.0, min(1.0, year_sim))
-            score_sum += year_sim * 30.0
-            weight_sum += 30.0
-
-        if car.drive_type and target_car.drive_type:
-            score_sum += (20.0 if car.drive_type == target_car.drive_type else 0.0)
-            weight_sum += 20.0
-
-        if car.fuel_type and target_car.fuel_type:
-            score_sum += (10.0 if str(car.fuel_type).lower() == str(target_car.fuel_type).lower() else 0.0)
-            weight_sum += 10.0
-
-        similarity_score = round((score_sum / weight_sum) * 100.0, 1) if weight_sum > 0 else None
-
-        similar_list.append({
-            'id': car.id,
-            'spec': reordered,
-            'similarity_score': similarity_score
-        })
-    
-    # Sort by similarity score; cars without enough data go last.
-    similar_list = sorted(
-        similar_list,
-        key=lambda x: (x.get('similarity_score') is not None, x.get('similarity_score') or -1),
-        reverse=True,
-    )
-    
+    reference = {'reference_car': car_entry(target_car, fields)} if fields else {
+        'reference_car_spec': get_attendee_spec(target_car)}
     return {
         'reference_car_id': car_id,
-        'reference_car_spec': target_spec,
+        **reference,
         'similar_cars': similar_list,
         'total_results': len(similar_list)
     }
@@ -414,8 +544,8 @@ def get_available_series(limit=50):
     Get list of available model series for filtering/comparing.
     Helps users know what series they can search for.
     """
-    results = db.session.query(Car.model, db.func.count(Car.id)).group_by(Car.model).order_by(db.func.count(Car.id).desc()).limit(limit).all()
-    series_list = [{'series': model, 'count': count} for model, count in results if model]
+    results = db.session.query(Serie.name, db.func.count(Car.id)).join(Car, Car.serie_id == Serie.id).group_by(Serie.id).order_by(db.func.count(Car.id).desc()).limit(limit).all()
+    series_list = [{'series': model, 'count': count} for model, count in results]
     
     return {
         'available_series': series_list,
@@ -433,8 +563,8 @@ def get_available_brands(limit=50):
     Get list of available brands for filtering/comparing.
     Helps users know what brands are available.
     """
-    results = db.session.query(Car.brand, db.func.count(Car.id)).group_by(Car.brand).order_by(db.func.count(Car.id).desc()).limit(limit).all()
-    brands_list = [{'brand': brand, 'count': count} for brand, count in results if brand]
+    results = db.session.query(Brand.name, db.func.count(Car.id)).join(Car, Car.brand_id == Brand.id).group_by(Brand.id).order_by(db.func.count(Car.id).desc()).limit(limit).all()
+    brands_list = [{'brand': brand, 'count': count} for brand, count in results]
     
     return {
         'available_brands': brands_list,
@@ -465,6 +595,7 @@ def get_available_years():
 
 
 def create_car(data):
+    data = clear_metric_placeholders(data)
     raw_spec = data.get('raw_spec')
     # Attendee endpoints currently display `raw_spec` (source dataset JSON). If an
     # admin creates a car without providing raw_spec, it becomes hard to find in
@@ -508,26 +639,104 @@ def create_car(data):
         height=data.get('height'),
         raw_spec=raw_spec
     )
+    refresh_attendee_spec(car)
+    assign_dimensions(car)
     db.session.add(car)
+    stats.record_change(None, stats.snapshot(car))
+    add_to_neighbors(car)
+    queue_neighbors([car.id], changed=True)
+    bump_version()
     db.session.commit()
+    invalidate_snapshot()
+    forget_version()
+    clear_response_cache()
     return car
 
 
-def get_cars(filters=None, sort_by='id', order='asc', page=1, per_page=20):
+def encode_cursor(value, car_id):
+    """Opaque cursor for the row just after (value, car_id)."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, car_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort_by):
+    """Inverse of encode_cursor. Raises ValueError for anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, car_id = json.loads(raw)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(car_id, int):
+        raise ValueError('Invalid cursor')
+    if value is not None and sort_by in ('created_at', 'updated_at'):
+        try:
+            value = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError('Invalid cursor')
+    return value, car_id
+
+
+def _keyset_paginate(query, sort_by='id', order='asc', cursor='', per_page=20):
+    """Seek-based pagination ordered by (sort_by, id).
+
+    Unlike paginate(), this never runs a COUNT or an OFFSET: each page is an
+    index range scan starting right after the last row of the previous page.
+    SQLite sorts NULLs first ascending and last descending, and the seek
+    predicates below follow that.
+    """
+    per_page = min(max(int(per_page), 1), 100)
+    column = getattr(Car, sort_by)
+    descending = order == 'desc'
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_by)
+        if sort_by == 'id':
+            query = query.filter(Car.id < last_id if descending else Car.id > last_id)
+        elif value is None:
+            null_tail = and_(column.is_(None), Car.id < last_id if descending else Car.id > last_id)
+            query = query.filter(null_tail if descending else or_(null_tail, column.isnot(None)))
+        elif descending:
+            query = query.filter(or_(tuple_(column, Car.id) < tuple_(value, last_id), column.is_(None)))
+        else:
+            query = query.filter(tuple_(column, Car.id) > tuple_(value, last_id))
+
+    if sort_by == 'id':
+        ordering = [Car.id.desc() if descending else Car.id.asc()]
+    else:
+        ordering = [column.desc(), Car.id.desc()] if descending else [column.asc(), Car.id.asc()]
+
+    rows = query.order_by(*ordering).limit(per_page + 1).all()
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_by), last.id)
+    return KeysetPage(items, next_cursor, per_page)
+
+
+def _filtered_cars_query(filters=None):
+    """Car query with the /cars filter set applied (unordered, unpaginated)."""
     query = Car.query
 
     if filters:
         if q := filters.get('q'):
-            query = query.filter(
-                or_(
-                    Car.brand.ilike(f"%{q}%"),
-                    Car.model.ilike(f"%{q}%"),
-                    Car.fuel_type.ilike(f"%{q}%"),
-                    Car.transmission.ilike(f"%{q}%"),
-                    Car.drive_type.ilike(f"%{q}%"),
-                    Car.raw_spec.ilike(f"%{q}%"),
+            if search_index_enabled(db.engine):
+                # An unsearchable query (only punctuation) matches nothing.
+                match = build_match_query(q)
+                query = query.filter(Car.id.in_(match_ids_select(match)) if match else db.false())
+            else:
+                query = query.filter(
+                    or_(
+                        Car.brand.ilike(f"%{q}%"),
+                        Car.model.ilike(f"%{q}%"),
+                        Car.fuel_type.ilike(f"%{q}%"),
+                        Car.transmission.ilike(f"%{q}%"),
+                        Car.drive_type.ilike(f"%{q}%"),
+                        Car.raw_spec.ilike(f"%{q}%"),
+                    )
                 )
-            )
         if brand := filters.get('brand'):
             query = query.filter(Car.brand.ilike(f"%{brand}%"))
         if model := filters.get('model'):
@@ -550,71 +759,113 @@ def get_cars(filters=None, sort_by='id', order='asc', page=1, per_page=20):
         if cylinders := filters.get('cylinders'):
             query = query.filter(Car.cylinders == int(cylinders))
 
+        # Unknown metrics are stored as NULL (never 0), so a bound alone
+        # excludes them and each range is one seek on the (metric, id) index.
         if min_horsepower := filters.get('min_horsepower'):
-            # Exclude unknown/placeholder horsepower values (NULL/0)
-            query = query.filter(Car.horsepower.isnot(None))
-            query = query.filter(Car.horsepower > 0)
             query = query.filter(Car.horsepower >= int(min_horsepower))
         if max_horsepower := filters.get('max_horsepower'):
-            query = query.filter(Car.horsepower.isnot(None))
-            query = query.filter(Car.horsepower > 0)
             query = query.filter(Car.horsepower <= int(max_horsepower))
 
         if min_combined_mpg := filters.get('min_combined_mpg'):
-            # Exclude unknown/placeholder MPG values (NULL/0)
-            query = query.filter(Car.combined_mpg.isnot(None))
-            query = query.filter(Car.combined_mpg > 0)
             query = query.filter(Car.combined_mpg >= float(min_combined_mpg))
         if max_combined_mpg := filters.get('max_combined_mpg'):
-            query = query.filter(Car.combined_mpg.isnot(None))
-            query = query.filter(Car.combined_mpg > 0)
             query = query.filter(Car.combined_mpg <= float(max_combined_mpg))
 
         if max_acceleration_0_100 := filters.get('max_acceleration_0_100'):
-            # Treat missing/placeholder values as unknown, not "0 seconds".
-            # Some datasets store unknown acceleration as 0; exclude those rows.
-            query = query.filter(Car.acceleration_0_100.isnot(None))
-            query = query.filter(Car.acceleration_0_100 > 0)
             query = query.filter(Car.acceleration_0_100 <= float(max_acceleration_0_100))
 
         if min_vitesse_max := filters.get('min_vitesse_max'):
-            # Exclude unknown/placeholder top speed values (NULL/0)
-            query = query.filter(Car.vitesse_max.isnot(None))
-            query = query.filter(Car.vitesse_max > 0)
             query = query.filter(Car.vitesse_max >= int(min_vitesse_max))
         if max_vitesse_max := filters.get('max_vitesse_max'):
-            query = query.filter(Car.vitesse_max.isnot(None))
-            query = query.filter(Car.vitesse_max > 0)
             query = query.filter(Car.vitesse_max <= int(max_vitesse_max))
 
         if min_torque_nm := filters.get('min_torque_nm'):
-            # Exclude unknown/placeholder torque values (NULL/0)
-            query = query.filter(Car.torque_nm.isnot(None))
-            query = query.filter(Car.torque_nm > 0)
             query = query.filter(Car.torque_nm >= int(min_torque_nm))
         if max_torque_nm := filters.get('max_torque_nm'):
-            query = query.filter(Car.torque_nm.isnot(None))
-            query = query.filter(Car.torque_nm > 0)
             query = query.filter(Car.torque_nm <= int(max_torque_nm))
 
-    if hasattr(Car, sort_by):
-        column = getattr(Car, sort_by)
-        query = query.order_by(column.desc() if order == 'desc' else column.asc())
+    return query
+
+
+def get_cars(filters=None, sort_by='id', order='asc', page=1, per_page=20, cursor=None, fields=None):
+    """Filtered, sorted cars.
+
+    Returns a Flask-SQLAlchemy page (page/per_page, with totals) or, when
+    `cursor` is given ('' for the first page), a KeysetPage. Page-mode
+    queries that only filter and sort on numeric columns are answered from
+    the in-memory catalog snapshot when it is available. With `fields`
+    (see parse_fields) only those columns are loaded.
+    """
+    if sort_by not in SORTABLE_COLUMNS:
+        sort_by = 'id'
+    options = _fields_options(fields, sort_by)
+
+    if cursor is None and (snapshot := get_snapshot()) is not None:
+        page = max(int(page), 1)
+        per_page = int(per_page) if int(per_page) > 0 else 20
+        result = snapshot.page(filters, sort_by, order, (page - 1) * per_page, per_page)
+        if result is not None:
+            total, ids = result
+            return SearchResults(fetch_cars(ids, options), total, page, per_page, math.ceil(total / per_page))
+
+    query = _filtered_cars_query(filters).options(*options)
+
+    if cursor is not None:
+        return _keyset_paginate(query, sort_by, order, cursor, per_page)
+
+    column = getattr(Car, sort_by)
+    if order == 'desc':
+        query = query.order_by(column.desc(), Car.id.desc())
+    else:
+        query = query.order_by(column.asc(), Car.id.asc())
 
     paginated = query.paginate(page=page, per_page=per_page, error_out=False)
     return paginated
 
 
+def iter_cars(filters=None, sort_by='id', order='asc', batch_size=1000):
+    """Iterator over every car matching the /cars filter set, `batch_size` rows at a time.
+
+    Rows come from a server-side cursor (yield_per), so memory use does not
+    grow with the size of the result. The query is built and run here, so
+    invalid filters raise ValueError before the caller starts streaming.
+    """
+    if sort_by not in SORTABLE_COLUMNS:
+        sort_by = 'id'
+    column = getattr(Car, sort_by)
+    if order == 'desc':
+        ordering = [column.desc(), Car.id.desc()]
+    else:
+        ordering = [column.asc(), Car.id.asc()]
+    query = _filtered_cars_query(filters).order_by(*ordering).yield_per(batch_size)
+    return iter(query)
+
+
 def get_car(car_id):
     return Car.query.get(car_id)
 
 
+def get_cars_by_ids(car_ids, fields=None):
+    """Entries of `car_ids` in request order, loaded with one IN query.
+
+    Found cars are car_entry() dicts; ids with no car get
+    {'id', 'error': 'Car not found'}. Repeated ids are repeated.
+    """
+    query = Car.query.options(*_fields_options(fields)).filter(Car.id.in_(set(car_ids)))
+    by_id = {car.id: car for car in query}
+    return [car_entry(by_id[car_id], fields) if car_id in by_id else {'id': car_id, 'error': 'Car not found'}
+            for car_id in car_ids]
+
+
 def update_car(car, data):
     # Swagger users often send raw_spec as a JSON object; store it as a JSON string.
     if 'raw_spec' in data and isinstance(data.get('raw_spec'), dict):
         data = dict(data)
         data['raw_spec'] = json.dumps(data['raw_spec'], ensure_ascii=False)
+    data = clear_metric_placeholders(data)
 
+    before = stats.snapshot(car)
+    features = [getattr(car, name) for name, _kind, _weight in SIMILARITY_FEATURES]
     for field in ['brand','model','year','price','engine_type','horsepower','fuel_type','transmission','color','mileage',
                   'cylinders','acceleration_0_100','vitesse_max','drive_type','city_mpg','highway_mpg','combined_mpg','torque_nm','length','width','height','raw_spec']:
         if field in data:
@@ -632,142 +883,111 @@ def update_car(car, data):
             ensure_ascii=False,
         )
 
+    refresh_attendee_spec(car)
+    if (before['brand'], before['model']) != (car.brand, car.model):
+        assign_dimensions(car)
+    stats.record_change(before, stats.snapshot(car))
+    if features != [getattr(car, name) for name, _kind, _weight in SIMILARITY_FEATURES]:
+        invalidate_neighbors(car.id)
+        add_to_neighbors(car)
+    bump_version()
     db.session.commit()
+    invalidate_snapshot()
+    forget_version()
+    clear_response_cache()
     return car
 
 
 def delete_car(car):
+    stats.record_change(stats.snapshot(car), None)
+    invalidate_neighbors(car.id)
     db.session.delete(car)
+    bump_version()
     db.session.commit()
+    invalidate_snapshot()
+    forget_version()
+    clear_response_cache()
 
 
-def search_cars(q):
-    return Car.query.filter(
-        or_(
-            Car.brand.ilike(f"%{q}%"),
-            Car.model.ilike(f"%{q}%"),
-            Car.fuel_type.ilike(f"%{q}%"),
-            Car.transmission.ilike(f"%{q}%"),
-            Car.drive_type.ilike(f"%{q}%"),
-            Car.length.ilike(f"%{q}%")
-        )
-    ).all()
-
+def search_cars(q, page=1, per_page=20, fields=None):
+    """Full-text search ranked by relevance.
 
-def get_stats():
-    total_cars = Car.query.count()
-
-    # Brands: get comprehensive stats per brand
-    raw_brand_stats = db.session.query(
-        Car.brand,
-        db.func.count(Car.id),
-        db.func.avg(Car.combined_mpg),
-        db.func.avg(Car.horsepower),
-        db.func.avg(Car.acceleration_0_100),
-        db.func.avg(Car.vitesse_max),
-        db.func.min(Car.year),
-        db.func.max(Car.year),
-        db.func.count(db.func.distinct(Car.model))
-    ).group_by(Car.brand).all()
-
-    brand_map = {}
-    for name, count, avg_mpg, avg_hp, avg_accel, avg_top_speed, min_year, max_year, model_count in raw_brand_stats:
-        key = (name or '').strip()
-        if not key:
-            key = 'Unknown'
-        key = key.upper()
-        
-        if key in brand_map:
-            # Combine counts and recalculate averages if duplicate brands exist
-            old_data = brand_map[key]
-            old_count = old_data['count']
-            new_count = old_count + count
-            
-            # Weighted average calculation for numeric fields
-            def calc_weighted_avg(old_val, new_val, old_count, new_count):
-                if old_val is not None and new_val is not None:
-                    return ((old_val * old_count) + (new_val * count)) / new_count
-                elif old_val is not None:
-                    return old_val
-                elif new_val is not None:
-                    return new_val
-                return None
-            
-            new_avg_mpg = calc_weighted_avg(old_data['average_combined_mpg'], avg_mpg, old_count, new_count)
-            new_avg_hp = calc_weighted_avg(old_data['average_horsepower'], avg_hp, old_count, new_count)
-            new_avg_accel = calc_weighted_avg(old_data['average_acceleration_0_100'], avg_accel, old_count, new_count)
-            new_avg_top_speed = calc_weighted_avg(old_data['average_top_speed'], avg_top_speed, old_count, new_count)
-            
-            # Year range: extend the range
-            old_min_year = int(old_data['year_range'].split('-')[0]) if old_data['year_range'] else None
-            old_max_year = int(old_data['year_range'].split('-')[1]) if old_data['year_range'] else None
-            final_min_year = min(filter(None, [old_min_year, min_year]))
-            final_max_year = max(filter(None, [old_max_year, max_year]))
-            
-            brand_map[key] = {
-                'brand': key,
-                'count': new_count,
-                'average_combined_mpg': round(new_avg_mpg, 2) if new_avg_mpg is not None else None,
-                'average_horsepower': round(new_avg_hp, 1) if new_avg_hp is not None else None,
-                'average_acceleration_0_100': round(new_avg_accel, 2) if new_avg_accel is not None else None,
-                'average_top_speed': round(new_avg_top_speed, 1) if new_avg_top_speed is not None else None,
-                'year_range': f"{final_min_year}-{final_max_year}" if final_min_year and final_max_year else None,
-                'model_count': old_data['model_count'] + model_count
-            }
-        else:
-            brand_map[key] = {
-                'brand': key,
-                'count': count,
-                'average_combined_mpg': round(avg_mpg, 2) if avg_mpg is not None else None,
-                'average_horsepower': round(avg_hp, 1) if avg_hp is not None else None,
-                'average_acceleration_0_100': round(avg_accel, 2) if avg_accel is not None else None,
-                'average_top_speed': round(avg_top_speed, 1) if avg_top_speed is not None else None,
-                'year_range': f"{min_year}-{max_year}" if min_year and max_year else None,
-                'model_count': model_count
-            }
+    Uses the FTS5 index (bm25 ranking) on SQLite and an ILIKE scan elsewhere.
+    At most SEARCH_RESULT_CAP hits can be paged through. With `fields` only
+    those columns are loaded.
+    """
+    options = _fields_options(fields)
+    page = max(int(page), 1)
+    per_page = min(max(int(per_page), 1), 100)
+    offset = (page - 1) * per_page
+    # Rows still available on this page before hitting the cap.
+    window = min(per_page, max(SEARCH_RESULT_CAP - offset, 0))
+
+    if search_index_enabled(db.engine):
+        match = build_match_query(q)
+        if not match:
+            return SearchResults([], 0, page, per_page, 0)
+        conn = db.session.connection()
+        total = count_matches(conn, match, SEARCH_RESULT_CAP)
+        ids = ranked_match_ids(conn, match, window, offset) if window else []
+        by_id = {car.id: car for car in Car.query.options(*options).filter(Car.id.in_(ids)).all()} if ids else {}
+        items = [by_id[i] for i in ids if i in by_id]
+    else:
+        query = Car.query.options(*options).filter(
+            or_(
+                Car.brand.ilike(f"%{q}%"),
+                Car.model.ilike(f"%{q}%"),
+                Car.fuel_type.ilike(f"%{q}%"),
+                Car.transmission.ilike(f"%{q}%"),
+                Car.drive_type.ilike(f"%{q}%"),
+                Car.length.ilike(f"%{q}%")
+            )
+        ).order_by(Car.id)
+        total = query.limit(SEARCH_RESULT_CAP).count()
+        items = query.offset(offset).limit(window).all() if window else []
 
-    # Sort brands by count descending
-    brands_list = sorted(brand_map.values(), key=lambda x: x['count'], reverse=True)
+    return SearchResults(items, total, page, per_page, math.ceil(total / per_page))
 
-    # Drive types: replace missing/NULL with 'Unknown'
-    drive_counts = db.session.query(Car.drive_type, db.func.count(Car.id)).group_by(Car.drive_type).all()
-    drive_types_list = [{'drive_type': (d[0] if d[0] is not None else 'Unknown'), 'count': d[1]} for d in drive_counts]
 
-    return {
-        'total_cars': total_cars,
-        'brands': brands_list,
-        'drive_types': drive_types_list
-    }
+def get_stats():
+    """Catalog statistics, read from the incrementally maintained summary tables."""
+    return stats.read_stats()
 
 
-def get_cars_by_brand(brand, page=1, per_page=20):
-    """Get all cars for a specific brand (exact match)"""
-    query = Car.query.filter(Car.brand.ilike(brand))
+def get_cars_by_brand(brand, page=1, per_page=20, cursor=None, fields=None):
+    """Get all cars for a specific brand (exact match, any case)"""
+    query = Car.query.options(*_fields_options(fields)).filter(Car.brand_id == brand_id_of(brand))
+    if cursor is not None:
+        return _keyset_paginate(query, cursor=cursor, per_page=per_page)
     return query.paginate(page=page, per_page=per_page)
 
 
-def get_cars_by_serie(serie, page=1, per_page=20):
+def get_cars_by_serie(serie, page=1, per_page=20, cursor=None, fields=None):
     """Get all cars for a specific serie/model series (partial match supported)"""
-    query = Car.query.filter(Car.model.ilike(f"%{serie}%"))
+    query = Car.query.options(*_fields_options(fields)).filter(Car.serie_id.in_(serie_ids_matching(serie)))
+    if cursor is not None:
+        return _keyset_paginate(query, cursor=cursor, per_page=per_page)
     return query.paginate(page=page, per_page=per_page)
 
 
-def get_cars_by_year(year, page=1, per_page=20):
+def get_cars_by_year(year, page=1, per_page=20, cursor=None, fields=None):
     """Get all cars for a specific year"""
-    query = Car.query.filter(Car.year == int(year))
+    query = Car.query.options(*_fields_options(fields)).filter(Car.year == int(year))
+    if cursor is not None:
+        return _keyset_paginate(query, cursor=cursor, per_page=per_page)
     return query.paginate(page=page, per_page=per_page)
 
 
 def get_brands():
     """Get list of all brands with counts"""
-    results = db.session.query(Car.brand, db.func.count(Car.id)).group_by(Car.brand).order_by(Car.brand).all()
-    return [{'brand': brand, 'count': count} for brand, count in results if brand]
+    results = db.session.query(Brand.name, db.func.count(Car.id)).join(Car, Car.brand_id == Brand.id).group_by(Brand.id).order_by(Brand.name_key).all()
+    return [{'brand': brand, 'count': count} for brand, count in results]
 
 
 def get_models_by_brand(brand):
     """Get list of all series/model names for a specific brand"""
-    results = db.session.query(Car.model, db.func.count(Car.id)).filter(Car.brand.ilike(brand)).group_by(Car.model).order_by(Car.model).all()
-    return [{'serie': model, 'count': count} for model, count in results if model]
+    results = db.session.query(Serie.name, db.func.count(Car.id)).join(Car, Car.serie_id == Serie.id).filter(Serie.brand_id == brand_id_of(brand)).group_by(Serie.id).order_by(Serie.name_key).all()
+    return [{'serie': model, 'count': count} for model, count in results]
 
 
 def get_years():
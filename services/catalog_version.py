@@ -0,0 +1,68 @@
+"""Catalog data version behind the attendee routes' ETags.
+
+`catalog_version` holds one counter that every catalog write bumps in its
+own transaction (admin create/update/delete through `car_service`, and the
+importer once per run). Attendee GET responses are a function of that
+counter and the request, so the counter goes into their ETags.
+
+Each app caches the counter so a conditional GET can be answered without
+touching the database. Writes through this process drop the cached value
+once committed; writes from other processes (another gunicorn worker, the
+importer) are picked up once it is older than `CATALOG_VERSION_MAX_AGE`
+seconds.
+"""
+import time
+
+from flask import current_app
+
+from models import db, CatalogVersion
+from services.locks import HolderLock
+
+_table = CatalogVersion.__table__
+
+
+class _Holder:
+    def __init__(self):
+        self.lock = HolderLock()
+        self.version = None
+        self.read_at = 0.0
+        # Bumped by forget_version so a read that raced a commit is not cached.
+        self.generation = 0
+
+
+def _holder():
+    return current_app.extensions.setdefault('catalog_version', _Holder())
+
+
+def ensure_version():
+    """Create the counter row if it is missing."""
+    if db.session.get(CatalogVersion, 1) is None:
+        db.session.add(CatalogVersion(id=1, version=1))
+        db.session.commit()
+
+
+def bump_version():
+    """Increment the counter inside the caller's transaction; call `forget_version` after committing."""
+    db.session.execute(_table.update().where(_table.c.id == 1).values(version=_table.c.version + 1))
+
+
+def forget_version():
+    """Drop this app's cached counter after a committed write; the next reader re-reads it."""
+    if 'catalog_version' in current_app.extensions:
+        holder = current_app.extensions['catalog_version']
+        holder.generation += 1
+        holder.version = None
+
+
+def current_version():
+    """The catalog version, from the app's cache unless it was dropped or has expired."""
+    holder = _holder()
+    max_age = current_app.config.get('CATALOG_VERSION_MAX_AGE', 5)
+    version = holder.version
+    if version is None or time.monotonic() - holder.read_at > max_age:
+        with holder.lock:
+            generation, read_at = holder.generation, time.monotonic()
+            version = db.session.execute(db.select(_table.c.version).where(_table.c.id == 1)).scalar()
+            if holder.generation == generation:
+                holder.version, holder.read_at = version, read_at
+    return version
@@ -0,0 +1,78 @@
+"""Accept-Encoding negotiation and response compression.
+
+`init_compression(app)` registers an after-request hook that compresses
+responses whose mimetype is in `COMPRESS_MIMETYPES`: brotli when the client
+accepts it and the `brotli` package is installed, else gzip. Buffered
+bodies smaller than `COMPRESS_MIN_SIZE` bytes are sent as they are;
+streamed bodies (the export) are compressed chunk by chunk as they are
+produced, so they stay streamed. Levels come from `COMPRESS_GZIP_LEVEL`
+and `COMPRESS_BROTLI_LEVEL`; `COMPRESS = False` turns the hook off.
+"""
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+def negotiate_encoding():
+    """'br', 'gzip' or None: the encoding this request's response would be sent with."""
+    if not current_app.config.get('COMPRESS', True):
+        return None
+    accepted = request.accept_encodings
+    br, gzip = (accepted.quality('br') if brotli is not None else 0), accepted.quality('gzip')
+    if br > 0 and br >= gzip:
+        return 'br'
+    return 'gzip' if gzip > 0 else None
+
+
+def _compressor(encoding, config):
+    """(compress, flush) callables of a streaming compressor for `encoding`."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=config.get('COMPRESS_BROTLI_LEVEL', 4))
+        return compressor.process, compressor.finish
+    # wbits=31: gzip container
+    compressor = zlib.compressobj(config.get('COMPRESS_GZIP_LEVEL', 6), zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def compress_stream(chunks, encoding, config):
+    compress, flush = _compressor(encoding, config)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compress(chunk)
+        if data:
+            yield data
+    yield flush()
+
+
+def compress_response(response):
+    """after_request hook: compress `response` in place when the client and the body allow it."""
+    config = current_app.config
+    if (response.status_code != 200 or request.method == 'HEAD' or 'Content-Encoding' in response.headers
+            or response.mimetype not in config.get('COMPRESS_MIMETYPES', ())):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding, config)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < config.get('COMPRESS_MIN_SIZE', 1024):
+            return response
+        compress, flush = _compressor(encoding, config)
+        response.set_data(compress(data) + flush())
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
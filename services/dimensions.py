@@ -0,0 +1,126 @@
+"""Brand and serie dimension tables behind the brand / serie endpoints.
+
+Every car carries `brand_id` / `serie_id` pointing at `brands` / `series`,
+whose `name_key` is the case-folded, whitespace-collapsed name. Brand lookups
+("bmw", "BMW ") become one small-table probe plus an indexed integer equality
+on `cars`, and listings group by the integer key, so case variants such as
+"Mercedez BENZ" / "MERCEDEZ BENZ" are one brand everywhere.
+"""
+from sqlalchemy import text
+
+from models import db, Car, Brand, Serie
+
+
+def name_key(name):
+    """Case-folded lookup key of a brand or serie name; None when blank."""
+    key = ' '.join((name or '').split()).casefold()
+    return key or None
+
+
+def brand_id_of(brand):
+    """Scalar subquery of the id of `brand` (any case); NULL, matching nothing, if unknown."""
+    return db.select(Brand.id).where(Brand.name_key == name_key(brand)).scalar_subquery()
+
+
+def serie_ids_matching(serie):
+    """Select of the ids of every serie whose name contains `serie` (any case)."""
+    return db.select(Serie.id).where(Serie.name_key.like(f"%{name_key(serie) or ''}%"))
+
+
+class DimensionResolver:
+    """Maps brand / model names to ids, creating missing rows on first sight.
+
+    The key -> id maps are loaded once and kept in memory, so batched writers
+    (the importer) pay one INSERT per new brand or serie and no lookups.
+    """
+
+    def __init__(self):
+        self.brands = {key: brand_id for brand_id, key in db.session.query(Brand.id, Brand.name_key)}
+        self.series = {(brand_id, key): serie_id for serie_id, brand_id, key in
+                       db.session.query(Serie.id, Serie.brand_id, Serie.name_key)}
+
+    def ids(self, brand, model):
+        """(brand_id, serie_id) for a car, inside the caller's transaction."""
+        key = name_key(brand)
+        if key is None:
+            return None, None
+        brand_id = self.brands.get(key)
+        if brand_id is None:
+            brand_id = db.session.execute(
+                Brand.__table__.insert().values(name_key=key, name=brand.strip())
+            ).inserted_primary_key[0]
+            self.brands[key] = brand_id
+
+        key = name_key(model)
+        if key is None:
+            return brand_id, None
+        serie_id = self.series.get((brand_id, key))
+        if serie_id is None:
+            serie_id = db.session.execute(
+                Serie.__table__.insert().values(brand_id=brand_id, name_key=key, name=model.strip())
+            ).inserted_primary_key[0]
+            self.series[(brand_id, key)] = serie_id
+        return brand_id, serie_id
+
+
+def _lookup(model, keys):
+    return db.session.execute(db.select(model.id).filter_by(**keys)).scalar()
+
+
+def _get_or_insert(model, keys, name):
+    """Id of the `model` row matching `keys`, inserting it (with `name`) if missing.
+
+    ON CONFLICT DO NOTHING: when a concurrent request inserts the same key
+    first, this insert is a no-op instead of an IntegrityError, and the
+    second lookup returns that request's row.
+    """
+    row_id = _lookup(model, keys)
+    if row_id is None:
+        values = {**keys, 'name': name}
+        db.session.execute(text(
+            f"INSERT INTO {model.__tablename__} ({', '.join(values)}) VALUES ({', '.join(':' + c for c in values)}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO NOTHING"
+        ), values)
+        row_id = _lookup(model, keys)
+    return row_id
+
+
+def dimension_ids(brand, model):
+    """(brand_id, serie_id) for one car, looked up by key: single writes skip loading a resolver."""
+    key = name_key(brand)
+    if key is None:
+        return None, None
+    brand_id = _get_or_insert(Brand, {'name_key': key}, brand.strip())
+    key = name_key(model)
+    if key is None:
+        return brand_id, None
+    return brand_id, _get_or_insert(Serie, {'brand_id': brand_id, 'name_key': key}, model.strip())
+
+
+def assign_dimensions(car, resolver=None):
+    """Point `car.brand_id` / `car.serie_id` at its (possibly new) brand and serie."""
+    if resolver is None:
+        car.brand_id, car.serie_id = dimension_ids(car.brand, car.model)
+    else:
+        car.brand_id, car.serie_id = resolver.ids(car.brand, car.model)
+
+
+def backfill_dimensions():
+    """Fill `brand_id` / `serie_id` for cars that predate them; returns the number of pairs."""
+    pairs = db.session.query(Car.brand, Car.model).filter(Car.brand_id.is_(None)).distinct().all()
+    if not pairs:
+        return 0
+    resolver = DimensionResolver()
+    updates = []
+    for brand, model in pairs:
+        brand_id, serie_id = resolver.ids(brand, model)
+        if brand_id is not None:
+            updates.append({'_brand': brand, '_model': model, 'brand_id': brand_id, 'serie_id': serie_id})
+    if updates:
+        db.session.execute(
+            text('UPDATE cars SET brand_id = :brand_id, serie_id = :serie_id '
+                 'WHERE brand = :_brand AND model = :_model AND brand_id IS NULL'),
+            updates,
+        )
+    db.session.commit()
+    return len(updates)
@@ -0,0 +1,24 @@
+"""JSON encoding for API responses.
+
+Uses orjson when it is installed and the standard library otherwise. Both
+paths keep dict insertion order (the frontend renders specs in that order)
+and emit UTF-8 without ASCII escaping.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def dumps(obj, pretty: bool = False) -> bytes:
+    """Encode `obj` as compact JSON, or indented by 2 spaces when `pretty`."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
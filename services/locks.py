@@ -0,0 +1,61 @@
+"""Lock for the per-app holders (catalog snapshot, catalog version), and
+`run_blocking` for the other blocking calls of code that async reads reach.
+
+Under asgi.py, attendee reads run inside SQLAlchemy's async greenlets on the
+event loop thread. A greenlet that blocked on a threading.Lock held by
+another greenlet of that thread (suspended mid-query) would stop the loop
+for good, so inside a greenlet HolderLock waits on a future that the
+holder resolves when it releases, letting the loop run meanwhile.
+Threads (WSGI workers, the ASGI thread fallback) block as usual.
+"""
+import asyncio
+import functools
+import threading
+
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+try:
+    import greenlet
+except ImportError:  # optional dependency: only the async mode needs it
+    greenlet = None
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def run_blocking(fn, *args):
+    """`fn(*args)`; inside a greenlet, in a worker thread while the loop serves others."""
+    if greenlet is None or not in_greenlet():
+        return fn(*args)
+    return await_only(asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args)))
+
+
+class HolderLock:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = []  # (loop, future) of greenlets waiting for a release
+        self._waiters_lock = threading.Lock()  # guards _waiters only; never held across I/O
+
+    def __enter__(self):
+        if greenlet is None or not in_greenlet():
+            self._lock.acquire()
+            return self
+        while not self._lock.acquire(blocking=False):
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            with self._waiters_lock:
+                self._waiters.append((loop, future))
+            # Released between the failed acquire and the append: nobody would wake us.
+            if self._lock.acquire(blocking=False):
+                break
+            await_only(future)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+        with self._waiters_lock:
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
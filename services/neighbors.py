@@ -0,0 +1,217 @@
+"""Precomputed nearest neighbours behind `/cars/<id>/similar`.
+
+`car_neighbors` holds, per car, its `NEIGHBORS_STORED` most similar cars in
+rank order, so a detail page's "similar cars" is one primary-key range read.
+`build_neighbors` fills it, scoring in worker processes; run it after an
+import (`import_dataset.py --neighbors`) or with
+`python scripts/build_neighbors.py`.
+
+Reads never write: a car without a list is computed live. Admin writes keep
+the table honest in their own transaction. Creating or updating a car puts
+it into every stored list it now beats the last entry of. Updating or
+deleting a car drops its list and every list it appears in. Dropped lists,
+and the list of a new car, go into `car_neighbor_queue`; the offline job
+recomputes them (`scripts/build_neighbors.py --queued`). A list holding
+fewer than `NEIGHBORS_STORED` rows is complete: the catalog was smaller than
+that when it was computed.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import func, or_, select
+
+from models import db, Car, CarNeighbor, CarNeighborQueue
+from services.catalog_snapshot import CatalogSnapshot, np
+from services.similarity import candidate_windows, feature_query, rank_key, rank_with_snapshot, scorer
+
+NEIGHBORS_STORED = 50
+# Lists whose last score a car outside its candidate window could still beat
+# are scored one by one, up to this many; past it the window widens.
+DIRECT_OWNERS = 2000
+
+_table = CarNeighbor.__table__
+_queue = CarNeighborQueue.__table__
+
+
+def _chunks(ids, size=500):
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+
+def stored_neighbors(car_id, limit):
+    """[(neighbor_id, score)] from `car_neighbors`, or None if they cannot answer `limit`."""
+    rows = db.session.query(CarNeighbor.neighbor_id, CarNeighbor.score).filter(
+        CarNeighbor.car_id == car_id).order_by(CarNeighbor.rank).limit(NEIGHBORS_STORED).all()
+    if not rows or (limit > len(rows) and len(rows) == NEIGHBORS_STORED):
+        return None
+    return [tuple(row) for row in rows[:limit]]
+
+
+def _rows(car_id, ranked):
+    return [{'car_id': car_id, 'rank': rank, 'neighbor_id': neighbor_id, 'score': score}
+            for rank, (neighbor_id, score) in enumerate(ranked, 1)]
+
+
+def _lists(owners):
+    """{car_id: [(neighbor_id, score)] in rank order} for the `owners` that have a list."""
+    lists = {}
+    for chunk in _chunks(list(owners)):
+        query = select(_table.c.car_id, _table.c.neighbor_id, _table.c.score).where(
+            _table.c.car_id.in_(chunk)).order_by(_table.c.car_id, _table.c.rank)
+        for car_id, neighbor_id, score in db.session.execute(query):
+            lists.setdefault(car_id, []).append((neighbor_id, score))
+    return lists
+
+
+def queue_neighbors(car_ids, changed=False):
+    """Queue the lists of `car_ids` for the offline job, inside the caller's transaction.
+
+    `changed` marks cars that were themselves written, which a running build
+    must not rank from its snapshot.
+    """
+    car_ids = list(car_ids)
+    if car_ids:
+        db.session.execute(_queue.insert(), [{'car_id': car_id, 'changed': changed} for car_id in car_ids])
+
+
+def invalidate_neighbors(car_id):
+    """Drop and queue `car_id`'s list and every list containing it, inside the caller's transaction."""
+    containing = select(_table.c.car_id).where(_table.c.neighbor_id == car_id)
+    db.session.execute(_queue.insert().from_select(['car_id'], containing))
+    queue_neighbors([car_id], changed=True)
+    db.session.execute(_table.delete().where(_table.c.car_id.in_(containing.scalar_subquery())))
+    db.session.execute(_table.delete().where(_table.c.car_id == car_id))
+
+
+def _entry_scores(car):
+    """{owner_id: score of `car` in owner's list} for every owner whose list `car` may enter."""
+    score_rows = scorer(car)
+    small = db.session.query(Car.id).order_by(Car.id).offset(NEIGHBORS_STORED + 1).first() is None
+    if small:
+        # Lists may be short; every one of them takes the car.
+        return dict(score_rows(feature_query(car)))
+    for query, bound in candidate_windows(car):
+        if bound is None:
+            return dict(score_rows(query))
+        # Lists outside the window whose last entry `car` could still beat.
+        low = db.session.scalars(select(_table.c.car_id).where(
+            _table.c.rank == NEIGHBORS_STORED, or_(_table.c.score.is_(None), _table.c.score <= bound),
+        ).limit(DIRECT_OWNERS + 1)).all()
+        if len(low) <= DIRECT_OWNERS:
+            break
+    scores = dict(score_rows(query))
+    rest = [owner for owner in low if owner not in scores and owner != car.id]
+    for chunk in _chunks(rest):
+        scores.update(score_rows(feature_query(car).where(Car.id.in_(chunk))))
+    return scores
+
+
+def add_to_neighbors(car):
+    """Insert `car` into every stored list it now ranks in; returns the number of lists changed.
+
+    Runs inside the caller's transaction. A list takes the car when it beats
+    the list's last entry or the list is short. Lists already holding the car
+    are left alone, so call `invalidate_neighbors` first when its features
+    changed.
+    """
+    db.session.flush()
+    scores = _entry_scores(car)
+    if len(scores) > NEIGHBORS_STORED:
+        # Only full lists whose last entry the car beats need a look.
+        last = {}
+        for chunk in _chunks(list(scores)):
+            query = select(_table.c.car_id, _table.c.neighbor_id, _table.c.score).where(
+                _table.c.car_id.in_(chunk), _table.c.rank == NEIGHBORS_STORED)
+            last.update((owner, (neighbor_id, score)) for owner, neighbor_id, score in db.session.execute(query))
+        owners = [owner for owner, entry in last.items() if rank_key((car.id, scores[owner])) < rank_key(entry)]
+    else:
+        owners = list(scores)
+    changed = {}
+    for owner, ranked in _lists(owners).items():
+        entry = (car.id, scores[owner])
+        if any(neighbor_id == car.id for neighbor_id, _score in ranked):
+            continue
+        if len(ranked) < NEIGHBORS_STORED or rank_key(entry) < rank_key(ranked[-1]):
+            changed[owner] = sorted(ranked + [entry], key=rank_key)[:NEIGHBORS_STORED]
+    for chunk in _chunks(list(changed)):
+        db.session.execute(_table.delete().where(_table.c.car_id.in_(chunk)))
+        db.session.execute(_table.insert(), [row for owner in chunk for row in _rows(owner, changed[owner])])
+    return len(changed)
+
+
+_worker_snapshot = None
+
+
+def _init_worker(snapshot):
+    global _worker_snapshot
+    _worker_snapshot = snapshot
+
+
+def _rank_chunk(car_ids):
+    return [(car_id, rank_with_snapshot(_worker_snapshot, car_id, NEIGHBORS_STORED)) for car_id in car_ids]
+
+
+def build_neighbors(workers=1, chunk_size=200, queued=False):
+    """Recompute the stored lists; returns the number of cars ranked.
+
+    Every car's list, or with `queued` only those in `car_neighbor_queue`.
+    The snapshot is shipped once to each of `workers` processes, which rank
+    `chunk_size` cars per task. The parent writes and commits each chunk as
+    it arrives, so admin writes wait for one chunk at most, and a reader
+    sees a car's old list or its new one.
+
+    Writes made during the build win. A list whose car or neighbours were
+    written after the build started is left out and queued again. At the
+    end, the cars written meanwhile are put into the new lists. A `queued`
+    build does the same for the queued cars that were written, e.g. the rows
+    an upsert import inserted.
+    """
+    if np is None:
+        raise RuntimeError('building car_neighbors needs numpy')
+    mark = db.session.scalar(select(func.max(_queue.c.id))) or 0
+    written_since = select(_queue.c.car_id).where(_queue.c.id > mark, _queue.c.changed)
+    snapshot = CatalogSnapshot.build()
+    car_ids = snapshot.ids.tolist()
+    written = set()
+    if queued:
+        wanted = set(db.session.scalars(select(_queue.c.car_id).where(_queue.c.id <= mark)))
+        car_ids = [car_id for car_id in car_ids if car_id in wanted]
+        written = set(db.session.scalars(select(_queue.c.car_id).where(_queue.c.id <= mark, _queue.c.changed)))
+    else:
+        # Lists of cars deleted behind the ORM's back, e.g. by an import.
+        db.session.execute(_table.delete().where(_table.c.car_id.not_in(select(Car.id).scalar_subquery())))
+        db.session.commit()
+    chunks = [car_ids[i:i + chunk_size] for i in range(0, len(car_ids), chunk_size)]
+    skipped = []
+
+    def write(results):
+        # The delete takes the write lock first, so no write can queue a car between the read and the commit.
+        db.session.execute(_table.delete().where(_table.c.car_id.in_([car_id for car_id, _ranked in results])))
+        changed = set(db.session.scalars(written_since))
+        rows = []
+        for car_id, ranked in results:
+            if car_id in changed or any(neighbor_id in changed for neighbor_id, _score in ranked):
+                skipped.append(car_id)
+            else:
+                rows.extend(_rows(car_id, ranked))
+        if rows:
+            db.session.execute(_table.insert(), rows)
+        db.session.commit()
+
+    if workers <= 1:
+        _init_worker(snapshot)
+        for chunk in chunks:
+            write(_rank_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(snapshot,)) as pool:
+            for results in pool.map(_rank_chunk, chunks):
+                write(results)
+
+    changed = set(db.session.scalars(written_since))
+    db.session.execute(_queue.delete().where(_queue.c.id <= mark))
+    queue_neighbors(car_id for car_id in skipped if car_id not in changed)
+    db.session.commit()
+    for car_id in sorted(changed | written):
+        car = db.session.get(Car, car_id)
+        if car is not None:
+            add_to_neighbors(car)
+            db.session.commit()
+    return len(car_ids)
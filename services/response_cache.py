@@ -0,0 +1,109 @@
+"""Server-side cache of encoded attendee responses.
+
+The cached endpoints (stats, browse / available lists, top-N, group
+comparisons, `/cars` pages) are pure functions of their parameters and the
+catalog, so their encoded bodies are kept and a hit skips both SQL and JSON
+encoding. Keys are the endpoint name, its normalized parameters and the
+catalog version (services/catalog_version.py): writes from other processes
+stop matching as soon as this worker sees the new version, and writes
+through this process clear the cache outright.
+
+Entries live in the backend chosen by `CACHE_BACKEND` (per-process LRU,
+a SQLite file shared by the host's workers, or a Redis-protocol server;
+see services/cache_backends.py); `RESPONSE_CACHE_SIZE = 0` disables the
+cache. Entries expire after their endpoint's TTL from `RESPONSE_CACHE_TTLS`,
+looked up by endpoint name ('browse.years'), then its group ('browse'), then
+'default'.
+"""
+import json
+import threading
+from collections import Counter
+
+from flask import current_app
+
+from services.cache_backends import create_backend
+from services.catalog_version import current_version
+from services.locks import run_blocking
+
+
+class ResponseCache:
+    """Encoded responses in a cache backend, with this worker's per-endpoint hit/miss counters."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def _call(self, fn, *args):
+        # Shared backends wait on a file lock or a socket; keep that off the event loop.
+        return fn(*args) if self.backend.name == 'memory' else run_blocking(fn, *args)
+
+    def get(self, endpoint, key):
+        value = self._call(self.backend.get, key)
+        with self.lock:
+            (self.misses if value is None else self.hits)[endpoint] += 1
+        return value
+
+    def put(self, key, value, ttl):
+        self._call(self.backend.set, key, value, ttl)
+
+    def clear(self):
+        self._call(self.backend.clear)
+
+    def stats(self):
+        with self.lock:
+            endpoints = sorted(set(self.hits) | set(self.misses))
+            counters = {
+                'hits': sum(self.hits.values()),
+                'misses': sum(self.misses.values()),
+                'endpoints': {name: {'hits': self.hits[name], 'misses': self.misses[name]} for name in endpoints},
+            }
+        return {'backend': self.backend.name, **self.backend.stats(), **counters}
+
+
+def _cache():
+    """The app's cache, or None when caching is disabled."""
+    extensions = current_app.extensions
+    if 'response_cache' not in extensions:
+        backend = create_backend(current_app.config, current_app.instance_path)
+        extensions['response_cache'] = ResponseCache(backend) if backend is not None else None
+    return extensions['response_cache']
+
+
+def cache_key(endpoint, params):
+    """Canonical key: endpoint, catalog version and the parameters that are set, in name order."""
+    params = {name: value for name, value in params.items() if value is not None and value != ''}
+    return json.dumps([endpoint, current_version(), params], sort_keys=True, separators=(',', ':'), default=str)
+
+
+def cached_response(endpoint, params, compute):
+    """(data, status, hit): `compute()` -> (data, status), from the cache when possible.
+
+    Only 200 responses are stored, so a hit is always a 200.
+    """
+    cache = _cache()
+    if cache is None:
+        return (*compute(), False)
+    key = cache_key(endpoint, params)
+    data = cache.get(endpoint, key)
+    if data is not None:
+        return data, 200, True
+    data, status = compute()
+    if status == 200:
+        ttls = current_app.config.get('RESPONSE_CACHE_TTLS', {})
+        group = endpoint.split('.')[0]
+        cache.put(key, data, ttls.get(endpoint, ttls.get(group, ttls.get('default', 60))))
+    return data, status, False
+
+
+def clear_response_cache():
+    """Drop every cached response after a committed write."""
+    cache = current_app.extensions.get('response_cache')
+    if cache is not None:
+        cache.clear()
+
+
+def response_cache_stats():
+    cache = _cache()
+    return cache.stats() if cache is not None else {'backend': None, 'hits': 0, 'misses': 0, 'endpoints': {}}
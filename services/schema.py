@@ -0,0 +1,59 @@
+"""Lightweight, idempotent schema upgrades for existing databases.
+
+`db.create_all()` only creates missing tables; it never adds columns or
+indexes to a table that already exists. These helpers fill that gap so an
+older `cars.db` picks up new columns and indexes on the next startup.
+"""
+from sqlalchemy import inspect, text
+
+from models import Car, CarNeighbor, RANKING_METRICS
+
+
+def ensure_columns(engine):
+    """Add any column declared on `Car` that the `cars` table is missing.
+
+    Returns the names of the columns that were added.
+    """
+    existing = {col['name'] for col in inspect(engine).get_columns(Car.__tablename__)}
+    added = []
+    with engine.begin() as conn:
+        for column in Car.__table__.columns:
+            if column.name in existing:
+                continue
+            col_type = column.type.compile(dialect=engine.dialect)
+            conn.execute(text(f'ALTER TABLE {Car.__tablename__} ADD COLUMN {column.name} {col_type}'))
+            added.append(column.name)
+    return added
+
+
+def ensure_indexes(engine):
+    """Create any index declared on `Car` or `CarNeighbor` that the database does not have yet."""
+    with engine.begin() as conn:
+        for table in (Car.__table__, CarNeighbor.__table__):
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+
+def drop_indexes(engine):
+    """Drop the non-unique indexes declared on `Car`; `ensure_indexes` puts them back.
+
+    Building an index once after a bulk load is much cheaper than updating it
+    on every inserted row. Unique indexes stay: they are constraints
+    (`source_key` identifies rows for upserts), not just lookups.
+    """
+    with engine.begin() as conn:
+        for index in Car.__table__.indexes:
+            if not index.unique:
+                index.drop(bind=conn, checkfirst=True)
+
+
+def null_metric_placeholders(engine):
+    """Store the dataset's 0 "unknown" placeholder as NULL in the ranking metrics.
+
+    Returns the number of values changed (0 once a database is migrated).
+    """
+    changed = 0
+    with engine.begin() as conn:
+        for name in RANKING_METRICS:
+            changed += conn.execute(text(f'UPDATE {Car.__tablename__} SET {name} = NULL WHERE {name} <= 0')).rowcount
+    return changed
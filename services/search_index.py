@@ -0,0 +1,147 @@
+"""SQLite FTS5 index over the searchable car fields.
+
+The index is a contentless FTS5 table (`cars_fts`) whose rowid is the car id.
+Triggers on `cars` keep it in sync, so every write path (admin routes, the
+importer, raw SQL) updates it without extra code.
+"""
+import re
+
+from sqlalchemy import Integer, column, text
+
+FTS_TABLE = 'cars_fts'
+
+# bm25 column weights, in the same order as the FTS columns below.
+_RANK = "bm25(10.0, 8.0, 2.0, 2.0, 2.0, 1.0, 3.0)"
+
+_COLUMNS = "brand, model, fuel_type, transmission, drive_type, summary, body_style"
+
+
+def _values(ref: str) -> str:
+    # Values fed to the index for one `cars` row. `ref` is `new` or `old` inside
+    # a trigger, or `cars` for the initial fill. Only the human-readable parts
+    # of raw_spec are indexed; legacy non-JSON blobs index as NULL.
+    return (
+        f"{ref}.id, {ref}.brand, {ref}.model, {ref}.fuel_type, {ref}.transmission, {ref}.drive_type, "
+        f"CASE WHEN json_valid({ref}.raw_spec) THEN json_extract({ref}.raw_spec, '$.\"Specification summary\"') END, "
+        f"CASE WHEN json_valid({ref}.raw_spec) THEN json_extract({ref}.raw_spec, '$.\"Body style\"') END"
+    )
+
+
+_DDL = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        {_COLUMNS},
+        content='',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', '{_RANK}')",
+]
+
+# Contentless tables need the old values to remove a row, hence the 'delete'
+# command instead of a plain DELETE.
+_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON cars BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS}) VALUES ({_values('new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON cars BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMNS}) VALUES ('delete', {_values('old')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+        AFTER UPDATE OF brand, model, fuel_type, transmission, drive_type, raw_spec ON cars BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMNS}) VALUES ('delete', {_values('old')});
+        INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS}) VALUES ({_values('new')});
+    END""",
+]
+
+
+def search_index_enabled(engine) -> bool:
+    """True when the engine is SQLite, where `ensure_search_index` has set up FTS5."""
+    return engine.dialect.name == 'sqlite'
+
+
+def ensure_search_index(engine):
+    """Create the FTS table and its triggers if missing, filling it on first creation.
+
+    No-op on non-SQLite databases; search then falls back to ILIKE scans.
+    """
+    if not search_index_enabled(engine):
+        return
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE},
+        ).first()
+        if not exists:
+            for stmt in _DDL:
+                conn.execute(text(stmt))
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS}) SELECT {_values('cars')} FROM cars"))
+        for stmt in _TRIGGERS:
+            conn.execute(text(stmt))
+
+
+def rebuild_search_index(engine):
+    """Drop every indexed row and re-index the whole `cars` table."""
+    with engine.begin() as conn:
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')"))
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS}) SELECT {_values('cars')} FROM cars"))
+
+
+def drop_search_triggers(engine):
+    """Stop keeping the index in sync; pair with `index_rows_after` + `ensure_search_index`.
+
+    Bulk loads use this to index new rows in one statement at the end instead
+    of one trigger call per inserted row.
+    """
+    if not search_index_enabled(engine):
+        return
+    with engine.begin() as conn:
+        for suffix in ('ai', 'ad', 'au'):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}"))
+
+
+def index_rows_after(engine, last_id: int):
+    """Index every `cars` row with an id greater than `last_id`."""
+    if not search_index_enabled(engine):
+        return
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS}) SELECT {_values('cars')} FROM cars WHERE cars.id > :last_id"),
+            {'last_id': last_id},
+        )
+
+
+def build_match_query(q: str) -> str | None:
+    """Turn free user text into an FTS5 MATCH expression.
+
+    Every word must match (AND) and is treated as a prefix, so 'merc ben'
+    finds 'Mercedez BENZ'. Words are quoted, so FTS operators typed by the
+    user are matched literally. Returns None when there is nothing to search.
+    """
+    terms = re.findall(r'\w+', q or '')
+    if not terms:
+        return None
+    return ' AND '.join(f'"{t}"*' for t in terms)
+
+
+def match_ids_select(match: str):
+    """Textual SELECT of matching car ids, usable inside `Car.id.in_(...)`."""
+    return text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match").bindparams(
+        match=match
+    ).columns(column('rowid', Integer))
+
+
+def ranked_match_ids(conn, match: str, limit: int, offset: int = 0) -> list[int]:
+    """Car ids matching `match`, best bm25 rank first."""
+    rows = conn.execute(
+        text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match ORDER BY rank LIMIT :limit OFFSET :offset"),
+        {'match': match, 'limit': limit, 'offset': offset},
+    )
+    return [r[0] for r in rows]
+
+
+def count_matches(conn, match: str, cap: int) -> int:
+    """Number of matching rows, counting at most `cap` of them."""
+    return conn.execute(
+        text(f"SELECT count(*) FROM (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match LIMIT :cap)"),
+        {'match': match, 'cap': cap},
+    ).scalar()
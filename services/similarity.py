@@ -0,0 +1,203 @@
+"""Similarity scoring behind `/cars/<id>/similar`.
+
+A car's score against the reference is the weighted mean of per-feature
+similarities, over the features both cars have:
+
+- horsepower, torque, top speed: 1 - |a - b| / max(a, b)
+- year: 1 - |a - b| / 15 (clipped at 0)
+- drive type, fuel type: 1 on a match, else 0
+
+The best `limit` cars of the whole catalog are returned, ties broken by id.
+With the NumPy catalog snapshot that is one vectorized pass plus an
+`argpartition`. Without it, SQL first narrows the catalog to indexed year
+and horsepower ranges around the reference car, and only those rows are
+scored in Python. The ranges widen until no car outside them could still
+make the top `limit`, so the result is the same as scoring every car.
+"""
+import heapq
+
+from sqlalchemy import or_, select
+
+from models import db, Car
+from services.catalog_snapshot import np
+
+# (feature, kind, weight); kinds: 'ratio', 'year', 'match'.
+SIMILARITY_FEATURES = (
+    ('horsepower', 'ratio', 50.0),
+    ('year', 'year', 30.0),
+    ('torque_nm', 'ratio', 20.0),
+    ('vitesse_max', 'ratio', 20.0),
+    ('drive_type', 'match', 20.0),
+    ('fuel_type', 'match', 10.0),
+)
+
+
+def _known(name, value):
+    """Feature value, or None when unknown (blank text, non-positive number)."""
+    if not value:
+        return None
+    if name == 'fuel_type':
+        return str(value).lower()
+    if isinstance(value, (int, float)) and value <= 0:
+        return None
+    return value
+
+
+def similarity_score(target, car):
+    """Unrounded 0-100 score of `car` against `target` (dicts of feature values); None if nothing compares."""
+    score_sum = 0.0
+    weight_sum = 0.0
+    for name, kind, weight in SIMILARITY_FEATURES:
+        a, b = _known(name, target.get(name)), _known(name, car.get(name))
+        if a is None or b is None:
+            continue
+        if kind == 'ratio':
+            sim = min(1.0, max(0.0, 1.0 - abs(float(a) - float(b)) / max(float(a), float(b))))
+        elif kind == 'year':
+            sim = min(1.0, max(0.0, 1.0 - abs(int(a) - int(b)) / 15.0))
+        else:
+            sim = 1.0 if a == b else 0.0
+        score_sum += sim * weight
+        weight_sum += weight
+    return (score_sum / weight_sum) * 100.0 if weight_sum > 0 else None
+
+
+def _snapshot_scores(snapshot, row):
+    n = len(snapshot)
+    score_sum = np.zeros(n)
+    weight_sum = np.zeros(n)
+    sim = np.empty(n)
+    for name, kind, weight in SIMILARITY_FEATURES:
+        if kind == 'match':
+            codes = snapshot.categories[name]
+            if codes[row] < 0:
+                continue
+            valid = codes >= 0
+            np.equal(codes, codes[row], out=sim)
+        else:
+            values = snapshot.columns[name]
+            target = values[row]
+            if not target > 0:
+                continue
+            valid = values > 0
+            with np.errstate(invalid='ignore'):
+                np.subtract(values, target, out=sim)
+                np.abs(sim, out=sim)
+                np.divide(sim, np.maximum(values, target) if kind == 'ratio' else 15.0, out=sim)
+                np.subtract(1.0, sim, out=sim)
+                # Only the year term can leave [0, 1]: ratios of positive values cannot.
+                np.clip(sim, 0.0, 1.0, out=sim)
+        np.multiply(sim, weight, out=sim)
+        np.add(score_sum, sim, out=score_sum, where=valid)
+        np.add(weight_sum, weight, out=weight_sum, where=valid)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.multiply(np.divide(score_sum, weight_sum), 100.0)
+
+
+def rank_with_snapshot(snapshot, car_id, limit):
+    """[(id, score)] of the `limit` cars most similar to `car_id`, or None if it is not in the snapshot."""
+    row = snapshot.position(car_id)
+    if row is None:
+        return None
+    scores = _snapshot_scores(snapshot, row)
+    # Best first; cars without a comparable feature (NaN) go last.
+    keys = np.where(np.isnan(scores), np.inf, -scores)
+    keys[row] = np.nan  # argpartition sorts NaN after inf; dropped below
+    limit = min(limit, len(snapshot) - 1)
+    if limit <= 0:
+        return []
+    kth = keys[np.argpartition(keys, limit - 1)[limit - 1]]
+    # Everything up to the k-th key, so ties at the boundary are settled by id.
+    candidates = np.flatnonzero(keys <= kth)
+    candidates = candidates[np.lexsort((snapshot.ids[candidates], keys[candidates]))][:limit]
+    return [(int(snapshot.ids[i]), None if np.isnan(scores[i]) else float(scores[i])) for i in candidates]
+
+
+def rank_key(item):
+    """Sort key of an (id, score) pair: best score first, None last, ties by id."""
+    return item[1] is None, -(item[1] or 0.0), item[0]
+
+
+def _unknown_or(column, condition):
+    """`condition`, or the column holds no comparable value (NULL or the old 0 placeholder)."""
+    return or_(condition, column.is_(None), column <= 0)
+
+
+def _features(car):
+    """(feature values of `car`, total weight of the ones it knows)."""
+    target = {name: getattr(car, name) for name, _kind, _weight in SIMILARITY_FEATURES}
+    return target, sum(weight for name, _kind, weight in SIMILARITY_FEATURES if _known(name, target[name]) is not None)
+
+
+def feature_query(target_car):
+    """Select id and the feature columns of every car but `target_car`."""
+    names = [name for name, _kind, _weight in SIMILARITY_FEATURES]
+    return select(Car.id, *[getattr(Car, name) for name in names]).where(Car.id != target_car.id)
+
+
+def candidate_windows(target_car):
+    """Yield (query, bound) from the narrowest window around `target_car` to the whole catalog.
+
+    `query` selects id and the feature columns of the other cars with a year
+    within `years` of the reference and a horsepower within a factor of
+    `1 + ratio`, or with that feature unknown, which no bound covers. A car
+    outside the window loses at least weight * (1 - best similarity there)
+    of a perfect score, so it scores at most `bound` (0-100). The windows
+    double; the last one is the whole catalog, with bound None.
+    """
+    weights = {name: weight for name, _kind, weight in SIMILARITY_FEATURES}
+    target, total_weight = _features(target_car)
+    year, horsepower = _known('year', target['year']), _known('horsepower', target['horsepower'])
+    columns = feature_query(target_car)
+    years, ratio = 2, 0.15
+    while True:
+        query, bound = columns, None
+        if year is not None and years < 15:
+            query = query.where(_unknown_or(Car.year, Car.year.between(year - years, year + years)))
+            bound = 1.0 - weights['year'] * (years + 1) / 15.0 / total_weight
+        if horsepower is not None and ratio < 4:
+            query = query.where(_unknown_or(Car.horsepower, Car.horsepower.between(
+                horsepower / (1 + ratio), horsepower * (1 + ratio))))
+            bound = max(bound or 0.0, 1.0 - weights['horsepower'] * (1 - 1 / (1 + ratio)) / total_weight)
+        if bound is None:
+            yield columns, None
+            return
+        yield query, bound * 100.0
+        years, ratio = years * 2, ratio * 2
+
+
+def scorer(target_car):
+    """Function scoring the rows of a `candidate_windows` query against `target_car`: yields (id, score).
+
+    Scores are remembered, so rows repeated by a wider window are scored once.
+    """
+    names = [name for name, _kind, _weight in SIMILARITY_FEATURES]
+    target, _total_weight = _features(target_car)
+    scores = {}
+
+    def score_rows(query):
+        for car_id, *values in db.session.execute(query):
+            if car_id not in scores:
+                scores[car_id] = similarity_score(target, dict(zip(names, values)))
+            yield car_id, scores[car_id]
+    return score_rows
+
+
+def rank_with_sql(target_car, limit):
+    """Same ranking as `rank_with_snapshot`, scoring only the cars SQL cannot rule out.
+
+    Scores the `candidate_windows` from the narrowest on, and stops at the
+    first whose bound is below the `limit`-th score found inside it.
+    """
+    if not _features(target_car)[1]:
+        # Nothing compares: every score is None, so the ranking is by id.
+        query = feature_query(target_car).order_by(Car.id).limit(limit)
+        return [(car_id, None) for car_id, *_values in db.session.execute(query)]
+    score_rows = scorer(target_car)
+    for query, bound in candidate_windows(target_car):
+        ranked = heapq.nsmallest(limit, score_rows(query), key=rank_key)
+        if bound is None:
+            return ranked
+        # Strictly below the limit-th score (with float slack), so boundary ties are in the window too.
+        if len(ranked) == limit and ranked[-1][1] is not None and bound + 1e-9 < ranked[-1][1]:
+            return ranked
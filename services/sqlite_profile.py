@@ -0,0 +1,85 @@
+"""SQLite pragma profile applied to every pooled connection.
+
+`install_pragmas(engine, pragmas)` registers a connect hook that runs
+`PRAGMA name = value` for each entry of `pragmas` (the `SQLITE_PRAGMAS`
+config) on every new DB-API connection of a SQLite engine; create_app
+installs it on the app's engine and the async mode on its aiosqlite
+engine. `database_diagnostics()` reads the settings back from a pooled
+connection for GET /admin/database.
+"""
+import os
+import re
+
+from flask import current_app
+from sqlalchemy import event
+
+from models import db
+
+# Values accepted in a profile: integers or bare words (WAL, NORMAL, MEMORY...).
+_VALUE = re.compile(r'^-?\d+$|^[A-Za-z_]+$')
+
+# Integer codes SQLite reports for these pragmas, by name.
+_ENUMS = {
+    'synchronous': {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'},
+    'temp_store': {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'},
+}
+
+
+def _statements(pragmas):
+    statements = []
+    for name, value in pragmas.items():
+        if not name.isidentifier() or not _VALUE.match(str(value)):
+            raise ValueError(f'Invalid SQLite pragma {name}={value!r}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def install_pragmas(engine, pragmas):
+    """Run `pragmas` on each new connection of `engine`; no-op for other databases or an empty profile."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    # journal_mode first: it needs the connection outside a transaction.
+    statements = _statements(dict(sorted(pragmas.items(), key=lambda item: item[0] != 'journal_mode')))
+
+    @event.listens_for(engine, 'connect')
+    def _apply(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def init_sqlite_profile(app):
+    """Install the app's `SQLITE_PRAGMAS` on its engine; call before the first connection."""
+    with app.app_context():
+        install_pragmas(db.engine, app.config.get('SQLITE_PRAGMAS') or {})
+
+
+def database_diagnostics():
+    """Engine, file sizes and effective pragma values of a pooled connection."""
+    engine = db.engine
+    report = {'dialect': engine.dialect.name, 'driver': engine.dialect.driver}
+    if engine.dialect.name != 'sqlite':
+        return report
+    configured = current_app.config.get('SQLITE_PRAGMAS') or {}
+    conn = db.session.connection()
+    pragmas = {}
+    for name in dict.fromkeys(['journal_mode', *configured, 'page_size', 'page_count', 'freelist_count']):
+        value = conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+        pragmas[name] = _ENUMS.get(name, {}).get(value, value)
+    path = engine.url.database
+    files = {}
+    if path and path != ':memory:':
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                files[os.path.basename(path + suffix)] = os.path.getsize(path + suffix)
+    report.update({
+        'sqlite_version': conn.exec_driver_sql('SELECT sqlite_version()').scalar(),
+        'database': path or ':memory:',
+        'files': files,
+        'configured_pragmas': configured,
+        'pragmas': pragmas,
+    })
+    return report
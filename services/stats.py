@@ -0,0 +1,194 @@
+"""Incrementally maintained statistics behind `/cars/stats`.
+
+Every car write applies a +1 / -1 delta of the car's tracked fields to the
+summary tables (`brand_stats`, `brand_year_stats`, `brand_model_stats`,
+`drive_type_stats`) in the same transaction as the write itself, so reading
+the stats is O(brands) instead of a scan of `cars`. `rebuild_stats` recomputes
+everything from `cars` after bulk loads or raw SQL edits.
+"""
+from sqlalchemy import text
+
+from models import db, Car, BrandStat, BrandYearStat, BrandModelStat, DriveTypeStat
+
+# Metrics averaged per brand. Like SQL AVG, the average is over non-null values.
+STATS_METRICS = ('combined_mpg', 'horsepower', 'acceleration_0_100', 'vitesse_max')
+
+_TRACKED_FIELDS = ('brand', 'model', 'year', 'drive_type') + STATS_METRICS
+
+_SUMMARY_TABLES = (BrandStat, BrandYearStat, BrandModelStat, DriveTypeStat)
+
+
+def brand_key(brand):
+    """Stats key of a brand: stripped and upper-cased, 'UNKNOWN' when blank."""
+    return ((brand or '').strip() or 'Unknown').upper()
+
+
+def drive_type_key(drive_type):
+    return drive_type if drive_type is not None else 'Unknown'
+
+
+def _number(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def snapshot(car):
+    """The fields of `car` the stats depend on; pass to `record_change`."""
+    return {field: getattr(car, field, None) for field in _TRACKED_FIELDS}
+
+
+_BRAND_UPSERT = text(
+    "INSERT INTO brand_stats (brand_key, car_count, model_count, "
+    + ', '.join(f'sum_{m}, n_{m}' for m in STATS_METRICS)
+    + ") VALUES (:brand_key, :sign, 0, "
+    + ', '.join(f':sum_{m}, :n_{m}' for m in STATS_METRICS)
+    + ") ON CONFLICT (brand_key) DO UPDATE SET car_count = car_count + excluded.car_count, "
+    + ', '.join(f'sum_{m} = sum_{m} + excluded.sum_{m}, n_{m} = n_{m} + excluded.n_{m}' for m in STATS_METRICS)
+)
+
+_DELTA_STATEMENTS = [text(sql) for sql in (
+    "INSERT INTO brand_year_stats (brand_key, year, car_count) VALUES (:brand_key, :year, :sign) "
+    "ON CONFLICT (brand_key, year) DO UPDATE SET car_count = car_count + excluded.car_count",
+    "INSERT INTO brand_model_stats (brand_key, model, car_count) VALUES (:brand_key, :model, :sign) "
+    "ON CONFLICT (brand_key, model) DO UPDATE SET car_count = car_count + excluded.car_count",
+    "INSERT INTO drive_type_stats (drive_type, car_count) VALUES (:drive_type, :sign) "
+    "ON CONFLICT (drive_type) DO UPDATE SET car_count = car_count + excluded.car_count",
+    "DELETE FROM brand_year_stats WHERE brand_key = :brand_key AND year = :year AND car_count <= 0",
+    "DELETE FROM brand_model_stats WHERE brand_key = :brand_key AND model = :model AND car_count <= 0",
+    "DELETE FROM drive_type_stats WHERE drive_type = :drive_type AND car_count <= 0",
+    "DELETE FROM brand_stats WHERE brand_key = :brand_key AND car_count <= 0",
+    # Both subqueries are range scans of one brand on the primary keys.
+    "UPDATE brand_stats SET "
+    "model_count = (SELECT count(*) FROM brand_model_stats WHERE brand_key = :brand_key), "
+    "year_min = (SELECT min(year) FROM brand_year_stats WHERE brand_key = :brand_key), "
+    "year_max = (SELECT max(year) FROM brand_year_stats WHERE brand_key = :brand_key) "
+    "WHERE brand_key = :brand_key",
+)]
+
+
+def _apply(values, sign):
+    params = {
+        'sign': sign,
+        'brand_key': brand_key(values['brand']),
+        'year': values['year'],
+        'model': values['model'],
+        'drive_type': drive_type_key(values['drive_type']),
+    }
+    for metric in STATS_METRICS:
+        value = _number(values[metric])
+        params[f'sum_{metric}'] = sign * value if value is not None else 0.0
+        params[f'n_{metric}'] = sign if value is not None else 0
+    db.session.execute(_BRAND_UPSERT, params)
+    for stmt in _DELTA_STATEMENTS:
+        db.session.execute(stmt, params)
+
+
+def load_snapshots(car_ids):
+    """{car_id: snapshot} of the stored rows of `car_ids`, read with one query."""
+    if not car_ids:
+        return {}
+    rows = db.session.query(Car.id, *[getattr(Car, field) for field in _TRACKED_FIELDS]).filter(Car.id.in_(car_ids))
+    return {row[0]: dict(zip(_TRACKED_FIELDS, row[1:])) for row in rows}
+
+
+def record_change(before, after):
+    """Apply one car write to the summary tables, inside the caller's transaction.
+
+    `before` / `after` are `snapshot`s of the car (None for a create / delete).
+    """
+    if before == after:
+        return
+    if before is not None:
+        _apply(before, -1)
+    if after is not None:
+        _apply(after, +1)
+
+
+def rebuild_stats():
+    """Recompute every summary table from `cars` in one transaction."""
+    brands = {}
+    rows = db.session.query(
+        Car.brand, db.func.count(Car.id),
+        *[agg for m in STATS_METRICS for agg in (db.func.sum(getattr(Car, m)), db.func.count(getattr(Car, m)))]
+    ).group_by(Car.brand)
+    for brand, count, *sums in rows:
+        key = brand_key(brand)
+        entry = brands.setdefault(key, {'brand_key': key, 'car_count': 0, **{
+            f'{prefix}_{m}': 0 for m in STATS_METRICS for prefix in ('sum', 'n')}})
+        entry['car_count'] += count
+        for i, metric in enumerate(STATS_METRICS):
+            entry[f'sum_{metric}'] += sums[2 * i] or 0.0
+            entry[f'n_{metric}'] += sums[2 * i + 1]
+
+    years = {}
+    for brand, year, count in db.session.query(Car.brand, Car.year, db.func.count(Car.id)).group_by(Car.brand, Car.year):
+        key = (brand_key(brand), year)
+        years[key] = years.get(key, 0) + count
+    models = {}
+    for brand, model, count in db.session.query(Car.brand, Car.model, db.func.count(Car.id)).group_by(Car.brand, Car.model):
+        key = (brand_key(brand), model)
+        models[key] = models.get(key, 0) + count
+    drives = {}
+    for drive_type, count in db.session.query(Car.drive_type, db.func.count(Car.id)).group_by(Car.drive_type):
+        key = drive_type_key(drive_type)
+        drives[key] = drives.get(key, 0) + count
+
+    for (key, year), _count in years.items():
+        entry = brands[key]
+        entry['year_min'] = min(year, entry.get('year_min', year))
+        entry['year_max'] = max(year, entry.get('year_max', year))
+    for key, _model in models:
+        brands[key]['model_count'] = brands[key].get('model_count', 0) + 1
+
+    for model in _SUMMARY_TABLES:
+        db.session.execute(model.__table__.delete())
+    for model, rows in (
+        (BrandStat, [{'year_min': None, 'year_max': None, 'model_count': 0, **entry} for entry in brands.values()]),
+        (BrandYearStat, [{'brand_key': k, 'year': y, 'car_count': c} for (k, y), c in years.items()]),
+        (BrandModelStat, [{'brand_key': k, 'model': m, 'car_count': c} for (k, m), c in models.items()]),
+        (DriveTypeStat, [{'drive_type': d, 'car_count': c} for d, c in drives.items()]),
+    ):
+        if rows:
+            db.session.execute(model.__table__.insert(), rows)
+    db.session.commit()
+    return len(brands)
+
+
+def ensure_stats():
+    """Build the summary tables if they are empty but `cars` is not (new tables, old data)."""
+    if BrandStat.query.first() is None and Car.query.first() is not None:
+        rebuild_stats()
+
+
+def read_stats():
+    """The `/cars/stats` payload, read from the summary tables."""
+    brands = []
+    total_cars = 0
+    for row in BrandStat.query.order_by(BrandStat.car_count.desc(), BrandStat.brand_key):
+        total_cars += row.car_count
+        averages = {}
+        for metric in STATS_METRICS:
+            n = getattr(row, f'n_{metric}')
+            averages[metric] = getattr(row, f'sum_{metric}') / n if n else None
+        brands.append({
+            'brand': row.brand_key,
+            'count': row.car_count,
+            'average_combined_mpg': round(averages['combined_mpg'], 2) if averages['combined_mpg'] is not None else None,
+            'average_horsepower': round(averages['horsepower'], 1) if averages['horsepower'] is not None else None,
+            'average_acceleration_0_100': round(averages['acceleration_0_100'], 2) if averages['acceleration_0_100'] is not None else None,
+            'average_top_speed': round(averages['vitesse_max'], 1) if averages['vitesse_max'] is not None else None,
+            'year_range': f"{row.year_min}-{row.year_max}" if row.year_min and row.year_max else None,
+            'model_count': row.model_count,
+        })
+
+    drive_types = [
+        {'drive_type': row.drive_type, 'count': row.car_count}
+        for row in DriveTypeStat.query.order_by(DriveTypeStat.drive_type)
+    ]
+    return {
+        'total_cars': total_cars,
+        'brands': brands,
+        'drive_types': drive_types,
+    }
@@ -0,0 +1,51 @@
+"""Shared pytest fixtures.
+
+Every module gets its own app on a fresh in-memory database and seeds it in a
+module-scoped fixture of its own, so collecting the suite builds nothing.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'scripts')]
+
+from app import create_app
+from config import TestingConfig, config
+
+# Manual scripts (see the README): they start or call a server, or read the dev database, on import.
+collect_ignore = ['test_auth.py', 'test_auth_admin.py', 'test_direct_api.py',
+                  'test_search_endpoint.py', 'test_search_fix.py', 'test_winning_metrics.py']
+
+
+@pytest.fixture(scope='module')
+def app():
+    """The module's app; its tests share one in-memory database."""
+    return create_app('testing')
+
+
+@pytest.fixture(scope='module')
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def fresh_app():
+    """An app on its own empty in-memory database, for tests that must not see the module's rows."""
+    return create_app('testing')
+
+
+@pytest.fixture(scope='module')
+def file_config(tmp_path_factory):
+    """Register a TestingConfig on a temporary SQLite file; returns its config name.
+
+    For what an in-memory database cannot do: WAL, a second engine or process,
+    or restarting the app on the same data. Keyword arguments become config
+    attributes.
+    """
+    def register(name, **settings):
+        path = tmp_path_factory.mktemp(name) / 'cars.db'
+        config[name] = type('FileTestingConfig', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', **settings})
+        return name
+    return register
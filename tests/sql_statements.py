@@ -0,0 +1,17 @@
+"""Shared by the tests that assert which SQL a call runs (or that it runs none)."""
+from sqlalchemy import event
+
+from models import db
+
+
+def statements(app, fn):
+    """(fn(), [every SQL statement `app`'s engine executed while it ran])."""
+    with app.app_context():
+        engine = db.engine
+    seen = []
+    listener = lambda *args: seen.append(args[2])
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        return fn(), seen
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
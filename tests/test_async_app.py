@@ -0,0 +1,173 @@
+"""Async serving mode: attendee reads through aiosqlite sessions match the WSGI app.
+
+Drives services.async_app.AsyncApp directly with ASGI messages against a
+temporary SQLite file (the async engine cannot share an in-memory database).
+Needs aiosqlite and greenlet.
+"""
+import asyncio
+import gzip
+import json
+import threading
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from services.cache_backends import SQLiteBackend
+from services.car_service import create_car
+from services.catalog_snapshot import CatalogSnapshot, np
+
+pytest.importorskip('aiosqlite')
+pytest.importorskip('greenlet')
+
+
+@pytest.fixture(scope='module')
+def database(file_config):
+    return file_config('async-testing')
+
+
+@pytest.fixture(scope='module')
+def app(database):
+    return create_app(database)
+
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    with app.app_context():
+        for i in range(40):
+            create_car({'brand': 'Audi' if i % 2 else 'BMW', 'model': f'A{i % 4} quattro {i}', 'year': 2010 + i % 6,
+                        'horsepower': 150 + i, 'torque_nm': 300 + i, 'drive_type': 'AWD', 'fuel_type': 'Gasoline'})
+
+
+URLS = [
+    '/api/v1/cars?per_page=5&sort_by=horsepower&order=desc',
+    '/api/v1/cars?min_horsepower=170&fields=brand,year',
+    '/api/v1/cars/3',
+    '/api/v1/cars/999',
+    '/api/v1/cars/search?q=quattro',
+    '/api/v1/cars/batch?ids=4,1,77',
+    '/api/v1/cars/top/horsepower?limit=3',
+    '/api/v1/cars/5/similar?limit=3',
+    '/api/v1/cars/stats',
+    '/api/v1/filter/by-brand/audi?per_page=3',
+    '/api/v1/available/brands',
+]
+
+
+async def _request(asgi, method, url, body=b'', headers=()):
+    path, _, query = url.partition('?')
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(), 'root_path': '',
+             'headers': [(k.lower().encode(), v.encode()) for k, v in headers], 'http_version': '1.1',
+             'scheme': 'http', 'server': ('testserver', 80), 'client': ('127.0.0.1', 5000)}
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi(scope, receive, send)
+    head = dict(sent[0]['headers'])
+    return sent[0]['status'], {k.decode(): v.decode() for k, v in head.items()}, b''.join(m.get('body', b'') for m in sent[1:])
+
+
+def _async_app(app):
+    from services.async_app import AsyncApp
+    return AsyncApp(app)
+
+
+def test_reads_match_wsgi_and_use_async_engine(app, client):
+    asgi = _async_app(app)
+    statements = []
+    event.listen(asgi.engine.sync_engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    async def run():
+        for url in URLS:
+            expected = client.get(url)
+            status, headers, body = await _request(asgi, 'GET', url)
+            assert (status, body) == (expected.status_code, expected.data), url
+            assert headers.get('etag') == expected.headers.get('ETag'), url
+        # Conditional GETs and compression go through the same hooks.
+        etag = client.get(URLS[0]).headers['ETag']
+        status, _, body = await _request(asgi, 'GET', URLS[0], headers=[('If-None-Match', etag)])
+        assert status == 304 and body == b''
+        status, headers, body = await _request(asgi, 'GET', '/api/v1/cars?per_page=40', headers=[('Accept-Encoding', 'gzip')])
+        assert headers['content-encoding'] == 'gzip' and gzip.decompress(body) == client.get('/api/v1/cars?per_page=40').data
+        await asgi.engine.dispose()
+
+    asyncio.run(run())
+    assert any('FROM cars' in sql for sql in statements)
+
+
+def test_concurrent_reads_share_the_holders(app, client):
+    asgi = _async_app(app)
+
+    async def run():
+        # Stale snapshot and version: the first readers rebuild them while the
+        # others wait on the holder locks without blocking the event loop.
+        with app.app_context():
+            from services.catalog_snapshot import invalidate_snapshot
+            from services.catalog_version import forget_version
+            invalidate_snapshot()
+            forget_version()
+        app.config['RESPONSE_CACHE_SIZE'] = 0
+        try:
+            results = await asyncio.wait_for(asyncio.gather(*[
+                _request(asgi, 'GET', URLS[i % len(URLS)]) for i in range(100)]), timeout=30)
+        finally:
+            app.config['RESPONSE_CACHE_SIZE'] = 1024
+        for i, (status, _, body) in enumerate(results):
+            expected = client.get(URLS[i % len(URLS)])
+            assert (status, body) == (expected.status_code, expected.data), URLS[i % len(URLS)]
+        await asgi.engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_blocking_work_leaves_the_loop(database, tmp_path):
+    shared = create_app(database)
+    shared.config.update(CACHE_BACKEND='sqlite', CACHE_URL=str(tmp_path / 'cache.sqlite'))
+    asgi = _async_app(shared)
+    threads = {}
+    get, build = SQLiteBackend.get, CatalogSnapshot.build.__func__
+
+    def recorded(name, fn):
+        def wrapper(*args):
+            threads.setdefault(name, set()).add(threading.get_ident())
+            return fn(*args)
+        return wrapper
+
+    async def run():
+        # The snapshot is built synchronously here (CATALOG_SNAPSHOT_BACKGROUND is off in testing).
+        status, _, _ = await _request(asgi, 'GET', '/api/v1/cars/top/horsepower?limit=3')
+        assert status == 200
+        await asgi.engine.dispose()
+
+    SQLiteBackend.get = recorded('cache', get)
+    CatalogSnapshot.build = classmethod(recorded('snapshot', build))
+    try:
+        asyncio.run(run())
+    finally:
+        SQLiteBackend.get, CatalogSnapshot.build = get, classmethod(build)
+    # asyncio.run drives the loop on this thread; the blocking calls ran elsewhere.
+    assert threads['cache'] and threading.get_ident() not in threads['cache']
+    if np is not None:
+        assert threads['snapshot'] and threading.get_ident() not in threads['snapshot']
+
+
+def test_writes_and_streams_use_the_thread_path(app):
+    asgi = _async_app(app)
+    assert not asgi.served_async({'REQUEST_METHOD': 'GET', 'PATH_INFO': '/api/v1/cars/export', 'SERVER_NAME': 'x',
+                                  'SERVER_PORT': '80', 'wsgi.url_scheme': 'http', 'QUERY_STRING': ''})
+
+    async def run():
+        register = json.dumps({'username': 'async-user', 'password': 'secret123'}).encode()
+        status, _, _ = await _request(asgi, 'POST', '/api/v1/auth/register', register, [('Content-Type', 'application/json')])
+        assert status == 201
+        status, headers, body = await _request(asgi, 'GET', '/api/v1/cars/export?format=csv')
+        assert status == 200 and headers['content-type'].startswith('text/csv') and body.count(b'\n') == 41
+        await asgi.engine.dispose()
+
+    asyncio.run(run())
+
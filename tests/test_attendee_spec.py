@@ -0,0 +1,41 @@
+"""The attendee spec is materialized on write and served as stored."""
+import json
+
+from backfill_attendee_specs import backfill
+from models import db, Car
+from services.car_service import create_car, update_car, build_attendee_spec
+
+
+def test_spec_is_stored_on_write_and_served(fresh_app):
+    client = fresh_app.test_client()
+    with fresh_app.app_context():
+        car = create_car({
+            'brand': 'BMW', 'model': 'BMW M3', 'year': 2021, 'horsepower': 473, 'torque_nm': 0,
+            'raw_spec': {'Company': 'bmw', 'Power(HP)\n': '473 HP', 'Price': '70000', 'Body style': 'Sedan'},
+        })
+        stored = json.loads(car.attendee_spec)
+        assert list(stored.items()) == [
+            ('Company', 'BMW'), ('Model', 'BMW M3'), ('Production Years', '2021'),
+            ('Power(HP)', 473), ('Body style', 'Sedan'),
+        ]
+
+        update_car(car, {'horsepower': 510})
+        assert json.loads(car.attendee_spec)['Power(HP)'] == 510
+        car_id = car.id
+
+    body = client.get(f'/api/v1/cars/{car_id}').get_json()
+    assert body['car']['Power(HP)'] == 510
+    assert client.get('/api/v1/cars').get_json()['cars'][0]['spec'] == body['car']
+
+
+def test_backfill_fills_legacy_rows(fresh_app):
+    with fresh_app.app_context():
+        # A row written before the column existed.
+        legacy = Car(brand='Audi', model='A4', year=2019, price=0.0, raw_spec=json.dumps({'Fuel': 'Diesel'}))
+        db.session.add(legacy)
+        db.session.commit()
+        assert legacy.attendee_spec is None
+
+        assert backfill() == 1
+        assert json.loads(legacy.attendee_spec) == build_attendee_spec(legacy)
+        assert backfill() == 0
@@ -0,0 +1,70 @@
+"""POST /batch: several GET sub-requests in one round trip, sequential or on a thread pool."""
+import json
+
+import pytest
+
+from models import User, db
+from services.car_service import create_car
+
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    with app.app_context():
+        for i in range(10):
+            create_car({'brand': 'Audi', 'model': f'A{i % 3} {i}', 'year': 2010 + i, 'horsepower': 150 + i,
+                        'torque_nm': 300 + i, 'drive_type': 'AWD', 'fuel_type': 'Gasoline'})
+        admin = User(username='admin', is_admin=True)
+        admin.set_password('secret')
+        db.session.add(admin)
+        db.session.commit()
+
+SUB_REQUESTS = [
+    {'method': 'GET', 'path': '/cars/1'},
+    {'path': '/api/v1/cars/1/similar', 'query': {'limit': 3}},
+    {'path': '/cars/stats'},
+    {'path': '/available/brands?limit=5'},
+    {'path': '/cars/999'},
+    {'path': '/cars/compare'},
+]
+
+
+def _direct(client, sub):
+    path = sub['path'] if sub['path'].startswith('/api/v1') else '/api/v1' + sub['path']
+    resp = client.get(path, query_string=sub.get('query'))
+    return resp.status_code, resp.get_json()
+
+
+def test_matches_individual_requests(client):
+    expected = [_direct(client, sub) for sub in SUB_REQUESTS]
+    for body in (SUB_REQUESTS, {'requests': SUB_REQUESTS, 'parallel': True}):
+        resp = client.post('/api/v1/batch', json=body)
+        assert resp.status_code == 200
+        results = [(entry['status'], entry['body']) for entry in resp.get_json()['responses']]
+        assert results[:5] == expected[:5], body
+        assert results[5] == (405, {'error': '405 METHOD NOT ALLOWED'})
+    # The spliced envelope is plain JSON even when sub-responses are pretty-printed.
+    resp = client.post('/api/v1/batch', json=[{'path': '/cars/2', 'query': {'pretty': 1}}])
+    assert json.loads(resp.data)['responses'][0]['body'] == _direct(client, {'path': '/cars/2'})[1]
+    # Non-JSON bodies (the CSV export) come back as a JSON string.
+    entry = client.post('/api/v1/batch', json=[{'path': '/cars/export', 'query': {'format': 'csv'}}]).get_json()['responses'][0]
+    assert entry['status'] == 200 and entry['body'].startswith('id,brand,model') and entry['body'].count('\n') == 11
+
+
+def test_credentials_are_forwarded(client):
+    token = client.post('/api/v1/auth/login', json={'username': 'admin', 'password': 'secret'}).get_json()['access_token']
+    anonymous = client.post('/api/v1/batch', json=[{'path': '/admin/cache'}]).get_json()['responses'][0]
+    assert anonymous['status'] == 401
+    authorized = client.post('/api/v1/batch', json=[{'path': '/admin/cache'}, {'path': '/cars/1'}],
+                             headers={'Authorization': f'Bearer {token}'}).get_json()['responses']
+    assert [entry['status'] for entry in authorized] == [200, 200] and 'hits' in authorized[0]['body']
+
+
+def test_invalid_batches(app, client):
+    assert client.post('/api/v1/batch', json=[]).status_code == 400
+    assert client.post('/api/v1/batch', json=[{'method': 'DELETE', 'path': '/cars/1'}]).status_code == 400
+    assert client.post('/api/v1/batch', json=[{'query': {}}]).status_code == 400
+    app.config['BATCH_MAX_REQUESTS'] = 2
+    resp = client.post('/api/v1/batch', json=[{'path': '/cars/1'}] * 3)
+    app.config['BATCH_MAX_REQUESTS'] = 20
+    assert resp.status_code == 400 and 'At most 2' in resp.get_json()['error']
+
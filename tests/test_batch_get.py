@@ -0,0 +1,47 @@
+"""Batch get: /cars/batch returns many cars in request order from one query."""
+import pytest
+
+from services.car_service import create_car
+from sql_statements import statements
+
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    app.config['RESPONSE_CACHE_SIZE'] = 0
+    with app.app_context():
+        for i in range(10):
+            create_car({'brand': 'Audi', 'model': f'A{i}', 'year': 2010 + i, 'horsepower': 150 + i})
+
+
+def _car_selects(app, call):
+    resp, seen = statements(app, call)
+    return resp, [sql for sql in seen if 'FROM cars' in sql]
+
+
+def test_request_order_and_not_found(app, client):
+    resp, selects = _car_selects(app, lambda: client.get('/api/v1/cars/batch?ids=7,99,2,7'))
+    body = resp.get_json()
+    assert resp.status_code == 200 and len(selects) == 1 and ' IN ' in selects[0]
+    assert [c['id'] for c in body['cars']] == [7, 99, 2, 7]
+    assert body['cars'][1] == {'id': 99, 'error': 'Car not found'} and body['not_found'] == [99]
+    assert body['count'] == 3
+    assert body['cars'][0]['spec'] == client.get('/api/v1/cars/7').get_json()['car']
+
+
+def test_post_form_and_fields(client):
+    resp = client.post('/api/v1/cars/batch', json={'ids': [3, 1], 'fields': ['model', 'year']})
+    assert resp.get_json()['cars'] == [{'id': 3, 'model': 'A2', 'year': 2012}, {'id': 1, 'model': 'A0', 'year': 2010}]
+    resp = client.get('/api/v1/cars/batch?ids=4&fields=horsepower')
+    assert resp.get_json()['cars'] == [{'id': 4, 'horsepower': 153}]
+
+
+def test_invalid_requests(app, client):
+    assert client.get('/api/v1/cars/batch').status_code == 400
+    assert client.get('/api/v1/cars/batch?ids=1,x').status_code == 400
+    assert client.post('/api/v1/cars/batch', json={'ids': [1, '2']}).status_code == 400
+    assert client.get('/api/v1/cars/batch?ids=1&fields=nope').status_code == 400
+    app.config['BATCH_MAX_IDS'] = 3
+    resp = client.post('/api/v1/cars/batch', json={'ids': [1, 2, 3, 4]})
+    app.config['BATCH_MAX_IDS'] = 100
+    assert resp.status_code == 400 and 'At most 3' in resp.get_json()['error']
+
@@ -0,0 +1,79 @@
+"""Bulk import: incremental JSON parsing, in-memory de-duplication, deferred indexing."""
+import json
+
+import pytest
+from sqlalchemy import inspect, text
+
+import import_dataset
+from models import db, Car
+from services.car_service import build_attendee_spec, search_cars
+from services.catalog_version import current_version
+
+RECORDS = [
+    {'Company': 'Audi', 'Model': 'AUDI A4 2.0 TFSI', 'Production Years': '2019, 2020', 'Power(HP)': '190 HP',
+     'Fuel': 'Gasoline', 'Body style': 'Sedan', 'Specification summary': 'Audi A4 Sëdan quattro'},
+    {'Company': 'BMW', 'Model': 'BMW M3', 'Production Years': '2021', 'Power(HP)\n': '473 HP',
+     'Combined mpg': '23.5 mpg US', 'Torque(Nm)': '550 Nm'},
+    # Same brand+model+year as the first record: skipped.
+    {'Company': 'Audi', 'Model': 'AUDI A4 2.0 TFSI', 'Production Years': '2019'},
+]
+
+
+@pytest.fixture
+def app(fresh_app, monkeypatch):
+    monkeypatch.setattr(import_dataset, 'app', fresh_app)
+    return fresh_app
+
+
+def _write_dataset(tmp_path, records):
+    path = tmp_path / 'dataset.json'
+    path.write_text(json.dumps(records, indent=2, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+def test_iter_json_array_matches_json_load(tmp_path):
+    path = _write_dataset(tmp_path, RECORDS * 50)
+    # A tiny chunk size forces records to straddle buffer refills.
+    assert list(import_dataset.iter_json_array(path, chunk_size=7)) == RECORDS * 50
+
+
+def test_bulk_import_dedupes_and_indexes(app, tmp_path):
+    path = _write_dataset(tmp_path, RECORDS)
+    with app.app_context():
+        db.session.add(Car(brand='BMW', model='BMW M3', year=2021, price=0.0))
+        db.session.commit()
+
+        version = current_version()
+        assert import_dataset.import_data(path, bulk=True, batch_size=1) == 1
+        assert import_dataset.import_data(path, bulk=True) == 0
+        assert current_version() == version + 2
+
+        audi = Car.query.filter_by(brand='Audi').one()
+        assert (audi.year, audi.horsepower) == (2019, 190)
+        assert json.loads(audi.attendee_spec) == build_attendee_spec(audi)
+        assert audi.brand_id is not None and audi.serie_id is not None
+
+        # Indexes and search triggers are back after the load.
+        names = {ix['name'] for ix in inspect(db.engine).get_indexes('cars')}
+        assert names == {ix.name for ix in Car.__table__.indexes}
+        assert [c.id for c in search_cars('sedan quattro').items] == [audi.id]
+        audi.model = 'AUDI S4'
+        db.session.commit()
+        assert search_cars('S4').total == 1
+
+
+def test_bulk_import_keeps_unique_index_and_restores_triggers(app, tmp_path, monkeypatch):
+    path = _write_dataset(tmp_path, RECORDS)
+
+    def failing_ensure_indexes(engine):
+        # The load ran with the unique source_key index in place.
+        assert 'ux_cars_source_key' in {ix['name'] for ix in inspect(engine).get_indexes('cars')}
+        raise RuntimeError('index rebuild failed')
+
+    monkeypatch.setattr(import_dataset, 'ensure_indexes', failing_ensure_indexes)
+    with app.app_context():
+        with pytest.raises(RuntimeError):
+            import_dataset.import_data(path, bulk=True)
+        triggers = db.session.execute(text("SELECT count(*) FROM sqlite_master WHERE type = 'trigger'")).scalar()
+        assert triggers == 3
+        assert search_cars('quattro').total == 1
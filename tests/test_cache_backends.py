@@ -0,0 +1,141 @@
+"""Response cache backends: memory, shared SQLite file and a Redis-protocol server.
+
+The Redis backend runs against a small in-process RESP stand-in server.
+"""
+import fnmatch
+import multiprocessing
+import socketserver
+import threading
+import time
+
+import pytest
+
+from app import create_app
+from services.cache_backends import MemoryBackend, RedisBackend, SQLiteBackend
+from services.car_service import create_car
+
+
+class _RespStandIn(socketserver.ThreadingTCPServer):
+    """Speaks just enough RESP2 for RedisBackend: GET, SET ... PX, DEL, SCAN, SELECT."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        self.data = {}  # key -> (value, expires_at)
+        self.lock = threading.Lock()
+        super().__init__(('127.0.0.1', 0), _RespHandler)
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                size = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(size + 2)[:-2])
+            self.wfile.write(self.reply(args[0].upper(), args[1:]))
+
+    def reply(self, command, args):
+        data, now = self.server.data, time.time()
+        with self.server.lock:
+            if command == b'GET':
+                value, expires_at = data.get(args[0], (None, 0))
+                if value is None or expires_at <= now:
+                    return b'$-1\r\n'
+                return b'$%d\r\n%s\r\n' % (len(value), value)
+            if command == b'SET':
+                data[args[0]] = (args[1], now + int(args[3]) / 1000)
+                return b'+OK\r\n'
+            if command == b'DEL':
+                return b':%d\r\n' % sum(data.pop(key, None) is not None for key in args)
+            if command == b'SCAN':
+                keys = [k for k in data if fnmatch.fnmatchcase(k.decode(), args[2].decode())]
+                return b'*2\r\n$1\r\n0\r\n*%d\r\n%s' % (len(keys), b''.join(b'$%d\r\n%s\r\n' % (len(k), k) for k in keys))
+            if command == b'SELECT':
+                return b'+OK\r\n'
+        return b'-ERR unknown command\r\n'
+
+
+@pytest.fixture(scope='module')
+def redis_url():
+    server = _RespStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'redis://127.0.0.1:{server.server_address[1]}/1'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope='module')
+def sqlite_path(tmp_path_factory):
+    return str(tmp_path_factory.mktemp('cache') / 'cache.sqlite')
+
+
+def _write_from_other_process(path):
+    SQLiteBackend(path, 100, prefix='t:').set('shared', b'from another worker', 60)
+
+
+def test_backend_contract(sqlite_path, redis_url):
+    for backend in (MemoryBackend(100), SQLiteBackend(sqlite_path, 100, prefix='t:'), RedisBackend(redis_url, prefix='t:')):
+        backend.clear()
+        assert backend.get('k') is None, backend.name
+        backend.set('k', b'\x00value', 60)
+        backend.set('short', b'x', 0.01)
+        assert backend.get('k') == b'\x00value', backend.name
+        time.sleep(0.02)
+        assert backend.get('short') is None, backend.name
+        backend.clear()
+        assert backend.get('k') is None, backend.name
+
+
+def test_sqlite_is_shared_between_processes(sqlite_path, tmp_path):
+    process = multiprocessing.Process(target=_write_from_other_process, args=(sqlite_path,))
+    process.start()
+    process.join()
+    assert SQLiteBackend(sqlite_path, 100, prefix='t:').get('shared') == b'from another worker'
+
+    # Other prefixes (deployments) are left alone by clear().
+    SQLiteBackend(sqlite_path, 100, prefix='other:').set('k', b'v', 60)
+    SQLiteBackend(sqlite_path, 100, prefix='t:').clear()
+    assert SQLiteBackend(sqlite_path, 100, prefix='other:').get('k') == b'v'
+
+    # Pruning keeps the newest max_entries rows.
+    small = SQLiteBackend(str(tmp_path / 'small.sqlite'), 3, prune_every=1)
+    for i in range(5):
+        small.set(f'k{i}', b'v', 60)
+        time.sleep(0.001)
+    assert [small.get(f'k{i}') for i in range(5)] == [None, None, b'v', b'v', b'v']
+
+
+def test_unreachable_redis_is_a_miss():
+    backend = RedisBackend('redis://127.0.0.1:1/0', timeout=0.2)
+    backend.set('k', b'v', 60)
+    assert backend.get('k') is None
+
+
+def test_app_uses_configured_backend(redis_url, tmp_path):
+    for kind, url in (('redis', redis_url), ('sqlite', str(tmp_path / 'app.sqlite'))):
+        app = create_app('testing')
+        app.config.update(CACHE_BACKEND=kind, CACHE_URL=url, CACHE_KEY_PREFIX=f'app-{kind}:')
+        with app.app_context():
+            create_car({'brand': 'Audi', 'model': 'A4', 'year': 2020})
+        client = app.test_client()
+        assert client.get('/api/v1/browse/years').headers['X-Cache'] == 'MISS'
+        hit = client.get('/api/v1/browse/years')
+        assert hit.headers['X-Cache'] == 'HIT' and hit.get_json()['total'] == 1
+        with app.app_context():
+            create_car({'brand': 'BMW', 'model': 'M3', 'year': 2021})
+        assert client.get('/api/v1/browse/years').get_json()['total'] == 2
+
+
+def test_sqlite_defaults_to_instance_folder(fresh_app, tmp_path):
+    fresh_app.instance_path = str(tmp_path)
+    fresh_app.config.update(CACHE_BACKEND='sqlite', CACHE_URL=None)
+    with fresh_app.app_context():
+        create_car({'brand': 'Audi', 'model': 'A4', 'year': 2020})
+    fresh_app.test_client().get('/api/v1/browse/years')
+    assert (tmp_path / 'response-cache.sqlite').exists()
+
@@ -0,0 +1,124 @@
+"""The NumPy catalog snapshot answers metric queries exactly like the SQL path.
+
+The background rebuilds run against a temporary SQLite file.
+"""
+import random
+import threading
+import time
+
+import pytest
+
+from app import create_app
+from services import catalog_snapshot
+from services.car_service import create_car, delete_car, get_car, get_cars, get_top_cars
+from services.catalog_snapshot import np, get_snapshot, refresh_snapshot
+
+pytestmark = pytest.mark.skipif(np is None, reason='needs numpy')
+
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    with app.app_context():
+        rng = random.Random(7)
+
+        def maybe(value):
+            return None if rng.random() < 0.25 else value
+
+        for i in range(400):
+            create_car({'brand': 'Audi', 'model': f'M{i}', 'year': rng.randint(2000, 2005),
+                        'horsepower': maybe(rng.choice([150, 200, 250, 300])), 'torque_nm': maybe(rng.randint(200, 500)),
+                        'acceleration_0_100': maybe(rng.choice([4.5, 6.0, 7.5])), 'cylinders': maybe(rng.choice([4, 6]))})
+
+
+def _both(app, fn):
+    app.config['CATALOG_SNAPSHOT'] = False
+    expected = fn()
+    app.config['CATALOG_SNAPSHOT'] = True
+    return expected, fn()
+
+
+def test_pages_match_sql_path(app):
+    cases = [
+        ({}, 'id', 'asc', 1),
+        ({'min_horsepower': '200', 'max_torque_nm': '400'}, 'horsepower', 'desc', 2),
+        ({'cylinders': '6', 'min_year': '2002'}, 'acceleration_0_100', 'asc', 1),
+        ({'max_acceleration_0_100': '6'}, 'year', 'desc', 3),
+        ({'min_horsepower': '300'}, 'torque_nm', 'asc', 50),
+    ]
+    with app.app_context():
+        for filters, sort_by, order, page in cases:
+            expected, got = _both(app, lambda: get_cars(filters, sort_by, order, page, 20))
+            assert (got.total, got.pages) == (expected.total, expected.pages)
+            assert [c.id for c in got.items] == [c.id for c in expected.items]
+        for metric in ('horsepower', 'acceleration_0_100', 'year'):
+            expected, got = _both(app, lambda: get_top_cars(metric, 15))
+            assert [c['id'] for c in got['cars']] == [c['id'] for c in expected['cars']]
+
+
+def test_writes_rebuild_and_text_filters_use_sql(app):
+    with app.app_context():
+        before = get_snapshot()
+        car = create_car({'brand': 'BMW', 'model': 'M5', 'year': 2010, 'horsepower': 900})
+        assert get_top_cars('horsepower', 1)['cars'][0]['id'] == car.id
+        assert get_snapshot() is not before
+        delete_car(get_car(car.id))
+        assert get_top_cars('horsepower', 1)['cars'][0]['id'] != car.id
+        assert get_snapshot().page({'brand': 'audi'}) is None
+        assert get_cars({'brand': 'bmw', 'min_horsepower': '100'}).total == 0
+
+
+def _wait_for_build(app):
+    holder = app.extensions['catalog_snapshot']
+    deadline = time.monotonic() + 10
+    while holder.building and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not holder.building
+
+
+def test_rebuilds_run_in_the_background(file_config):
+    bg_app = create_app(file_config('snapshot-background-testing', CATALOG_SNAPSHOT_BACKGROUND=True))
+    build = catalog_snapshot.CatalogSnapshot.build
+    release = threading.Event()
+
+    def gated_build():
+        release.wait(10)
+        return build()
+
+    with bg_app.app_context():
+        create_car({'brand': 'Audi', 'model': 'A4', 'year': 2010, 'horsepower': 150})
+        first = refresh_snapshot()
+        catalog_snapshot.CatalogSnapshot.build = gated_build
+        try:
+            # A local write: readers skip the outdated snapshot (SQL path) without waiting for the rebuild.
+            car = create_car({'brand': 'BMW', 'model': 'M5', 'year': 2010, 'horsepower': 900})
+            assert get_snapshot() is None
+            assert get_top_cars('horsepower', 1)['cars'][0]['id'] == car.id
+            release.set()
+            _wait_for_build(bg_app)
+            assert get_snapshot() is not first and get_snapshot().top('horsepower', 1, False) == [car.id]
+
+            # Expired by age only: readers use SQL while the new one builds, so no
+            # response built from it is cached under the current catalog version.
+            release.clear()
+            bg_app.config['CATALOG_SNAPSHOT_MAX_AGE'] = 0
+            assert get_snapshot() is None and bg_app.extensions['catalog_snapshot'].building
+            release.set()
+            _wait_for_build(bg_app)
+            bg_app.config['CATALOG_SNAPSHOT_MAX_AGE'] = 60
+            assert get_snapshot() is not None
+
+            # A failed build keeps the snapshot out of date, and the next reader retries.
+            def failing_build():
+                raise RuntimeError('database unavailable')
+
+            catalog_snapshot.CatalogSnapshot.build = failing_build
+            delete_car(get_car(car.id))
+            assert get_snapshot() is None
+            _wait_for_build(bg_app)
+            catalog_snapshot.CatalogSnapshot.build = build
+            assert get_snapshot() is None
+            _wait_for_build(bg_app)
+            assert get_snapshot().top('horsepower', 1, False) != [car.id]
+        finally:
+            catalog_snapshot.CatalogSnapshot.build = build
+
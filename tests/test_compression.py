@@ -0,0 +1,56 @@
+"""Accept-Encoding negotiation: gzip / brotli, size threshold, streamed bodies."""
+import gzip
+import json
+
+import pytest
+
+from services import compression
+from services.car_service import create_car
+
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    with app.app_context():
+        for i in range(300):
+            create_car({'brand': 'Audi', 'model': f'A{i % 8} {i}', 'year': 2000 + i % 20, 'horsepower': 100 + i})
+
+
+def test_gzip_above_threshold_only(app, client):
+    plain = client.get('/api/v1/cars?per_page=100')
+    assert 'Content-Encoding' not in plain.headers and 'Accept-Encoding' in plain.headers['Vary']
+
+    packed = client.get('/api/v1/cars?per_page=100', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert packed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(packed.data) == plain.data and len(packed.data) < len(plain.data) / 4
+    assert packed.headers['ETag'] != plain.headers['ETag']
+
+    small = client.get('/api/v1/available/years', headers={'Accept-Encoding': 'gzip'})
+    assert len(small.data) < app.config['COMPRESS_MIN_SIZE'] and 'Content-Encoding' not in small.headers
+    assert 'Content-Encoding' not in client.get('/api/v1/cars', headers={'Accept-Encoding': 'gzip;q=0'}).headers
+
+
+def test_streamed_export_is_compressed_incrementally(client):
+    resp = client.get('/api/v1/cars/export', headers={'Accept-Encoding': 'gzip'})
+    assert resp.is_streamed and resp.headers['Content-Encoding'] == 'gzip'
+    assert [json.loads(line)['id'] for line in gzip.decompress(resp.data).splitlines()] == list(range(1, 301))
+
+
+def test_brotli_when_installed(client):
+    resp = client.get('/api/v1/cars?per_page=100', headers={'Accept-Encoding': 'gzip;q=0.5, br'})
+    if compression.brotli is None:
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        return
+    assert resp.headers['Content-Encoding'] == 'br'
+    assert compression.brotli.decompress(resp.data) == client.get('/api/v1/cars?per_page=100').data
+
+
+def test_levels_and_switch_come_from_config(app, client):
+    app.config['COMPRESS_GZIP_LEVEL'] = 1
+    fast = client.get('/api/v1/cars?per_page=100', headers={'Accept-Encoding': 'gzip'}).data
+    app.config['COMPRESS_GZIP_LEVEL'] = 9
+    small = client.get('/api/v1/cars?per_page=100', headers={'Accept-Encoding': 'gzip'}).data
+    app.config['COMPRESS'] = False
+    off = client.get('/api/v1/cars?per_page=100', headers={'Accept-Encoding': 'gzip'})
+    app.config.update(COMPRESS=True, COMPRESS_GZIP_LEVEL=6)
+    assert len(small) < len(fast) and 'Content-Encoding' not in off.headers
+
@@ -0,0 +1,41 @@
+"""ETag / If-None-Match on attendee GETs, driven by the catalog version."""
+import pytest
+
+from services.car_service import create_car, delete_car, get_car, update_car
+from services.catalog_version import current_version
+from sql_statements import statements
+
+
+@pytest.fixture(scope='module', autouse=True)
+def car_id(app):
+    with app.app_context():
+        car_id = create_car({'brand': 'Audi', 'model': 'A4', 'year': 2020, 'horsepower': 150}).id
+        create_car({'brand': 'BMW', 'model': '320i', 'year': 2019})
+    return car_id
+
+
+def test_not_modified_skips_the_database(app, client, car_id):
+    for url in ('/api/v1/browse/brands', '/api/v1/cars/stats', f'/api/v1/cars/{car_id}', '/api/v1/available/years'):
+        first = client.get(url)
+        etag = first.headers['ETag']
+        assert first.status_code == 200 and first.headers['Cache-Control'] == 'public, no-cache'
+        again, seen = statements(app, lambda: client.get(url, headers={'If-None-Match': etag}))
+        assert again.status_code == 304 and not again.data and seen == []
+        assert again.headers['ETag'] == etag
+
+    assert client.get('/api/v1/cars?per_page=1').headers['ETag'] != client.get('/api/v1/cars?per_page=2').headers['ETag']
+    assert client.get('/api/v1/cars/999').headers.get('ETag') is None
+
+
+def test_writes_change_the_etag(app, client, car_id):
+    url = f'/api/v1/cars/{car_id}'
+    etags = [client.get(url).headers['ETag']]
+    with app.app_context():
+        before = current_version()
+        update_car(get_car(car_id), {'horsepower': 160})
+        etags.append(client.get(url).headers['ETag'])
+        delete_car(get_car(car_id))
+        assert current_version() == before + 2
+    assert client.get(url, headers={'If-None-Match': etags[-1]}).status_code == 404
+    assert client.get('/api/v1/cars/stats', headers={'If-None-Match': etags[0]}).status_code == 200
+    assert len(set(etags)) == 2
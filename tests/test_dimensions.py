@@ -0,0 +1,66 @@
+"""Brand / serie dimension tables: case-folded keys, integer lookups, backfill."""
+import pytest
+
+import services.dimensions as dimensions
+from models import db, Car, Brand, Serie
+from services.car_service import create_car, update_car
+from services.dimensions import backfill_dimensions
+from sql_statements import statements
+
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    with app.app_context():
+        create_car({'brand': 'Mercedez BENZ', 'model': 'C 200', 'year': 2010})
+        create_car({'brand': 'MERCEDEZ  BENZ', 'model': 'c 200', 'year': 2012})
+        create_car({'brand': 'Mercedez Benz', 'model': 'E 300', 'year': 2015})
+        create_car({'brand': 'BMW', 'model': 'M3', 'year': 2020})
+        create_car({'brand': 'BMW', 'model': 'M5', 'year': 2021})
+
+
+def test_case_variants_are_one_brand(client):
+    brands = client.get('/api/v1/browse/brands').get_json()['brands']
+    assert brands == [{'brand': 'BMW', 'count': 2}, {'brand': 'Mercedez BENZ', 'count': 3}]
+    series = client.get('/api/v1/browse/brands/mercedez benz/series').get_json()['series']
+    assert series == [{'serie': 'C 200', 'count': 2}, {'serie': 'E 300', 'count': 1}]
+    assert client.get('/api/v1/filter/by-brand/MERCEDEZ BENZ').get_json()['total'] == 3
+    assert client.get('/api/v1/filter/by-brand/Merc').get_json()['total'] == 0
+    assert client.get('/api/v1/filter/by-serie/m').get_json()['total'] == 2
+    assert client.get('/api/v1/cars/compare/by-brand/bmw').get_json()['total_cars'] == 2
+
+
+def test_update_moves_car_and_backfill_fills_legacy_rows(app):
+    with app.app_context():
+        car = db.session.get(Car, 5)
+        update_car(car, {'brand': 'Tesla', 'model': 'Model S'})
+        assert db.session.get(Brand, car.brand_id).name == 'Tesla'
+        assert db.session.get(Serie, car.serie_id).name == 'Model S'
+
+        # A row written before the columns existed.
+        db.session.add(Car(brand='bmw', model='m3', year=2022, price=0.0))
+        db.session.commit()
+        assert backfill_dimensions() == 1
+        legacy = Car.query.filter_by(year=2022).one()
+        m3 = db.session.get(Car, 4)
+        assert (legacy.brand_id, legacy.serie_id) == (m3.brand_id, m3.serie_id)
+        assert backfill_dimensions() == 0
+
+
+def test_single_writes_look_up_one_key(app, monkeypatch):
+    with app.app_context():
+        _car, seen = statements(app, lambda: create_car({'brand': 'bmw', 'model': 'X5', 'year': 2022}))
+        lookups = [sql for sql in seen if 'FROM brands' in sql or 'FROM series' in sql]
+        assert lookups and all('name_key = ?' in sql for sql in lookups)
+
+        # Another request inserted the brand between our lookup and insert.
+        lookup = dimensions._lookup
+        calls = []
+
+        def first_lookup_misses(model, keys):
+            calls.append(model)
+            return None if len(calls) == 1 else lookup(model, keys)
+
+        monkeypatch.setattr(dimensions, '_lookup', first_lookup_misses)
+        brand_id, _ = dimensions.dimension_ids('Bmw ', 'M3')
+        assert calls[:2] == [Brand, Brand] and db.session.get(Brand, brand_id).name == 'BMW'
+        assert Brand.query.filter_by(name_key='bmw').count() == 1
@@ -0,0 +1,47 @@
+"""Streaming catalog export as NDJSON / CSV, filtered like /cars."""
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from services.car_service import create_car
+
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    with app.app_context():
+        for i in range(2500):
+            create_car({'brand': 'Audi' if i % 2 else 'BMW', 'model': f'Model {i}', 'year': 2000 + i % 20,
+                        'horsepower': 100 + i % 300})
+
+
+def test_ndjson_export_streams_every_row(client):
+    resp = client.get('/api/v1/cars/export')
+    assert resp.is_streamed and resp.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in resp.data.splitlines()]
+    assert [r['id'] for r in rows] == list(range(1, 2501))
+    assert rows[0]['spec']['Company'] == 'BMW'
+
+
+def test_export_accepts_get_cars_filters(client):
+    resp = client.get('/api/v1/cars/export?format=csv&brand=audi&min_horsepower=350&sort_by=horsepower&order=desc')
+    rows = list(csv.DictReader(io.StringIO(resp.data.decode('utf-8'))))
+    listed = client.get('/api/v1/cars?brand=audi&min_horsepower=350&sort_by=horsepower&order=desc&per_page=1000').get_json()
+    assert [int(r['id']) for r in rows] == [c['id'] for c in listed['cars']]
+    assert rows[0]['brand'] == 'Audi' and int(rows[0]['horsepower']) >= 350
+
+
+def test_gzip_export(client):
+    resp = client.get('/api/v1/cars/export?format=csv', headers={'Accept-Encoding': 'gzip'})
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    text = gzip.decompress(resp.data).decode('utf-8')
+    assert len(text.splitlines()) == 2501
+    assert client.get('/api/v1/cars/export?format=xml').status_code == 400
+
+
+def test_invalid_filter_is_rejected_before_streaming(client):
+    resp = client.get('/api/v1/cars/export?min_year=abc')
+    assert resp.status_code == 400
+    assert 'error' in resp.get_json()
@@ -0,0 +1,46 @@
+"""/cars/compare/by-* winners come from one aggregate query; cars are paged."""
+import random
+
+import pytest
+
+from models import Car
+from services.car_service import compare_by_brand, compare_by_serie, compare_by_year, compare_cars, create_car
+from sql_statements import statements
+
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    with app.app_context():
+        rng = random.Random(5)
+        for i in range(90):
+            create_car({'brand': rng.choice(['Audi', 'audi', 'BMW']), 'model': f'A{i % 3} {i}', 'year': rng.choice([2010, 2011]),
+                        'horsepower': rng.choice([None, 150, 300]), 'acceleration_0_100': rng.choice([None, 4.5, 6.0]),
+                        'combined_mpg': rng.choice([None, 30, 40]), 'torque_nm': rng.choice([None, 0, 400]),
+                        'vitesse_max': rng.choice([None, 250])})
+
+
+def test_winners_match_compare_cars(app):
+    with app.app_context():
+        groups = [
+            (lambda **kw: compare_by_brand('AUDI', **kw), Car.query.filter(Car.brand.in_(['Audi', 'audi']))),
+            (lambda **kw: compare_by_serie('a1', **kw), Car.query.filter(Car.model.like('A1 %'))),
+            (lambda **kw: compare_by_year(2011, **kw), Car.query.filter(Car.year == 2011)),
+        ]
+        for compare, query in groups:
+            ids = [car.id for car in query]
+            expected = compare_cars(ids)
+            summary, seen = statements(app, lambda: compare(summary_only=True))
+            assert len(seen) == 1
+            assert 'cars' not in summary and summary['total_cars'] == len(ids)
+            assert summary['comparison_winners'] == expected['comparison_winners']
+
+            pages = [compare(page=page, per_page=7) for page in range(1, len(ids) // 7 + 2)]
+            assert pages[0]['pages'] == len(pages)
+            assert [c for p in pages for c in p['cars']] == expected['cars']
+
+
+def test_routes(client):
+    assert client.get('/api/v1/cars/compare/by-brand/bmw?summary_only=1').get_json()['comparison_winners']
+    body = client.get('/api/v1/cars/compare/by-year/2010?per_page=5&page=2').get_json()
+    assert len(body['cars']) == 5 and body['page'] == 2 and body['total_cars'] > 5
+    assert client.get('/api/v1/cars/compare/by-serie/nothing').status_code == 400
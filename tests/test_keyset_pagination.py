@@ -0,0 +1,59 @@
+"""Cursor pagination walks every row exactly once, in (sort_by, id) order."""
+import pytest
+
+from models import Car
+from services.car_service import create_car
+
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    with app.app_context():
+        for i in range(23):
+            create_car({
+                'brand': ['BMW', 'Audi', 'Opel'][i % 3],
+                'model': f'Model {i}',
+                'year': 2000 + i % 5,
+                # Every fourth car has no known horsepower, and several share a value.
+                'horsepower': None if i % 4 == 0 else 100 + (i % 6) * 10,
+            })
+
+
+def _walk(client, url, per_page=4):
+    ids, cursor = [], ''
+    while True:
+        sep = '&' if '?' in url else '?'
+        body = client.get(f'{url}{sep}per_page={per_page}&cursor={cursor}').get_json()
+        assert 'total' not in body
+        ids.extend(c['id'] for c in body['cars'])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return ids
+
+
+def _expected(app, sort_by, order):
+    with app.app_context():
+        values = {car.id: getattr(car, sort_by) for car in Car.query.all()}
+    nulls = sorted(i for i in values if values[i] is None)
+    known = sorted((i for i in values if values[i] is not None), key=lambda i: (values[i], i))
+    if order == 'desc':
+        return list(reversed(known)) + list(reversed(nulls))
+    return nulls + known
+
+
+def test_cursor_walks_every_sort_order(app, client):
+    for sort_by in ('id', 'horsepower', 'year', 'brand'):
+        for order in ('asc', 'desc'):
+            ids = _walk(client, f'/api/v1/cars?sort_by={sort_by}&order={order}')
+            assert ids == _expected(app, sort_by, order), (sort_by, order)
+
+
+def test_cursor_on_filter_endpoints(client):
+    assert _walk(client, '/api/v1/filter/by-brand/audi', per_page=3) == list(range(2, 24, 3))
+    assert len(_walk(client, '/api/v1/filter/by-year/2001', per_page=2)) == 5
+    assert len(_walk(client, '/api/v1/filter/by-serie/Model%201', per_page=2)) == 11
+
+
+def test_page_mode_and_bad_cursor(client):
+    body = client.get('/api/v1/cars?page=2&per_page=10').get_json()
+    assert body['total'] == 23 and body['pages'] == 3 and body['page'] == 2
+    assert client.get('/api/v1/cars?cursor=not-a-cursor').status_code == 400
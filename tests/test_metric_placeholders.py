@@ -0,0 +1,51 @@
+"""Ranking metrics store the dataset's 0 "unknown" placeholder as NULL."""
+import pytest
+
+from app import create_app
+from models import db, Car
+from services.car_service import create_car, update_car, get_top_cars, get_cars
+from services.catalog_version import current_version
+from services.schema import null_metric_placeholders
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    with app.app_context():
+        create_car({'brand': 'Audi', 'model': 'A4', 'year': 2010, 'horsepower': 0, 'acceleration_0_100': 0})
+        create_car({'brand': 'Audi', 'model': 'RS4', 'year': 2020, 'horsepower': 450, 'acceleration_0_100': 4.1})
+        create_car({'brand': 'BMW', 'model': 'M3', 'year': 2021, 'horsepower': 480, 'acceleration_0_100': 3.9})
+
+
+def test_writes_store_null_and_rankings_skip_unknowns(app):
+    with app.app_context():
+        a4 = db.session.get(Car, 1)
+        assert (a4.horsepower, a4.acceleration_0_100) == (None, None)
+        update_car(db.session.get(Car, 3), {'torque_nm': 0})
+        assert db.session.get(Car, 3).torque_nm is None
+
+        fastest = get_top_cars('acceleration_0_100')['cars']
+        assert [c['id'] for c in fastest] == [3, 2]
+        assert get_cars({'max_horsepower': 460}).total == 1
+
+
+def test_migration_nulls_existing_placeholders(app):
+    with app.app_context():
+        db.session.add(Car(brand='Fiat', model='Panda', year=2005, price=0.0, horsepower=0, vitesse_max=0))
+        db.session.commit()
+        assert null_metric_placeholders(db.engine) == 2
+        panda = Car.query.filter_by(model='Panda').one()
+        assert (panda.horsepower, panda.vitesse_max) == (None, None)
+        assert null_metric_placeholders(db.engine) == 0
+
+
+def test_startup_migration_bumps_the_version(file_config):
+    name = file_config('placeholders-file')
+    with create_app(name).app_context():
+        db.session.add(Car(brand='Fiat', model='Panda', year=2005, price=0.0, horsepower=0))
+        db.session.commit()
+        before = current_version()
+    # The next start migrates the placeholder, so responses tagged with the old version are stale.
+    with create_app(name).app_context():
+        assert current_version() == before + 1
+    with create_app(name).app_context():
+        assert current_version() == before + 1
+
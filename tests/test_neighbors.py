@@ -0,0 +1,119 @@
+"""Precomputed car_neighbors table behind /cars/<id>/similar."""
+import random
+
+import pytest
+
+from models import db, Car, CarNeighbor, CarNeighborQueue
+from services import neighbors
+from services.car_service import create_car, delete_car, get_car, get_similar_cars, update_car
+from services.catalog_snapshot import np
+from services.neighbors import NEIGHBORS_STORED, build_neighbors, stored_neighbors
+from services.similarity import rank_with_sql
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    with app.app_context():
+        rng = random.Random(3)
+        for i in range(120):
+            create_car({'brand': 'Audi', 'model': f'M{i}', 'year': rng.randint(2000, 2020),
+                        'horsepower': rng.choice([None, 150, 200, 250]), 'torque_nm': rng.choice([None, 300, 400]),
+                        'drive_type': rng.choice([None, 'FWD', 'AWD']), 'fuel_type': rng.choice([None, 'Gasoline', 'Diesel'])})
+
+
+def _ids(car_id, limit=10):
+    return [c['id'] for c in get_similar_cars(car_id, limit)['similar_cars']]
+
+
+def _stored(car_id):
+    return CarNeighbor.query.filter_by(car_id=car_id).count()
+
+
+def _queued():
+    return {row.car_id for row in CarNeighborQueue.query}
+
+
+def _stale_lists():
+    """Owners whose stored list differs from the live ranking."""
+    stale = []
+    for car in Car.query:
+        stored = stored_neighbors(car.id, NEIGHBORS_STORED)
+        if stored is not None and [i for i, _s in stored] != [i for i, _s in rank_with_sql(car, NEIGHBORS_STORED)]:
+            stale.append(car.id)
+    return stale
+
+
+@pytest.mark.skipif(np is None, reason='needs numpy')
+def test_build_matches_live_ranking(app):
+    with app.app_context():
+        live = {car_id: _ids(car_id, NEIGHBORS_STORED) for car_id in (1, 60, 120)}
+        db.session.query(CarNeighbor).delete()
+        db.session.commit()
+        assert build_neighbors(workers=2) == 120
+        assert CarNeighbor.query.count() == 120 * NEIGHBORS_STORED
+        # The build covers everything queued before it.
+        assert _queued() == set()
+        for car_id, ids in live.items():
+            assert _ids(car_id, NEIGHBORS_STORED) == ids
+        # Beyond the stored depth it is computed live.
+        assert len(_ids(1, 80)) == 80
+
+
+def test_reads_never_write(app):
+    with app.app_context():
+        db.session.query(CarNeighbor).delete()
+        db.session.commit()
+        first = _ids(5)
+        assert _stored(5) == 0 and _ids(5) == first
+
+
+@pytest.mark.skipif(np is None, reason='needs numpy')
+def test_writes_keep_lists_current(app):
+    with app.app_context():
+        build_neighbors()
+        # An exact twin of car 1 enters car 1's stored list, and every other list it beats.
+        twin = create_car({**{name: getattr(get_car(1), name) for name in (
+            'year', 'horsepower', 'torque_nm', 'drive_type', 'fuel_type')}, 'brand': 'Audi', 'model': 'Twin'})
+        assert twin.id in [i for i, _s in stored_neighbors(1, NEIGHBORS_STORED)]
+        assert _stale_lists() == [] and _queued() == {twin.id}
+
+        first = _ids(5)[0]
+        containing = {n.car_id for n in CarNeighbor.query.filter_by(neighbor_id=first)}
+        update_car(get_car(first), {'horsepower': 999})
+        assert _stored(first) == 0 and all(_stored(car_id) == 0 for car_id in containing - {first})
+        assert _stale_lists() == [] and containing | {first} <= _queued()
+
+        # Writes that leave the similarity features alone keep the lists.
+        kept = next(car.id for car in Car.query if _stored(car.id))
+        update_car(get_car(kept), {'color': 'red'})
+        assert _stored(kept) == NEIGHBORS_STORED
+
+        gone = _ids(kept)[0]
+        delete_car(get_car(gone))
+        assert gone not in _ids(kept) and _stale_lists() == []
+
+        build_neighbors(queued=True)
+        assert _queued() == set() and _stale_lists() == []
+        assert CarNeighbor.query.count() == Car.query.count() * NEIGHBORS_STORED
+
+
+@pytest.mark.skipif(np is None, reason='needs numpy')
+def test_build_yields_to_concurrent_writes(app, monkeypatch):
+    with app.app_context():
+        rank_chunk, calls = neighbors._rank_chunk, []
+
+        def write_between_chunks(car_ids):
+            # An admin write lands while the build runs, after its first chunk.
+            calls.append(car_ids)
+            if len(calls) == 2:
+                update_car(get_car(7), {'year': 1950, 'horsepower': 40})
+            return rank_chunk(car_ids)
+
+        monkeypatch.setattr(neighbors, '_rank_chunk', write_between_chunks)
+        build_neighbors(chunk_size=20)
+        monkeypatch.undo()
+        assert len(calls) > 2
+        # Lists ranked from the old car 7 were not written over the update.
+        assert _stale_lists() == [] and 7 in _queued()
+        build_neighbors(queued=True)
+        assert _queued() == set() and _stale_lists() == []
+
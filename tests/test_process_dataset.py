@@ -0,0 +1,76 @@
+"""process_dataset.py: --workers and --stream write exactly what the serial path writes."""
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+
+import process_dataset
+
+HEADER = ['Company', 'Model', 'Serie', 'Body Style', 'Production years', 'Power(HP)', 'Specification Summary', 'Extra']
+COMPANIES = ['Audi', 'BMW', 'Mercedes-Benz', 'Mercedez BENZ', 'Lada', 'Tesla', 'KIA MOTORS', 'volkswagen', 'Fordd', 'AC', '']
+
+
+def _write_raw(path, rows, seed=7):
+    rng = random.Random(seed)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for i in range(rows):
+            summary = rng.choice([
+                f'Plain summary {i}',
+                f'Multi-line\nsummary "quoted" {i}\r\nend',
+                f'Comma, separated, ünïcödé {i}',
+                '',
+            ])
+            row = [rng.choice(COMPANIES), f'Model {i}', f'S{i % 9}', 'Sedan', '2019, 2020', f'{i % 400} HP', summary, 'x']
+            # Some short rows: DictReader fills the missing fields with None.
+            writer.writerow(row[:rng.choice([len(row), len(row), 5])])
+
+
+def _outputs(out_dir):
+    with open(os.path.join(out_dir, 'processed-dataset.csv'), 'rb') as f_csv, \
+            open(os.path.join(out_dir, 'processed-dataset.json'), 'rb') as f_json:
+        return f_csv.read(), f_json.read()
+
+
+def test_workers_match_serial_output():
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = os.path.join(tmp, 'raw.csv')
+        _write_raw(raw, 3000)
+        process_dataset.main(raw, os.path.join(tmp, 'serial'))
+        expected = _outputs(os.path.join(tmp, 'serial'))
+        assert b'Multi-line' in expected[0] and b'null' in expected[1]
+        for workers in (2, 3):
+            out_dir = os.path.join(tmp, f'workers-{workers}')
+            process_dataset.main(raw, out_dir, workers=workers)
+            assert _outputs(out_dir) == expected
+        process_dataset.main(raw, os.path.join(tmp, 'stream'), stream=True)
+        assert _outputs(os.path.join(tmp, 'stream')) == expected
+
+
+def test_json_array_writer_matches_json_dump():
+    for rows in ([], [{'a': 'x\ny', 'b': None}], [{'Model': 'Škoda "RS"'}, {'Model': ''}]):
+        out = io.StringIO()
+        process_dataset.write_json_array(out, iter(rows))
+        assert out.getvalue() == json.dumps(rows, indent=2, ensure_ascii=False)
+
+
+def test_split_records_lands_on_record_boundaries():
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = os.path.join(tmp, 'raw.csv')
+        _write_raw(raw, 500)
+        start = process_dataset._header_end(raw)
+        ranges = process_dataset.split_records(raw, start, 37, block_size=256)
+        assert ranges[0][0] == start and ranges[-1][1] == os.path.getsize(raw)
+        assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+        with open(raw, newline='', encoding='utf-8') as f:
+            expected = list(csv.reader(f))[1:]
+        chunks = []
+        with open(raw, 'rb') as f:
+            for a, b in ranges:
+                f.seek(a)
+                chunks.extend(csv.reader(f.read(b - a).decode('utf-8').splitlines(keepends=True)))
+        assert chunks == expected
+
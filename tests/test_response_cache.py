@@ -0,0 +1,76 @@
+"""Server-side response cache: hits skip SQL, writes invalidate, LRU and TTL bound it."""
+import time
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from services.car_service import create_car, get_car, update_car
+from services.cache_backends import MemoryBackend
+from services.response_cache import cache_key
+from sql_statements import statements
+
+@pytest.fixture(scope='module', autouse=True)
+def car_id(app):
+    with app.app_context():
+        car_id = create_car({'brand': 'Audi', 'model': 'A4', 'year': 2020, 'horsepower': 150}).id
+        create_car({'brand': 'BMW', 'model': '320i', 'year': 2020, 'horsepower': 180})
+    return car_id
+
+
+@pytest.fixture(scope='module')
+def admin(app):
+    with app.app_context():
+        return {'Authorization': f"Bearer {create_access_token(identity='1', additional_claims={'is_admin': True})}"}
+
+
+def test_hits_skip_sql_and_writes_invalidate(app, client, car_id, admin):
+    urls = ['/api/v1/cars/stats', '/api/v1/browse/years', '/api/v1/cars/top/horsepower?limit=5',
+            '/api/v1/cars/compare/by-year/2020?summary_only=1', '/api/v1/cars?min_horsepower=100&sort_by=year']
+    for url in urls:
+        miss = client.get(url)
+        hit, seen = statements(app, lambda: client.get(url))
+        assert (miss.headers['X-Cache'], hit.headers['X-Cache']) == ('MISS', 'HIT'), url
+        assert hit.data == miss.data and seen == []
+
+    # Unset and empty parameters share an entry; pretty output does not.
+    assert client.get('/api/v1/cars?min_horsepower=100&sort_by=year&brand=').headers['X-Cache'] == 'HIT'
+    assert client.get('/api/v1/cars/stats?pretty=1').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/v1/cars/top/nope').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/v1/cars/top/nope').status_code == 400
+
+    with app.app_context():
+        update_car(get_car(car_id), {'horsepower': 500})
+    top = client.get('/api/v1/cars/top/horsepower?limit=5')
+    assert top.headers['X-Cache'] == 'MISS' and top.get_json()['cars'][0]['id'] == car_id
+
+    stats = client.get('/api/v1/admin/cache', headers=admin).get_json()
+    assert stats['endpoints']['stats'] == {'hits': 1, 'misses': 2}
+    assert stats['hits'] == 6 and stats['entries'] == 1
+    assert client.get('/api/v1/admin/cache').status_code == 401
+
+
+def test_cursor_and_page_mode_do_not_share_entries(client):
+    for first, second in (('/api/v1/cars?per_page=1&cursor=', '/api/v1/cars?per_page=1'),
+                          ('/api/v1/cars?per_page=2', '/api/v1/cars?per_page=2&cursor=')):
+        for url in (first, second):
+            response = client.get(url)
+            body = response.get_json()
+            assert response.headers['X-Cache'] == 'MISS', url
+            if 'cursor=' in url:
+                assert 'next_cursor' in body and 'total' not in body and 'page' not in body, url
+            else:
+                assert {'total', 'page', 'pages'} <= set(body) and 'next_cursor' not in body, url
+
+
+def test_lru_and_ttl(app):
+    cache = MemoryBackend(2)
+    for key in 'abc':
+        cache.set(key, key.encode(), ttl=60)
+    assert cache.get('a') is None and cache.get('c') == b'c'
+    cache.set('d', b'd', ttl=0.01)
+    assert cache.get('b') is None and cache.evictions == 2
+    time.sleep(0.02)
+    assert cache.get('d') is None and cache.stats()['entries'] == 1
+    with app.test_request_context():
+        assert cache_key('top', {'limit': 5, 'metric': 'hp', 'q': None}) == cache_key('top', {'metric': 'hp', 'limit': 5})
+
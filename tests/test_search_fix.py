@@ -8,8 +8,9 @@ app = create_app()
 
 with app.app_context():
     # Test search
-    cars = search_cars('BMW')
-    print(f'Found {len(cars)} BMW cars')
+    results = search_cars('BMW')
+    cars = results.items
+    print(f'Found {results.total} BMW cars ({len(cars)} on page {results.page}/{results.pages})')
     
     if cars:
         car = cars[0]
@@ -0,0 +1,51 @@
+"""FTS5 search index: ranking, pagination and trigger sync."""
+import json
+
+import pytest
+
+from services.car_service import create_car, update_car, delete_car, search_cars, get_cars
+
+
+@pytest.fixture
+def app(fresh_app):
+    with fresh_app.app_context():
+        create_car({'brand': 'BMW', 'model': 'BMW 3 Series', 'year': 2020, 'fuel_type': 'Petrol',
+                    'raw_spec': {'Company': 'BMW', 'Body style': 'Sedan', 'Specification summary': 'Sporty saloon'}})
+        create_car({'brand': 'Audi', 'model': 'Audi A4', 'year': 2019, 'fuel_type': 'Diesel',
+                    'raw_spec': {'Company': 'Audi', 'Body style': 'Sedan'}})
+        create_car({'brand': 'Mercedez BENZ', 'model': 'C-Class Coupe', 'year': 2021, 'fuel_type': 'Petrol',
+                    'raw_spec': 'not json at all'})
+    return fresh_app
+
+
+def test_search_ranks_and_paginates(app):
+    with app.app_context():
+        results = search_cars('bmw')
+        assert [c.brand for c in results.items] == ['BMW']
+        assert results.total == 1
+
+        # Prefix matching, across columns, with words ANDed together.
+        assert {c.brand for c in search_cars('merc coup').items} == {'Mercedez BENZ'}
+        assert {c.brand for c in search_cars('sedan').items} == {'BMW', 'Audi'}
+        assert search_cars('sedan diesel').total == 1
+
+        page = search_cars('sedan', page=2, per_page=1)
+        assert len(page.items) == 1 and page.pages == 2
+
+        # FTS syntax typed by users is treated as plain words.
+        assert search_cars('"OR*').total == 0
+        assert search_cars('!!!').total == 0
+
+
+def test_triggers_keep_index_in_sync(app):
+    with app.app_context():
+        audi = search_cars('audi').items[0]
+        update_car(audi, {'brand': 'Skoda', 'model': 'Octavia', 'raw_spec': json.dumps({'Body style': 'Estate'})})
+        assert search_cars('audi').total == 0
+        assert search_cars('estate skoda').total == 1
+
+        delete_car(audi)
+        assert search_cars('skoda').total == 0
+
+        paginated = get_cars({'q': 'petrol'}, 'id', 'asc', 1, 20)
+        assert paginated.total == 2
@@ -0,0 +1,76 @@
+"""/cars/<id>/similar ranks the whole catalog by score, on both engines."""
+import random
+
+import pytest
+
+from models import db, Car
+from services import similarity
+from services.car_service import create_car, get_similar_cars
+from services.catalog_snapshot import np
+from services.similarity import SIMILARITY_FEATURES, rank_with_sql, similarity_score
+
+
+@pytest.fixture(scope='module', autouse=True)
+def twin_id(app):
+    with app.app_context():
+        rng = random.Random(11)
+        for i in range(300):
+            create_car({'brand': 'Audi', 'model': f'M{i}', 'year': rng.randint(2000, 2020),
+                        'horsepower': rng.choice([None, 150, 200, 250]), 'torque_nm': rng.choice([None, 300, 400]),
+                        'vitesse_max': rng.choice([None, 200, 250]), 'drive_type': rng.choice([None, 'FWD', 'AWD']),
+                        'fuel_type': rng.choice([None, 'Gasoline', 'gasoline', 'Diesel'])})
+        # Identical to the reference car below in every feature but fuel-type case.
+        twin_id = create_car({'brand': 'BMW', 'model': 'Twin', 'year': 2010, 'horsepower': 180, 'torque_nm': 350,
+                              'vitesse_max': 230, 'drive_type': 'RWD', 'fuel_type': 'Hybrid'}).id
+        create_car({'brand': 'BMW', 'model': 'Ref', 'year': 2010, 'horsepower': 180, 'torque_nm': 350,
+                    'vitesse_max': 230, 'drive_type': 'RWD', 'fuel_type': 'HYBRID'})
+    return twin_id
+
+
+def _ranking(app, car_id, limit, snapshot):
+    app.config['CATALOG_SNAPSHOT'] = snapshot
+    try:
+        return [(c['id'], c['similarity_score']) for c in get_similar_cars(car_id, limit)['similar_cars']]
+    finally:
+        app.config['CATALOG_SNAPSHOT'] = True
+
+
+def test_best_match_wins_regardless_of_row_order(app, twin_id):
+    with app.app_context():
+        result = get_similar_cars(twin_id + 1, 5)
+        assert result['similar_cars'][0] == {'id': twin_id, 'spec': result['similar_cars'][0]['spec'],
+                                              'similarity_score': 100.0}
+        assert similarity_score({'fuel_type': 'Hybrid'}, {'fuel_type': 'HYBRID'}) == 100.0
+
+
+@pytest.mark.skipif(np is None, reason='needs numpy')
+def test_snapshot_and_sql_rank_identically(app):
+    with app.app_context():
+        for car_id in (1, 2, 50, 150, 299):
+            for limit in (1, 10, 400):
+                assert _ranking(app, car_id, limit, True) == _ranking(app, car_id, limit, False)
+        assert len(_ranking(app, 1, 400, True)) == 301
+        assert get_similar_cars(10_000)['error']
+
+
+def _full_scan(car, limit):
+    names = [name for name, _kind, _weight in SIMILARITY_FEATURES]
+    target = {name: getattr(car, name) for name in names}
+    scored = [(other.id, similarity_score(target, {name: getattr(other, name) for name in names}))
+              for other in Car.query if other.id != car.id]
+    return sorted(scored, key=lambda item: (item[1] is None, -(item[1] or 0.0), item[0]))[:limit]
+
+
+def test_sql_ranking_scores_a_narrowed_window(app, twin_id, monkeypatch):
+    scored = []
+    score = similarity.similarity_score
+    monkeypatch.setattr(similarity, 'similarity_score', lambda target, car: scored.append(1) or score(target, car))
+    with app.app_context():
+        for car_id in (1, 7, 120, 250, twin_id + 1):
+            car = db.session.get(Car, car_id)
+            for limit in (1, 10, 50, 400):
+                scored.clear()
+                assert rank_with_sql(car, limit) == _full_scan(car, limit), (car_id, limit)
+                if limit == 10 and car_id <= 300:
+                    # Random catalog cars have close neighbours; the reference car does not.
+                    assert len(scored) < Car.query.count() // 2, (car_id, len(scored))
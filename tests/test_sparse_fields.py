@@ -0,0 +1,63 @@
+"""Sparse fieldsets: `fields=` returns only those columns and never selects the spec columns."""
+import pytest
+
+from services.car_service import create_car
+from sql_statements import statements
+
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    app.config['RESPONSE_CACHE_SIZE'] = 0
+    with app.app_context():
+        for i in range(30):
+            create_car({'brand': 'Audi' if i % 2 else 'BMW', 'model': f'A{i % 3} quattro {i}', 'year': 2010 + i % 5,
+                        'horsepower': 150 + i, 'torque_nm': 300 + i, 'drive_type': 'AWD', 'fuel_type': 'Gasoline'})
+
+URLS = [
+    '/api/v1/cars?sort_by=horsepower&order=desc&per_page=5',
+    '/api/v1/cars?min_horsepower=160&per_page=5',
+    '/api/v1/cars?cursor=&sort_by=year&per_page=5',
+    '/api/v1/cars/search?q=quattro&per_page=5',
+    '/api/v1/filter/by-brand/audi?per_page=5',
+    '/api/v1/filter/by-serie/A1?per_page=5',
+    '/api/v1/filter/by-year/2012?cursor=',
+    '/api/v1/cars/top/horsepower?limit=5',
+    '/api/v1/cars/3/similar?limit=5',
+]
+
+
+def _get(app, client, url):
+    return statements(app, lambda: client.get(url).get_json())
+
+
+def _cars(body):
+    return body.get('cars') or body.get('similar_cars')
+
+
+def test_fields_restrict_output_and_select(app, client):
+    for snapshot in (True, False):
+        app.config['CATALOG_SNAPSHOT'] = snapshot
+        for url in URLS:
+            full, _ = _get(app, client, url)
+            sparse, seen = _get(app, client, url + '&fields=brand,year,horsepower')
+            assert [c['id'] for c in _cars(sparse)] == [c['id'] for c in _cars(full)], url
+            for entry, car in zip(_cars(sparse), _cars(full)):
+                fields = {k: v for k, v in entry.items() if k not in ('rank', 'metric_value', 'similarity_score')}
+                assert fields == {'id': car['id'], 'brand': car['spec']['Company'], 'year': int(car['spec']['Production Years']),
+                                  'horsepower': car['spec']['Power(HP)']}, url
+            # Row fetches only: paginate()'s COUNT wraps the whole entity, which SQLite flattens away.
+            car_selects = [sql for sql in seen
+                           if 'FROM cars' in sql and 'car_neighbors' not in sql and not sql.startswith('SELECT count(')]
+            assert car_selects and not any('raw_spec' in sql or 'attendee_spec' in sql for sql in car_selects), url
+    app.config['CATALOG_SNAPSHOT'] = True
+
+
+def test_spec_field_and_errors(app, client):
+    body, _ = _get(app, client, '/api/v1/cars?per_page=2&fields=model,spec')
+    assert list(body['cars'][0]) == ['id', 'model', 'spec'] and body['cars'][0]['spec']['Company'] == 'BMW'
+    body, _ = _get(app, client, '/api/v1/cars/3/similar?fields=model')
+    assert body['reference_car'] == {'id': 3, 'model': 'A2 quattro 2'} and 'reference_car_spec' not in body
+    resp = client.get('/api/v1/cars?fields=brand,raw_spec')
+    assert resp.status_code == 400 and 'raw_spec' in resp.get_json()['error']
+    assert client.get('/api/v1/cars/top/horsepower?fields=nope').status_code == 400
+
@@ -0,0 +1,90 @@
+"""SQLite pragma profile: every pooled connection runs SQLITE_PRAGMAS; GET /admin/database reports them.
+
+Uses a temporary SQLite file, since WAL and mmap do not apply to an in-memory database.
+"""
+import asyncio
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from models import db
+from services.car_service import create_car
+from services.sqlite_profile import install_pragmas
+
+try:
+    import aiosqlite
+    import greenlet
+except ImportError:  # optional dependencies of the async mode
+    aiosqlite = greenlet = None
+
+
+@pytest.fixture(scope='module')
+def app(file_config):
+    return create_app(file_config('profile-testing'))
+
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    with app.app_context():
+        create_car({'brand': 'Audi', 'model': 'A4', 'year': 2020, 'horsepower': 150})
+
+
+@pytest.fixture(scope='module')
+def tokens(app):
+    with app.app_context():
+        return {
+            'admin': {'Authorization': f"Bearer {create_access_token(identity='1', additional_claims={'is_admin': True})}"},
+            'user': {'Authorization': f"Bearer {create_access_token(identity='2', additional_claims={'is_admin': False})}"},
+        }
+
+
+def _pragma(conn, name):
+    return conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+
+
+def test_every_pooled_connection_gets_the_profile(app):
+    with app.app_context():
+        engine = db.engine
+        with engine.connect() as first, engine.connect() as second:
+            for conn in (first, second):
+                assert _pragma(conn, 'journal_mode') == 'wal'
+                assert _pragma(conn, 'synchronous') == 1  # NORMAL
+                assert _pragma(conn, 'temp_store') == 2  # MEMORY
+                assert _pragma(conn, 'cache_size') == app.config['SQLITE_PRAGMAS']['cache_size']
+                assert _pragma(conn, 'busy_timeout') == app.config['SQLITE_PRAGMAS']['busy_timeout']
+
+
+def test_admin_database_reports_effective_settings(app, client, tokens):
+    assert client.get('/api/v1/admin/database').status_code == 401
+    assert client.get('/api/v1/admin/database', headers=tokens['user']).status_code == 403
+    r = client.get('/api/v1/admin/database', headers=tokens['admin'])
+    assert r.status_code == 200
+    data = r.get_json()
+    assert data['dialect'] == 'sqlite' and data['sqlite_version']
+    assert data['pragmas']['journal_mode'] == 'wal'
+    assert data['pragmas']['synchronous'] == 'NORMAL' and data['pragmas']['temp_store'] == 'MEMORY'
+    assert data['configured_pragmas'] == app.config['SQLITE_PRAGMAS']
+    assert data['pragmas']['page_count'] > 0 and 'cars.db' in data['files']
+
+
+@pytest.mark.skipif(aiosqlite is None, reason='needs aiosqlite and greenlet')
+def test_async_engine_gets_the_profile(app):
+    from services.async_app import AsyncApp
+    asgi = AsyncApp(app)
+
+    async def run():
+        async with asgi.engine.connect() as conn:
+            modes = [(await conn.exec_driver_sql(f'PRAGMA {name}')).scalar() for name in ('journal_mode', 'synchronous')]
+        await asgi.engine.dispose()
+        return modes
+
+    assert asyncio.run(run()) == ['wal', 1]
+
+
+def test_invalid_pragmas_are_rejected(app):
+    with app.app_context():
+        for pragmas in ({'journal_mode': 'WAL; DROP TABLE cars'}, {'cache size': 10}):
+            with pytest.raises(ValueError):
+                install_pragmas(db.engine, pragmas)
+
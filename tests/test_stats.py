@@ -0,0 +1,40 @@
+"""/cars/stats served from the incrementally maintained summary tables."""
+import pytest
+
+from models import db, Car
+from services.car_service import create_car, update_car, delete_car, get_stats
+from services.stats import rebuild_stats
+
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog(app):
+    with app.app_context():
+        create_car({'brand': 'Audi', 'model': 'A4', 'year': 2010, 'horsepower': 150, 'combined_mpg': 30.0, 'drive_type': 'FWD'})
+        create_car({'brand': 'audi ', 'model': 'A6', 'year': 2015, 'horsepower': 250, 'drive_type': 'AWD'})
+        create_car({'brand': 'BMW', 'model': 'M3', 'year': 2020, 'horsepower': 420, 'vitesse_max': 250})
+
+
+def test_case_variants_share_one_brand_row(client):
+    data = client.get('/api/v1/cars/stats').get_json()
+    assert data['total_cars'] == 3
+    audi = data['brands'][0]
+    assert audi['brand'] == 'AUDI' and audi['count'] == 2
+    assert audi['average_horsepower'] == 200.0
+    # Averages are over non-null values only, like SQL AVG.
+    assert audi['average_combined_mpg'] == 30.0
+    assert audi['year_range'] == '2010-2015' and audi['model_count'] == 2
+    assert {d['drive_type']: d['count'] for d in data['drive_types']} == {'AWD': 1, 'FWD': 1, 'Unknown': 1}
+
+
+def test_writes_update_stats_and_match_a_rebuild(app):
+    with app.app_context():
+        car = create_car({'brand': 'Tesla', 'model': 'S', 'year': 2018, 'horsepower': 500})
+        update_car(car, {'brand': 'BMW', 'model': 'M5', 'year': 2022})
+        delete_car(db.session.get(Car, 1))
+        incremental = get_stats()
+        bmw = next(b for b in incremental['brands'] if b['brand'] == 'BMW')
+        assert bmw['count'] == 2 and bmw['year_range'] == '2020-2022' and bmw['model_count'] == 2
+        assert bmw['average_horsepower'] == 460.0
+        assert all(b['brand'] != 'TESLA' for b in incremental['brands'])
+        rebuild_stats()
+        assert get_stats() == incremental
@@ -0,0 +1,79 @@
+"""Incremental import: only new and changed records are written."""
+import json
+
+import pytest
+
+import import_dataset
+from models import db, Car
+from services.car_service import create_car, get_stats
+from services.stats import rebuild_stats
+
+AUDI = {'Company': 'Audi', 'Model': 'AUDI A4', 'Production Years': '2019', 'Power(HP)': '190 HP'}
+BMW = {'Company': 'BMW', 'Model': 'BMW M3', 'Production Years': '2021', 'Power(HP)': '473 HP'}
+KIA = {'Company': 'KIA', 'Model': 'KIA Ceed', 'Production Years': '2018', 'Power(HP)': '120 HP'}
+
+
+@pytest.fixture
+def app(fresh_app, monkeypatch):
+    monkeypatch.setattr(import_dataset, 'app', fresh_app)
+    return fresh_app
+
+
+@pytest.fixture
+def upsert(tmp_path):
+    def run(records, **kwargs):
+        path = tmp_path / 'dataset.json'
+        path.write_text(json.dumps(records), encoding='utf-8')
+        return import_dataset.import_data(str(path), upsert=True, **kwargs)
+    return run
+
+
+def test_upsert_applies_only_the_delta(app, upsert):
+    with app.app_context():
+        assert upsert([AUDI, BMW]) == {'added': 2, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+        bmw = Car.query.filter_by(brand='BMW').one()
+        stamp = bmw.updated_at
+
+        changed = dict(AUDI, **{'Power(HP)': '204 HP'})
+        assert upsert([changed, BMW, KIA]) == {'added': 1, 'updated': 1, 'unchanged': 1, 'deleted': 0}
+        audi = Car.query.filter_by(brand='Audi').one()
+        assert audi.horsepower == 204 and json.loads(audi.attendee_spec)['Power(HP)'] == 204
+        db.session.refresh(bmw)
+        assert bmw.updated_at == stamp
+
+        admin_car = create_car({'brand': 'Dacia', 'model': 'Duster', 'year': 2022})
+        assert upsert([KIA], prune=True)['deleted'] == 2
+        assert sorted(c.brand for c in Car.query) == ['Dacia', 'KIA']
+        assert admin_car.source_key is None
+
+
+def test_rows_imported_before_source_key_are_adopted(app, upsert):
+    with app.app_context():
+        for rec in (AUDI, BMW):
+            values = import_dataset.parse_record(rec)
+            values.update(source_key=None, content_hash=None)
+            db.session.add(Car(**values))
+        db.session.commit()
+
+        changed = dict(BMW, **{'Power(HP)': '510 HP'})
+        assert upsert([AUDI, changed]) == {'added': 0, 'updated': 1, 'unchanged': 1, 'deleted': 0}
+        assert Car.query.count() == 2
+        assert Car.query.filter(Car.source_key.is_(None)).count() == 0
+        assert Car.query.filter_by(brand='BMW').one().horsepower == 510
+        assert upsert([AUDI, changed])['unchanged'] == 2
+
+
+def test_upsert_updates_stats_without_a_rebuild(app, upsert, monkeypatch):
+    rebuilds = []
+    monkeypatch.setattr(import_dataset, 'rebuild_stats', lambda: rebuilds.append(1))
+    with app.app_context():
+        upsert([AUDI, BMW])
+        skoda = dict(AUDI, **{'Company': 'Skoda', 'Model': 'SKODA Octavia'})
+        # One insert, one update, one unchanged row and one pruned row.
+        upsert([skoda, dict(BMW, **{'Power(HP)': '510 HP'}), KIA], prune=True)
+        incremental = get_stats()
+        assert incremental['total_cars'] == 3
+        assert sorted(b['brand'] for b in incremental['brands']) == ['BMW', 'KIA', 'SKODA']
+        rebuild_stats()
+        assert get_stats() == incremental
+    assert not rebuilds
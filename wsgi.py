@@ -1,6 +1,7 @@
 import os
 
 from app import create_app
+from services.catalog_snapshot import refresh_snapshot
 
 
 def _get_env_name() -> str:
@@ -9,3 +10,7 @@ def _get_env_name() -> str:
 
 
 app = create_app(_get_env_name())
+
+# Build the in-memory catalog snapshot now rather than on the first request.
+with app.app_context():
+    refresh_snapshot()